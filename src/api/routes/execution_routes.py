@@ -9,6 +9,16 @@ def execute_problem_code(problem_id):
     """Execute code against stored test cases for a problem."""
     return execution_handler.execute_problem_code(problem_id)
 
+@execution_bp.post('/code/<problem_id>/stream')
+def stream_problem_code(problem_id):
+    """Execute code against a problem's test cases, streaming each result as it completes."""
+    return execution_handler.stream_problem_code(problem_id)
+
+@execution_bp.post('/code/<problem_id>/batch')
+def execute_problem_batch(problem_id):
+    """Execute many submissions against one problem, streaming NDJSON results."""
+    return execution_handler.execute_problem_batch(problem_id)
+
 @execution_bp.post('/run')
 def custom_code_executor():
     """Execute arbitrary code without test cases."""
@@ -18,3 +28,8 @@ def custom_code_executor():
 def execute_chunk_code(chunk_id):
     """Execute code against stored test cases for a chunk."""
     return execution_handler.execute_chunk_code(chunk_id)
+
+@execution_bp.post('/chunk/execute/<chunk_id>/stream')
+def stream_chunk_code(chunk_id):
+    """Execute chunk code, streaming each test result as it completes."""
+    return execution_handler.stream_chunk_code(chunk_id)
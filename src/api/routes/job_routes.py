@@ -0,0 +1,20 @@
+from flask import Blueprint
+from handlers import JobHandler
+
+job_bp = Blueprint('job', __name__)
+job_handler = JobHandler()
+
+@job_bp.post('/code/<problem_id>')
+def submit_problem_code(problem_id):
+    """Queue code against a problem's test cases (Base: /jobs/code/<id>)"""
+    return job_handler.submit_problem_code(problem_id)
+
+@job_bp.post('/chunk/<chunk_id>')
+def submit_chunk_code(chunk_id):
+    """Queue a chunk execution (Base: /jobs/chunk/<id>)"""
+    return job_handler.submit_chunk_code(chunk_id)
+
+@job_bp.get('/<job_id>')
+def get_job(job_id):
+    """Poll job status and result (Base: /jobs/<id>)"""
+    return job_handler.get_job(job_id)
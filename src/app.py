@@ -1,6 +1,8 @@
 import logging
 from flask import Flask, jsonify
 from api import api_bp
+from core import metrics_snapshot, warm_up, AdmissionRejected
+from infrastructure import JobQueueFull
 
 logging.basicConfig(level=logging.INFO)
 
@@ -9,15 +11,30 @@ def create_app():
     
     # Register routes
     app.register_blueprint(api_bp)
+
+    # Build the C++ precompiled header in the background while workers start
+    warm_up()
     
     @app.route('/health')
     def health():
         return jsonify(status='success', data={'health': 'ok'}), 200
 
+    @app.route('/metrics')
+    def metrics():
+        return jsonify(status='success', data=metrics_snapshot()), 200
+
     @app.route('/')
     def home():
         return app.send_static_file('index.html')
 
+    @app.errorhandler(AdmissionRejected)
+    def admission_rejected(e):
+        return jsonify(status='error', message=str(e)), 429, {'Retry-After': str(e.retry_after)}
+
+    @app.errorhandler(JobQueueFull)
+    def job_queue_full(e):
+        return jsonify(status='error', message=str(e)), 429, {'Retry-After': str(e.retry_after)}
+
     @app.errorhandler(404)
     def page_not_found(e):
         return app.send_static_file('404.html'), 404
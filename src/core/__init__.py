@@ -1,3 +1,6 @@
-from .executor import execute_code, execute_custom_code
+from .executor import execute_code, execute_custom_code, warm_up
 from .security.sanitizer import sanitize_code
 from .cheat import toggle_cheat_mode, is_cheat_mode, make_all_passed_result
+from .metrics import snapshot as metrics_snapshot
+from .admission import AdmissionRejected
+from . import admission, result_cache
@@ -0,0 +1,212 @@
+"""
+Admission control shared by every worker process on the host.
+
+Compiles and test runs each have a fixed number of slots (MAX_CONCURRENT_COMPILES,
+MAX_CONCURRENT_RUNS). A slot is an flock()ed file under ADMISSION_DIR, so the limit
+holds across gunicorn workers and threads, and a crashed worker's slots are freed
+by the kernel. Callers that find every slot busy wait in a bounded queue (also
+lock files, ADMISSION_QUEUE_DEPTH per kind) for up to ADMISSION_MAX_WAIT seconds;
+when the queue is full, or the wait runs out, AdmissionRejected is raised and the
+API answers 429 with Retry-After.
+
+A submission that runs several test cases at once holds one slot per sandbox
+(see `slots`): the extra slots are taken only when free, so a busy host runs
+its cases with fewer workers instead of running more sandboxes than slots.
+
+Background work (jobs, batches) runs inside `waiting()` and queues in a deeper
+queue of its own (ADMISSION_BACKGROUND_QUEUE_DEPTH) for up to
+ADMISSION_BACKGROUND_MAX_WAIT seconds before it is rejected the same way.
+`admit_background` refuses a batch up front while that queue is full.
+"""
+import os
+import time
+import fcntl
+import tempfile
+import threading
+import contextvars
+from contextlib import contextmanager
+
+ADMISSION_CONTROL = os.getenv("ADMISSION_CONTROL", "1") != "0"
+ADMISSION_DIR = os.getenv("ADMISSION_DIR", os.path.join(tempfile.gettempdir(), "code-exec-admission"))
+MAX_CONCURRENT_COMPILES = int(os.getenv("MAX_CONCURRENT_COMPILES", os.cpu_count() or 1))
+MAX_CONCURRENT_RUNS = int(os.getenv("MAX_CONCURRENT_RUNS", os.cpu_count() or 1))
+ADMISSION_QUEUE_DEPTH = int(os.getenv("ADMISSION_QUEUE_DEPTH", 32))
+ADMISSION_MAX_WAIT = float(os.getenv("ADMISSION_MAX_WAIT", 30))
+ADMISSION_RETRY_AFTER = int(os.getenv("ADMISSION_RETRY_AFTER", 5))
+ADMISSION_BACKGROUND_QUEUE_DEPTH = int(os.getenv("ADMISSION_BACKGROUND_QUEUE_DEPTH", 256))
+ADMISSION_BACKGROUND_MAX_WAIT = float(os.getenv("ADMISSION_BACKGROUND_MAX_WAIT", 600))
+
+_POLL = 0.02
+_patient = contextvars.ContextVar("admission_patient", default=False)
+
+
+class AdmissionRejected(Exception):
+    """Every slot is busy and the wait queue is full (or the wait ran out)."""
+
+    def __init__(self, kind, retry_after):
+        super().__init__(f"Too many concurrent {kind}s, retry in {retry_after}s")
+        self.kind = kind
+        self.retry_after = retry_after
+
+
+def _limits(kind):
+    return MAX_CONCURRENT_COMPILES if kind == "compile" else MAX_CONCURRENT_RUNS
+
+
+def _try_lock(path):
+    """Return an fd holding an exclusive lock on `path`, or None if it is taken."""
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return fd
+    except BlockingIOError:
+        os.close(fd)
+        return None
+
+
+def _try_any(kind, role, count):
+    os.makedirs(ADMISSION_DIR, exist_ok=True)
+    for i in range(count):
+        fd = _try_lock(os.path.join(ADMISSION_DIR, f"{kind}-{role}-{i}.lock"))
+        if fd is not None:
+            return fd
+    return None
+
+
+def _release(fd):
+    fcntl.flock(fd, fcntl.LOCK_UN)
+    os.close(fd)
+
+
+def _held(kind, role, count):
+    """Number of `role` lock files currently held by any process."""
+    busy = 0
+    for i in range(count):
+        path = os.path.join(ADMISSION_DIR, f"{kind}-{role}-{i}.lock")
+        if not os.path.exists(path):
+            continue
+        fd = _try_lock(path)
+        if fd is None:
+            busy += 1
+        else:
+            _release(fd)
+    return busy
+
+
+_stats_lock = threading.Lock()
+_stats = {
+    kind: {"admitted": 0, "queued": 0, "rejected": 0, "wait_seconds_total": 0.0, "wait_seconds_max": 0.0}
+    for kind in ("compile", "run")
+}
+
+
+def _record(kind, admitted, waited=None):
+    """Count one admission decision; `waited` is the queueing time of admitted callers that queued."""
+    with _stats_lock:
+        st = _stats[kind]
+        if not admitted:
+            st["rejected"] += 1
+            return
+        st["admitted"] += 1
+        if waited is not None:
+            st["queued"] += 1
+            st["wait_seconds_total"] += waited
+            st["wait_seconds_max"] = max(st["wait_seconds_max"], waited)
+
+
+@contextmanager
+def waiting():
+    """Queue in the background queue, which is deeper and waits longer (jobs, batches)."""
+    token = _patient.set(True)
+    try:
+        yield
+    finally:
+        _patient.reset(token)
+
+
+@contextmanager
+def slot(kind):
+    """Hold one `kind` ("compile" or "run") slot for the duration of the block."""
+    if not ADMISSION_CONTROL:
+        yield
+        return
+
+    limit = _limits(kind)
+    fd = _try_any(kind, "slot", limit)
+    waited = None
+    if fd is None:
+        started = time.monotonic()
+        if _patient.get():
+            role, depth, max_wait = "background", ADMISSION_BACKGROUND_QUEUE_DEPTH, ADMISSION_BACKGROUND_MAX_WAIT
+        else:
+            role, depth, max_wait = "queue", ADMISSION_QUEUE_DEPTH, ADMISSION_MAX_WAIT
+        ticket = _try_any(kind, role, depth)
+        if ticket is None:
+            _record(kind, False)
+            raise AdmissionRejected(kind, ADMISSION_RETRY_AFTER)
+        try:
+            while fd is None:
+                if time.monotonic() - started > max_wait:
+                    _record(kind, False)
+                    raise AdmissionRejected(kind, ADMISSION_RETRY_AFTER)
+                time.sleep(_POLL)
+                fd = _try_any(kind, "slot", limit)
+        finally:
+            _release(ticket)
+        waited = time.monotonic() - started
+
+    _record(kind, True, waited)
+    try:
+        yield
+    finally:
+        _release(fd)
+
+
+@contextmanager
+def slots(kind, count):
+    """Hold one `kind` slot, queueing like `slot`, plus up to `count - 1` more that
+    are free right away. Yields the number held, i.e. how many sandboxes may run."""
+    with slot(kind):
+        if not ADMISSION_CONTROL:
+            yield count
+            return
+        extra = []
+        try:
+            while len(extra) < count - 1:
+                fd = _try_any(kind, "slot", _limits(kind))
+                if fd is None:
+                    break
+                extra.append(fd)
+            yield 1 + len(extra)
+        finally:
+            for fd in extra:
+                _release(fd)
+
+
+def admit_background(kind):
+    """Raise AdmissionRejected while `kind`'s background queue is full."""
+    if ADMISSION_CONTROL and _held(kind, "background", ADMISSION_BACKGROUND_QUEUE_DEPTH) >= ADMISSION_BACKGROUND_QUEUE_DEPTH:
+        _record(kind, False)
+        raise AdmissionRejected(kind, ADMISSION_RETRY_AFTER)
+
+
+def stats():
+    """Host-wide slot and queue occupancy, plus this worker's admission counters."""
+    result = {"enabled": ADMISSION_CONTROL}
+    for kind in ("compile", "run"):
+        with _stats_lock:
+            st = dict(_stats[kind])
+        result[kind] = {
+            "limit": _limits(kind),
+            "in_use": _held(kind, "slot", _limits(kind)) if ADMISSION_CONTROL else 0,
+            "queue_limit": ADMISSION_QUEUE_DEPTH,
+            "queued": _held(kind, "queue", ADMISSION_QUEUE_DEPTH) if ADMISSION_CONTROL else 0,
+            "background_queue_limit": ADMISSION_BACKGROUND_QUEUE_DEPTH,
+            "background_queued": _held(kind, "background", ADMISSION_BACKGROUND_QUEUE_DEPTH) if ADMISSION_CONTROL else 0,
+            "admitted": st["admitted"],
+            "admitted_after_queueing": st["queued"],
+            "rejected": st["rejected"],
+            "wait_seconds_avg": st["wait_seconds_total"] / st["admitted"] if st["admitted"] else 0.0,
+            "wait_seconds_max": st["wait_seconds_max"],
+        }
+    return result
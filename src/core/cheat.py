@@ -10,17 +10,41 @@ Setup:
 
 Toggling:
     POST /cheat-flip  { "cheat-code": "YOUR_SECRET" }
+
+Caching:
+    Every execution checks the flag, so each worker keeps it in memory instead
+    of querying the row per submission. On PostgreSQL a listener thread per
+    worker LISTENs on the `cheat_mode` channel and `toggle_cheat_mode` NOTIFYs
+    it, so a flip reaches every worker at once; the cached value is then only
+    re-read every CHEAT_MODE_NOTIFY_TTL seconds as a safety net. Without
+    notifications (other databases, or the listener is reconnecting) the value
+    is re-read every CHEAT_MODE_TTL seconds.
 """
 import os
 import hmac
+import time
+import select as _select
 import hashlib
+import logging
 import threading
 
+from sqlalchemy import text
 from sqlmodel import select
-from infrastructure import SessionLocal as SessionFactory
+from infrastructure import SessionLocal as SessionFactory, engine
 from models import CheatMode
 
+CHEAT_MODE_TTL = float(os.getenv("CHEAT_MODE_TTL", 2))
+CHEAT_MODE_NOTIFY_TTL = float(os.getenv("CHEAT_MODE_NOTIFY_TTL", 300))
+CHEAT_MODE_LISTEN = os.getenv("CHEAT_MODE_LISTEN", "1") != "0"
+CHANNEL = "cheat_mode"
+
 _lock = threading.Lock()
+_refresh_lock = threading.Lock()
+_listener_lock = threading.Lock()
+_cached = None          # (enabled, expires at) or None
+_generation = 0         # bumped by every notification, so a slower read cannot overwrite it
+_listener_owner = None  # pid whose listener thread is running
+_listening_pid = None   # pid whose listener currently holds a LISTEN
 
 
 def _get_cheat_row(session):
@@ -48,14 +72,98 @@ def _constant_time_verify(raw_input: str, stored_hash: str) -> bool:
     return hmac.compare_digest(input_hash, stored_hash)
 
 
-def is_cheat_mode() -> bool:
-    """Return current cheat mode state (thread-safe read)."""
-    with _lock:
-        if not SessionFactory:
-            return False
+def _notifications_supported() -> bool:
+    return CHEAT_MODE_LISTEN and engine is not None and engine.dialect.name == "postgresql"
+
+
+def _store(enabled, generation=None):
+    """Cache `enabled` unless a notification arrived after `generation` was read."""
+    global _cached
+    if generation is not None and generation != _generation:
+        return
+    ttl = CHEAT_MODE_NOTIFY_TTL if _listening_pid == os.getpid() else CHEAT_MODE_TTL
+    _cached = (enabled, time.monotonic() + ttl)
+
+
+def _notified(enabled=None):
+    """A toggle happened: cache its new state, or drop the cache when it is unknown."""
+    global _cached, _generation
+    _generation += 1
+    if enabled is None:
+        _cached = None
+    else:
+        _store(enabled)
+
+
+def _listen():
+    """Keep a LISTEN open on CHANNEL and apply notifications (runs forever, per worker)."""
+    global _listening_pid
+    while True:
+        conn = None
+        try:
+            conn = engine.raw_connection()
+            conn.detach()  # never hand a LISTENing connection back to the pool
+            dbapi = conn.driver_connection
+            dbapi.autocommit = True
+            with dbapi.cursor() as cur:
+                cur.execute(f"LISTEN {CHANNEL}")
+            _listening_pid = os.getpid()
+            # Toggles are not replayed, so anything may have changed before the LISTEN
+            _notified()
+            while True:
+                if not _select.select([dbapi], [], [], 60)[0]:
+                    # Idle: make sure the connection is still there
+                    with dbapi.cursor() as cur:
+                        cur.execute("SELECT 1")
+                dbapi.poll()
+                while dbapi.notifies:
+                    payload = dbapi.notifies.pop(0).payload
+                    _notified({"true": True, "false": False}.get(payload))
+        except Exception:
+            logging.warning("Cheat mode listener disconnected, polling every %ss", CHEAT_MODE_TTL, exc_info=True)
+        finally:
+            _listening_pid = None
+            _notified()
+            if conn is not None:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+        time.sleep(5)
+
+
+def _ensure_listener():
+    global _listener_owner
+    if not _notifications_supported():
+        return
+    with _listener_lock:
+        # The listener thread does not survive a fork
+        if _listener_owner == os.getpid():
+            return
+        _listener_owner = os.getpid()
+    threading.Thread(target=_listen, name="cheat-mode-listener", daemon=True).start()
 
+
+def is_cheat_mode() -> bool:
+    """Return current cheat mode state from the in-memory cache (see module docstring)."""
+    if not SessionFactory:
+        return False
+
+    cached = _cached
+    if cached and cached[1] > time.monotonic():
+        return cached[0]
+    # One thread re-reads the row; the others keep using the expired value meanwhile
+    if not _refresh_lock.acquire(blocking=cached is None):
+        return cached[0]
+    try:
+        _ensure_listener()
+        generation = _generation
         with SessionFactory() as session:
-            return _get_cheat_row(session).enabled
+            enabled = _get_cheat_row(session).enabled
+        _store(enabled, generation)
+        return enabled
+    finally:
+        _refresh_lock.release()
 
 
 def toggle_cheat_mode(raw_cheat_code: str) -> dict:
@@ -92,9 +200,16 @@ def toggle_cheat_mode(raw_cheat_code: str) -> dict:
             cheat = _get_cheat_row(session)
             cheat.enabled = not cheat.enabled
             session.add(cheat)
+            if _notifications_supported():
+                # Delivered to every worker's listener when the transaction commits
+                session.execute(
+                    text("SELECT pg_notify(:channel, :payload)"),
+                    {"channel": CHANNEL, "payload": "true" if cheat.enabled else "false"},
+                )
             session.commit()
             session.refresh(cheat)
             new_mode = cheat.enabled
+        _notified(new_mode)
 
     return {
         "success": True,
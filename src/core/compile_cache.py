@@ -0,0 +1,146 @@
+"""
+Content-addressed on-disk cache for compiled artifacts (C/C++ binaries, Java .class files).
+
+Entries are keyed by a hash of (language, final source, compiler flags, toolchain version)
+and stored as one directory per key under COMPILE_CACHE_DIR. Entries are published with an
+atomic rename so concurrent gunicorn workers never see a half-written entry. The directory
+mtime is bumped on every hit and the least recently used entries are evicted once the
+cache grows past COMPILE_CACHE_MAX_MB.
+
+A hit runs whatever the entry holds, so entries are kept out of reach of submissions
+(see trusted_files): COMPILE_CACHE_DIR is private to the service, each entry is sealed
+with the process's key, and `lookup` checks the copies it made against that seal. An
+entry that does not verify (altered, or sealed by a process that no longer shares the
+key) is a miss and is replaced by the next `store`.
+"""
+import os
+import json
+import shutil
+import hashlib
+import tempfile
+import threading
+import subprocess
+from functools import lru_cache
+from . import trusted_files
+
+COMPILE_CACHE_ENABLED = os.getenv("COMPILE_CACHE_ENABLED", "1") != "0"
+COMPILE_CACHE_DIR = os.getenv("COMPILE_CACHE_DIR", os.path.join(trusted_files.STATE_DIR, "compile-cache"))
+COMPILE_CACHE_MAX_MB = int(os.getenv("COMPILE_CACHE_MAX_MB", 256))
+
+_evict_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def toolchain_version(tool: str) -> str:
+    """Return the first line of the compiler's version banner (memoized per process)."""
+    flag = "-version" if tool == "javac" else "--version"
+    try:
+        res = subprocess.run([tool, flag], capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.TimeoutExpired):
+        return "unknown"
+    banner = (res.stdout or res.stderr).strip().splitlines()
+    return banner[0] if banner else "unknown"
+
+
+def make_key(lang: str, code: str, flags: list, version: str) -> str:
+    """Hash everything that can change the compiler output."""
+    payload = json.dumps([lang, code, list(flags), version], ensure_ascii=False)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _entry_path(key: str) -> str:
+    return os.path.join(COMPILE_CACHE_DIR, key)
+
+
+def lookup(key: str, dest: str) -> bool:
+    """Copy a cached entry's artifacts into `dest`. Returns True on a hit."""
+    if not COMPILE_CACHE_ENABLED:
+        return False
+    entry = _entry_path(key)
+    names = []
+    try:
+        with open(os.path.join(entry, trusted_files.SIGNATURE)) as f:
+            signature = f.read()
+        names = [n for n in os.listdir(entry) if n != trusted_files.SIGNATURE]
+        for name in names:
+            shutil.copy2(os.path.join(entry, name), os.path.join(dest, name))
+    except OSError:
+        # Missing entry, or evicted by another worker mid-copy
+        _discard(dest, names)
+        return False
+    # Check the copies that will run, not the entry, which could change after the check
+    if not names or not trusted_files.verify(dest, names, signature):
+        _discard(dest, names)
+        shutil.rmtree(entry, ignore_errors=True)
+        return False
+    try:
+        os.utime(entry)
+    except OSError:
+        pass
+    return True
+
+
+def _discard(dest, names):
+    for name in names:
+        try:
+            os.unlink(os.path.join(dest, name))
+        except OSError:
+            pass
+
+
+def store(key: str, src: str, names: list) -> None:
+    """Publish the given artifacts from `src` as the cache entry for `key`."""
+    if not COMPILE_CACHE_ENABLED or not names:
+        return
+    try:
+        trusted_files.private_dir(COMPILE_CACHE_DIR)
+        staging = tempfile.mkdtemp(prefix=".staging-", dir=COMPILE_CACHE_DIR)
+    except OSError:
+        return
+
+    try:
+        for name in names:
+            shutil.copy2(os.path.join(src, name), os.path.join(staging, name))
+        trusted_files.seal(staging, names)
+        os.rename(staging, _entry_path(key))
+    except OSError:
+        # Another worker published the same key first, or the disk is full
+        shutil.rmtree(staging, ignore_errors=True)
+        return
+
+    _evict()
+
+
+def _dir_size(path: str) -> int:
+    total = 0
+    for name in os.listdir(path):
+        try:
+            total += os.path.getsize(os.path.join(path, name))
+        except OSError:
+            pass
+    return total
+
+
+def _evict() -> None:
+    """Drop least recently used entries until the cache fits within COMPILE_CACHE_MAX_MB."""
+    limit = COMPILE_CACHE_MAX_MB * 1024 * 1024
+    with _evict_lock:
+        entries = []
+        try:
+            with os.scandir(COMPILE_CACHE_DIR) as it:
+                for e in it:
+                    if e.name.startswith(".staging-") or not e.is_dir():
+                        continue
+                    try:
+                        entries.append((e.stat().st_mtime, _dir_size(e.path), e.path))
+                    except OSError:
+                        continue
+        except OSError:
+            return
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= limit:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total -= size
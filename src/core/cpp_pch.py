@@ -0,0 +1,156 @@
+"""
+Precompiled header for the common whitelisted C++ standard headers.
+
+CPP_PCH_HEADERS are bundled into one header, compiled once per compiler and flag
+set into CPP_PCH_DIR, and force-included (`-include`) into C++ submissions whose
+own includes are all part of that set. Parsing <iostream>, <vector>, <map>, ...
+then costs a load of the .gch instead of a full parse.
+
+Submissions that only include C-style headers (<cstdio>, <cstring>, ...) are
+compiled as before: loading the full precompiled header is slower than parsing
+those few declarations.
+
+Every C++ compile reads the header, so it is kept out of reach of submissions
+(see trusted_files): CPP_PCH_DIR is private to the service, the build is sealed
+with the process's key, and `intact` compares the files with their fingerprint
+before and after each compile that uses them. A header that changed is dropped
+and rebuilt.
+"""
+import os
+import re
+import hashlib
+import logging
+import tempfile
+import threading
+import subprocess
+import shutil
+from . import compile_cache, trusted_files
+
+CPP_PCH = os.getenv("CPP_PCH", "1") != "0"
+CPP_PCH_DIR = os.getenv("CPP_PCH_DIR", os.path.join(trusted_files.STATE_DIR, "cpp-pch"))
+
+# Subset of C_CPP_ALLOWED_HEADERS (security/inspector.py) that every build bundles
+CPP_PCH_HEADERS = (
+    'iostream', 'iomanip', 'sstream', 'string', 'vector', 'list', 'deque',
+    'array', 'stack', 'queue', 'set', 'map', 'unordered_set', 'unordered_map',
+    'bitset', 'tuple', 'utility', 'algorithm', 'numeric', 'functional',
+    'iterator', 'memory', 'climits', 'cmath', 'cstring', 'cstdlib', 'cstdio',
+    'cctype', 'cassert', 'cstdint',
+)
+
+# Headers cheap enough that the precompiled header is not worth loading for them alone
+_LIGHT_HEADERS = {h for h in CPP_PCH_HEADERS if h.startswith('c')}
+_INCLUDE_RE = re.compile(r'#\s*include\s*[<"]([^>"]+)[>"]')
+_FILES = ("pch.hpp", "pch.hpp.gch")
+
+_lock = threading.Lock()
+_header = None
+_fingerprint = None
+_building = None
+
+
+def _build(flags):
+    """Compile the precompiled header into CPP_PCH_DIR.
+
+    Returns (header path, fingerprint of its files), or (None, None).
+    """
+    source = "".join(f"#include <{h}>\n" for h in CPP_PCH_HEADERS)
+    digest = hashlib.sha256(
+        "\0".join([source, *flags, compile_cache.toolchain_version("g++")]).encode()
+    ).hexdigest()[:16]
+    target = os.path.join(CPP_PCH_DIR, f"{digest}-{trusted_files.KEY_OWNER}")
+    header = os.path.join(target, "pch.hpp")
+
+    staging = None
+    try:
+        trusted_files.private_dir(CPP_PCH_DIR)
+        trusted_files.remove_stale(CPP_PCH_DIR)
+        fingerprint = trusted_files.sealed(target, _FILES)
+        if fingerprint:
+            return header, fingerprint
+        # Not built yet, or altered since it was sealed
+        shutil.rmtree(target, ignore_errors=True)
+        staging = tempfile.mkdtemp(prefix=".staging-", suffix=f"-{trusted_files.KEY_OWNER}", dir=CPP_PCH_DIR)
+        with open(os.path.join(staging, "pch.hpp"), 'w') as f:
+            f.write(source)
+        comp = subprocess.run(
+            ["g++", "-x", "c++-header", *flags, "pch.hpp", "-o", "pch.hpp.gch"],
+            capture_output=True, text=True, timeout=120, cwd=staging
+        )
+        if comp.returncode:
+            logging.warning("Precompiled header build failed: %s", comp.stderr.strip())
+            shutil.rmtree(staging, ignore_errors=True)
+            return None, None
+        trusted_files.seal(staging, _FILES)
+        os.rename(staging, target)
+    except (OSError, subprocess.TimeoutExpired):
+        # Lost the publish race to a sibling worker, g++ is unavailable, or
+        # CPP_PCH_DIR belongs to someone else
+        if staging:
+            shutil.rmtree(staging, ignore_errors=True)
+    fingerprint = trusted_files.sealed(target, _FILES)
+    return (header, fingerprint) if fingerprint else (None, None)
+
+
+def warm_up(flags):
+    """Start building the precompiled header in the background (once per process)."""
+    global _building
+    if not CPP_PCH:
+        return
+    with _lock:
+        # A build thread started before a fork does not exist in the child; a failed
+        # build is not retried by the process that ran it
+        if _header or _building == os.getpid():
+            return
+        _building = os.getpid()
+
+    def run():
+        global _header, _fingerprint
+        header, fingerprint = _build(list(flags))
+        with _lock:
+            _header, _fingerprint = header, fingerprint
+
+    threading.Thread(target=run, name="cpp-pch-build", daemon=True).start()
+
+
+def flags_for(code, flags):
+    """Extra compiler flags to use the precompiled header for `code`, or [] if it does not apply.
+
+    Never waits for the build: until the header is ready submissions compile without it.
+    """
+    if not CPP_PCH:
+        return []
+    includes = set(_INCLUDE_RE.findall(code))
+    if not includes or not includes <= set(CPP_PCH_HEADERS) or includes <= _LIGHT_HEADERS:
+        return []
+    header = _header
+    if header is None or not intact():
+        warm_up(flags)
+        return []
+    return ["-include", header, "-Winvalid-pch"]
+
+
+def intact():
+    """Whether the header's files are still the ones that were sealed.
+
+    When they are not, the header is dropped and the next `flags_for` starts a rebuild.
+    """
+    global _header, _fingerprint, _building
+    with _lock:
+        header, fingerprint = _header, _fingerprint
+    if header is None:
+        return False
+    target = os.path.dirname(header)
+    if trusted_files.fingerprint([os.path.join(target, name) for name in _FILES]) == fingerprint:
+        return True
+    logging.warning("Precompiled header %s changed after it was built, rebuilding it", header)
+    with _lock:
+        if _header == header:
+            _header, _fingerprint, _building = None, None, None
+    return False
+
+
+def caused_by(diagnostics):
+    """Whether compiler diagnostics point into the precompiled header (a clash with
+    a name from a bundled header the submission did not include)."""
+    return "pch.hpp" in diagnostics
@@ -1,16 +1,30 @@
 import subprocess
 import os
 import re
-import tempfile
 import resource
+import time
+import select
+import selectors
+import threading
+import contextlib
+from concurrent.futures import ThreadPoolExecutor
 from .config import COMPILERS, validate_code
-from .security.sanitizer import sanitize_code
+from . import admission, compile_cache, cpp_pch, process_group, sandbox_spawn, java_harness, javac_daemon, output_limit, zygote, node_pool, workspace_pool
+from .output_limit import OutputLimitExceeded
+from .security.sanitizer import analyze_code
+from .security.inspector import java_class_name
 from .cheat import is_cheat_mode, make_all_passed_result
 
 MAX_MEMORY_MB = int(os.getenv("MAX_MEMORY_MB", 128))
 MAX_FILE_SIZE_MB = int(os.getenv("MAX_FILE_SIZE_MB", 1))
 MAX_OPEN_FILES = int(os.getenv("MAX_OPEN_FILES", 64))
 MAX_RUN_TIME = int(os.getenv("MAX_RUN_TIME", 5))
+PARALLEL_TESTS = os.getenv("PARALLEL_TESTS", "1") != "0"
+MAX_PARALLEL_TESTS = int(os.getenv("MAX_PARALLEL_TESTS", 4))
+
+# Compiler flags are part of the compile cache key, so keep them in one place
+C_CPP_FLAGS = []
+JAVAC_FLAGS = ["-J-XX:+TieredCompilation", "-J-XX:TieredStopAtLevel=1", "--release", "11"]
 
 def _java_env():
     """Build a clean environment for Java subprocesses, removing JAVA_TOOL_OPTIONS to prevent noise."""
@@ -27,20 +41,213 @@ def _clean_java_stderr(stderr):
     cleaned = [l for l in lines if not l.startswith("Picked up ")]
     return "".join(cleaned)
 
-def _sandbox_preexec(timeout, skip_memory=False):
-    """Set resource limits for child processes."""
-    def _set_limits():
+def _sandbox_limits(timeout, skip_memory=False):
+    """Resource limits for sandboxed children as (resource, value) pairs."""
+    limits = [
         # Limits for CPU time and file size
-        resource.setrlimit(resource.RLIMIT_FSIZE, (MAX_FILE_SIZE_MB * 1024 * 1024, MAX_FILE_SIZE_MB * 1024 * 1024))
-        resource.setrlimit(resource.RLIMIT_CPU, (timeout, timeout))
-        resource.setrlimit(resource.RLIMIT_NOFILE, (MAX_OPEN_FILES, MAX_OPEN_FILES))
-        
-        # Memory limit - skipped for Java as JVM manage its own heap/memory
-        if not skip_memory:
-            mem = MAX_MEMORY_MB * 1024 * 1024
-            resource.setrlimit(resource.RLIMIT_AS, (mem, mem))
-            
-    return _set_limits
+        (resource.RLIMIT_FSIZE, MAX_FILE_SIZE_MB * 1024 * 1024),
+        (resource.RLIMIT_CPU, timeout),
+        (resource.RLIMIT_NOFILE, MAX_OPEN_FILES),
+    ]
+    # Memory limit - skipped for Java as JVM manage its own heap/memory
+    if not skip_memory:
+        limits.append((resource.RLIMIT_AS, MAX_MEMORY_MB * 1024 * 1024))
+    return limits
+
+# First and longest interval between samples of a running child's peak RSS
+_RSS_SAMPLE_FIRST = 0.001
+_RSS_SAMPLE_MAX = 0.01
+
+def _vm_hwm_kb(pid):
+    """Peak resident set (VmHWM) of a running process in kB, None once it has exited."""
+    try:
+        with open(f"/proc/{pid}/status", "rb") as f:
+            for line in f:
+                if line.startswith(b"VmHWM:"):
+                    return int(line.split()[1])
+    except (OSError, ValueError):
+        pass
+    return None
+
+class _RusagePopen(subprocess.Popen):
+    """Popen for sandboxed runs: the child leads its own process group, which is
+    killed as a whole (see process_group), and its resource usage (os.wait4) is
+    kept when it is reaped. `limits` (see _sandbox_limits) are applied as the child
+    starts (see sandbox_spawn).
+
+    `peak_rss_kb` is the child's own peak. wait4's ru_maxrss cannot be taken as is:
+    exec carries the spawning worker's high-water mark over into it, so it is used
+    only when it is above this worker's peak. Otherwise the peak is the highest
+    VmHWM sampled while the child ran (see sample_rss), or None if no sample was taken.
+    """
+    rusage = None
+    peak_rss_kb = None
+
+    def __init__(self, cmd, limits=None, **kwargs):
+        if limits:
+            cmd, extra = sandbox_spawn.wrap(cmd, limits)
+            kwargs.update(extra)
+        super().__init__(cmd, start_new_session=True, **kwargs)
+        # Read after the exec, so it covers everything the child inherited
+        self._inherited_rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        self.sample_rss()
+
+    def sample_rss(self):
+        """Fold the child's current VmHWM into peak_rss_kb (until it is reaped)."""
+        if self.returncode is not None:
+            return
+        hwm = _vm_hwm_kb(self.pid)
+        if hwm is not None and (self.peak_rss_kb is None or hwm > self.peak_rss_kb):
+            self.peak_rss_kb = hwm
+
+    def kill(self):
+        # The group id stays reserved until the leader is reaped, so this cannot hit a reused pid
+        if self.returncode is None:
+            process_group.kill(self.pid)
+
+    def _try_wait(self, wait_flags):
+        self.sample_rss()
+        try:
+            # Wait for the exit without reaping, so the group can still be killed safely
+            if os.waitid(os.P_PID, self.pid, os.WEXITED | os.WNOWAIT | (wait_flags & os.WNOHANG)) is None:
+                return 0, 0
+            process_group.kill(self.pid)
+            pid, sts, rusage = os.wait4(self.pid, wait_flags)
+        except ChildProcessError:
+            return self.pid, 0
+        if pid:
+            self.rusage = rusage
+            # ru_maxrss is reported in kilobytes on Linux
+            if rusage.ru_maxrss > self._inherited_rss_kb:
+                self.peak_rss_kb = rusage.ru_maxrss
+            process_group.reap_leftovers(pid)
+        return pid, sts
+
+def _usage(wall_s, cpu_s=None, peak_rss_kb=None):
+    """Resource usage fields shared by test results."""
+    return {
+        "wall_time_ms": round(wall_s * 1000, 1),
+        "cpu_time_ms": None if cpu_s is None else round(cpu_s * 1000, 1),
+        "peak_rss_kb": peak_rss_kb,
+    }
+
+def _decode(data):
+    # Same newline translation as text=True, without failing on invalid UTF-8
+    return data.decode(errors="replace").replace("\r\n", "\n").replace("\r", "\n")
+
+def _pump(proc, input_data, deadline, caps):
+    """Feed stdin and drain stdout/stderr like communicate(), enforcing byte caps.
+
+    Raises TimeoutExpired at the deadline and OutputLimitExceeded as soon as a
+    stream outgrows its cap; the caller kills the child. Samples the child's peak
+    RSS in between, often at first and then every _RSS_SAMPLE_MAX seconds.
+    """
+    data = (input_data or "").encode()
+    offset = 0
+    chunks = {proc.stdout: bytearray(), proc.stderr: bytearray()}
+    limits = {proc.stdout: caps[0], proc.stderr: caps[1]}
+    with selectors.DefaultSelector() as sel:
+        sel.register(proc.stdout, selectors.EVENT_READ)
+        sel.register(proc.stderr, selectors.EVENT_READ)
+        if data:
+            sel.register(proc.stdin, selectors.EVENT_WRITE)
+        else:
+            proc.stdin.close()
+
+        interval = _RSS_SAMPLE_FIRST
+        sample_at = time.monotonic() + interval
+        while sel.get_map():
+            now = time.monotonic()
+            remaining = deadline - now
+            if remaining <= 0:
+                raise subprocess.TimeoutExpired(proc.args, 0)
+            if now >= sample_at:
+                proc.sample_rss()
+                interval = min(interval * 2, _RSS_SAMPLE_MAX)
+                sample_at = now + interval
+            for key, _ in sel.select(min(remaining, sample_at - now)):
+                if key.fileobj is proc.stdin:
+                    try:
+                        offset += os.write(key.fd, data[offset:offset + select.PIPE_BUF])
+                    except BrokenPipeError:
+                        offset = len(data)
+                    if offset >= len(data):
+                        sel.unregister(proc.stdin)
+                        proc.stdin.close()
+                    continue
+                chunk = os.read(key.fd, 1 << 16)
+                if not chunk:
+                    sel.unregister(key.fileobj)
+                    continue
+                buf = chunks[key.fileobj]
+                buf += chunk
+                if len(buf) > limits[key.fileobj]:
+                    raise OutputLimitExceeded("stdout" if key.fileobj is proc.stdout else "stderr")
+    return _decode(chunks[proc.stdout]), _decode(chunks[proc.stderr])
+
+def _measured_run(cmd, input=None, timeout=None, caps=None, **kwargs):
+    """subprocess.run(cmd, capture_output=True, text=True) that also measures the child.
+
+    Output is read incrementally and capped at `caps` = (stdout bytes, stderr bytes),
+    output_limit.caps() by default. Returns (CompletedProcess, usage). When the run
+    times out or exceeds a cap the child is killed immediately, and the raised
+    TimeoutExpired / OutputLimitExceeded carries the usage up to then as `.usage`.
+    """
+    started = time.monotonic()
+    deadline = started + timeout
+    with _RusagePopen(cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                      **kwargs) as proc:
+        try:
+            stdout, stderr = _pump(proc, input, deadline, caps or output_limit.caps())
+            proc.wait(timeout=max(deadline - time.monotonic(), 0))
+        except (subprocess.TimeoutExpired, OutputLimitExceeded) as e:
+            proc.kill()
+            proc.wait()
+            e.usage = _measured_usage(proc, started)
+            if isinstance(e, subprocess.TimeoutExpired):
+                e.timeout = timeout
+            raise
+        except BaseException:
+            proc.kill()
+            raise
+    return subprocess.CompletedProcess(cmd, proc.returncode, stdout, stderr), _measured_usage(proc, started)
+
+def _isolated_run(cmd, timeout, **kwargs):
+    """subprocess.run(cmd, capture_output=True, text=True, timeout=timeout) in its own process group.
+
+    On timeout the whole group is killed and TimeoutExpired carries the output read so far.
+    """
+    with _RusagePopen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, **kwargs) as proc:
+        try:
+            stdout, stderr = proc.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired as e:
+            proc.kill()
+            e.stdout, e.stderr = proc.communicate()
+            raise
+        except BaseException:
+            proc.kill()
+            raise
+    return subprocess.CompletedProcess(cmd, proc.returncode, stdout, stderr)
+
+def _measured_usage(proc, started):
+    ru = proc.rusage
+    if ru is None:
+        return _usage(time.monotonic() - started)
+    return _usage(time.monotonic() - started, ru.ru_utime + ru.ru_stime, proc.peak_rss_kb)
+
+def _with_totals(result):
+    """Add submission-wide usage totals over the result's test entries."""
+    tests = result["tests"]
+    cpu = [t["cpu_time_ms"] for t in tests if t.get("cpu_time_ms") is not None]
+    rss = [t["peak_rss_kb"] for t in tests if t.get("peak_rss_kb") is not None]
+    result["wall_time_ms"] = round(sum(t.get("wall_time_ms") or 0 for t in tests), 1)
+    result["cpu_time_ms"] = round(sum(cpu), 1) if cpu else None
+    result["peak_rss_kb"] = max(rss) if rss else None
+    return result
+
+def warm_up():
+    """Start background preparation that speeds up later executions (C++ precompiled header)."""
+    cpp_pch.warm_up(C_CPP_FLAGS)
 
 def execute_custom_code(code: str, lang: str) -> dict:
     """Execute raw code without test cases."""
@@ -51,117 +258,213 @@ def execute_custom_code(code: str, lang: str) -> dict:
     if lang not in COMPILERS:
         return {"status": "error", "stdout": "", "stderr": f"Unsupported language: {lang}"}
 
-    scan = sanitize_code(lang, code)
+    scan = analyze_code(lang, code)
     if not scan["safe"]:
         return {"status": "error", "stdout": "", "stderr": f"Code reject for execute due to {' and '.join(scan['violations'])}"}
+    if scan["syntax_error"]:
+        # What the interpreter would have printed, without starting it
+        return {"status": "success", "stdout": "", "stderr": scan["syntax_error"]}
 
     if lang in ["c", "cpp"]:
         return _run_c_cpp(code, lang)
     elif lang == "java":
-        return _run_java(code)
+        return _run_java(code, class_name=scan["class_name"])
     else:
         return _run_interpreted(code, lang)
 
-def execute_code(code: str, lang: str, tests: list, timeout: int = None, templates: dict = None, rules: dict = None) -> dict:
-    """Execute code against test cases with validation and templating."""
+def _test_workers(parallel, n_tests):
+    """Resolve how many test cases may run at once.
+
+    `parallel` comes from problem config. Test cases run one at a time unless the
+    problem opts in: True runs them on up to MAX_PARALLEL_TESTS workers, an int caps
+    the worker count for that problem. PARALLEL_TESTS=0 turns parallel runs off
+    for every problem.
+    """
+    if parallel is None or parallel is False or parallel == 0 or not PARALLEL_TESTS:
+        return 1
+    cap = MAX_PARALLEL_TESTS
+    if isinstance(parallel, int) and not isinstance(parallel, bool):
+        cap = min(cap, parallel)
+    return max(1, min(cap, os.cpu_count() or 1, n_tests))
+
+def _user_syntax_error(msg, lines_before, code):
+    """Point a syntax error of the templated program at the line of the user's code.
+
+    `lines_before` is how many template lines precede the code. Errors outside the
+    user's lines keep the program's line number.
+    """
+    def renumber(match):
+        line = int(match.group(1)) - lines_before
+        return f'File "main.py", line {line}' if 1 <= line <= code.count("\n") + 1 else match.group(0)
+    return re.sub(r'File "main\.py", line (\d+)', renumber, msg, count=1)
+
+def _emit(on_event, name, data):
+    """Report progress to a streaming caller. Returns False once the caller has cancelled."""
+    return on_event is None or on_event(name, data) is not False
+
+def execute_code(code: str, lang: str, tests: list, timeout: int = None, templates: dict = None, rules: dict = None, parallel=None, on_event=None) -> dict:
+    """Execute code against test cases with validation and templating.
+
+    `on_event(name, data)` receives a "compile" event and then one "test" event per
+    finished case, in order; returning False from it cancels the remaining cases.
+    """
     # --- Cheat mode: skip all execution and return all-passed ---
     if is_cheat_mode():
-        return make_all_passed_result(tests)
+        result = make_all_passed_result(tests)
+        for r in result["tests"]:
+            _emit(on_event, "test", r)
+        return result
 
     if timeout is None:
         timeout = MAX_RUN_TIME
     if lang not in COMPILERS:
         return {"status": "error", "msg": f"Unsupported language: {lang}"}
 
-    scan = sanitize_code(lang, code)
+    code_final = code
+    lines_before = 0
+    template = (templates or {}).get(lang)
+    if template and "__CODE_GOES_HERE__" in template:
+        code_final = template.replace("__CODE_GOES_HERE__", code)
+        lines_before = template[:template.index("__CODE_GOES_HERE__")].count("\n")
+
+    # Vet the program that runs, in one scan
+    scan = analyze_code(lang, code_final)
     if not scan["safe"]:
         return {"status": "error", "msg": f"Code reject for execute due to {' and '.join(scan['violations'])}"}
 
     if not validate_code(lang, code, rules or {}):
         return {"status": "error", "msg": "Code failed additional rules."}
-    
-    code_final = code
-    template = (templates or {}).get(lang)
-    if template and "__CODE_GOES_HERE__" in template:
-        code_final = template.replace("__CODE_GOES_HERE__", code)
 
+    if scan["syntax_error"]:
+        _emit(on_event, "compile", {"status": "failed"})
+        msg = scan["syntax_error"]
+        if lines_before:
+            msg = _user_syntax_error(msg, lines_before, code)
+        return {"status": "incorrect", "msg": msg}
+
+    workers = _test_workers(parallel, len(tests))
     if lang in ["c", "cpp"]:
-        return _run_c_cpp(code_final, lang, tests, timeout)
+        return _run_c_cpp(code_final, lang, tests, timeout, workers, on_event)
     elif lang == "java":
-        return _run_java(code_final, tests, timeout)
+        return _run_java(code_final, tests, timeout, workers, on_event, scan["class_name"])
     else:
-        return _run_interpreted(code_final, lang, tests, timeout)
+        return _run_interpreted(code_final, lang, tests, timeout, workers, on_event)
+
+_STALE_INPUT = "Compiler input changed during the build"
+
+def _compile(lang, code, cmd, cwd, timeout, flags, artifacts, env=None, intact=None):
+    """Compile in `cwd`, reusing cached artifacts for byte-identical inputs.
+
+    `artifacts` maps the build directory to the list of files worth caching.
+    `intact` is asked after the compile whether inputs from outside `cwd` are
+    unchanged; if not, the build is neither cached nor used (error msg _STALE_INPUT).
+    Returns (error_result or None, cache status: "hit" or "miss", compile time in ms).
+    """
+    started = time.monotonic()
+    elapsed = lambda: round((time.monotonic() - started) * 1000, 1)
+    key = compile_cache.make_key(lang, code, flags, compile_cache.toolchain_version(cmd[0]))
+    if compile_cache.lookup(key, cwd):
+        return None, "hit", elapsed()
+
+    try:
+        with admission.slot("compile"):
+            if lang == "java" and javac_daemon.JAVAC_DAEMON:
+                comp = javac_daemon.run(cmd, max(timeout, 20), cwd, env)
+            else:
+                comp = subprocess.run(
+                    cmd, capture_output=True, text=True, timeout=max(timeout, 20), cwd=cwd, env=env
+                )
+        if intact and not intact():
+            ms = elapsed()
+            return {"status": "error", "msg": _STALE_INPUT, "compile_cache": "miss", "compile_time_ms": ms}, "miss", ms
+        if comp.returncode:
+            msg = _clean_java_stderr(comp.stderr) if lang == "java" else comp.stderr
+            ms = elapsed()
+            return {"status": "incorrect", "msg": msg, "compile_cache": "miss", "compile_time_ms": ms}, "miss", ms
+    except subprocess.TimeoutExpired:
+        ms = elapsed()
+        return {"status": "error", "msg": "Compilation timed out", "compile_cache": "miss", "compile_time_ms": ms}, "miss", ms
+
+    compile_cache.store(key, cwd, artifacts(cwd))
+    return None, "miss", elapsed()
 
-def _run_c_cpp(code, lang, tests=None, timeout=None):
+def _run_c_cpp(code, lang, tests=None, timeout=None, workers=1, on_event=None):
     """Compile and run C/C++ code."""
     if timeout is None:
         timeout = MAX_RUN_TIME
     cfg = COMPILERS[lang]
-    with tempfile.TemporaryDirectory() as d:
+    with workspace_pool.lease() as d:
         src = os.path.join(d, f"main{cfg['extension']}")
         exe = os.path.join(d, "main")
         
         with open(src, 'w') as f:
             f.write(code)
             
-        try:
-            comp = subprocess.run(
-                [cfg['compiler'], src, "-o", exe], 
-                capture_output=True, text=True, timeout=max(timeout, 20), cwd=d
+        pch = cpp_pch.flags_for(code, C_CPP_FLAGS) if lang == "cpp" else []
+        err, cache, compile_ms = _compile(
+            lang, code, [cfg['compiler']] + pch + [src, "-o", exe] + C_CPP_FLAGS, d, timeout,
+            C_CPP_FLAGS + pch, lambda _: ["main"], intact=cpp_pch.intact if pch else None
+        )
+        if err and pch and (err["msg"] == _STALE_INPUT or cpp_pch.caused_by(err["msg"])):
+            # The bundled headers can clash with a submission's own names, and a
+            # header that changed mid-compile is rebuilt; compile plainly, exactly
+            # as without the header
+            first_ms = compile_ms
+            err, cache, compile_ms = _compile(
+                lang, code, [cfg['compiler'], src, "-o", exe] + C_CPP_FLAGS, d, timeout,
+                C_CPP_FLAGS, lambda _: ["main"]
             )
-            if comp.returncode:
-                return {"status": "incorrect", "msg": comp.stderr}
-        except subprocess.TimeoutExpired:
-            return {"status": "error", "msg": "Compilation timed out"}
-
-        if tests is None:
-            try:
-                res = subprocess.run(
-                    [exe], capture_output=True, text=True, 
-                    timeout=timeout, cwd=d, preexec_fn=_sandbox_preexec(timeout)
-                )
-                return {"status": "success", "stdout": res.stdout, "stderr": res.stderr}
-            except subprocess.TimeoutExpired:
-                return {"status": "error", "msg": "Execution timed out"}
+            compile_ms = round(compile_ms + first_ms, 1)
+            if err:
+                err["compile_time_ms"] = compile_ms
+        build = {"compile_cache": cache, "compile_time_ms": compile_ms}
+        _emit(on_event, "compile", {"status": "failed" if err else "success", **build})
+        if err:
+            return err
+
+        # One slot per sandbox running at once
+        with admission.slots("run", workers if tests else 1) as workers:
+            if tests is None:
+                try:
+                    res, _ = _measured_run(
+                        [exe], timeout=timeout, cwd=d, limits=_sandbox_limits(timeout)
+                    )
+                    return {"status": "success", "stdout": res.stdout, "stderr": res.stderr, **build}
+                except subprocess.TimeoutExpired:
+                    return {"status": "error", "msg": "Execution timed out", **build}
+                except OutputLimitExceeded:
+                    return {"status": "error", "msg": output_limit.MESSAGE, **build}
             
-        return _run_tests([exe], tests, timeout, cwd=d)
+            return {**_run_tests([exe], tests, timeout, cwd=d, workers=workers, on_event=on_event), **build}
+
+def _run_java(code, tests=None, timeout=None, workers=1, on_event=None, class_name=None):
+    """Compile and run Java code.
 
-def _run_java(code, tests=None, timeout=None):
-    """Compile and run Java code."""
+    `class_name` comes from the sanitizer's parse; without it the class is found by
+    scanning the source.
+    """
     if timeout is None:
         timeout = MAX_RUN_TIME
-    # Strip comments to safely detect class name
-    code_clean = re.sub(r'//.*?$', '', code, flags=re.MULTILINE)
-    code_clean = re.sub(r'/\*.*?\*/', '', code_clean, flags=re.DOTALL)
-    
-    match = re.search(r'public\s+(?:abstract|final|static|strictfp\s+)*class\s+(\w+)', code_clean)
-    if not match:
-        match = re.search(r'(?:public\s+)?(?:(?:abstract|final|static|strictfp)\s+)*class\s+(\w+)', code_clean)
-    if not match:
+    class_name = class_name or java_class_name(code)
+    if not class_name:
         return {"status": "error", "msg": "Java class not found."}
-        
-    class_name = match.group(1)
     
-    with tempfile.TemporaryDirectory() as d:
+    with workspace_pool.lease() as d:
         src = os.path.join(d, f"{class_name}.java")
         with open(src, 'w') as f:
             f.write(code)
             
         java_env = _java_env()
-        try:
-            # Compile with --release 11 for broad compatibility and fast startup
-            comp = subprocess.run([
-                "javac",
-                "-J-XX:+TieredCompilation",
-                "-J-XX:TieredStopAtLevel=1",
-                "--release", "11",
-                src, "-d", d
-            ], capture_output=True, text=True, timeout=max(timeout, 20), cwd=d,
-               env=java_env)
-            if comp.returncode:
-                return {"status": "incorrect", "msg": _clean_java_stderr(comp.stderr)}
-        except subprocess.TimeoutExpired:
-            return {"status": "error", "msg": "Compilation timed out"}
+        # Compile with --release 11 for broad compatibility and fast startup
+        err, cache, compile_ms = _compile(
+            "java", code, ["javac"] + JAVAC_FLAGS + [src, "-d", d], d, timeout,
+            JAVAC_FLAGS, lambda out: [n for n in os.listdir(out) if n.endswith(".class")],
+            env=java_env
+        )
+        build = {"compile_cache": cache, "compile_time_ms": compile_ms}
+        _emit(on_event, "compile", {"status": "failed" if err else "success", **build})
+        if err:
+            return err
 
         # Optimized JVM startup arguments (removed deprecated -noverify)
         cmd = [
@@ -173,70 +476,250 @@ def _run_java(code, tests=None, timeout=None):
             "-XX:TieredStopAtLevel=1",
             class_name
         ]
-        if tests is None:
-            try:
-                res = subprocess.run(
-                    cmd, capture_output=True, text=True, 
-                    timeout=timeout, cwd=d, env=java_env,
-                    preexec_fn=_sandbox_preexec(timeout, skip_memory=True)
-                )
-                return {"status": "success", "stdout": res.stdout, "stderr": _clean_java_stderr(res.stderr)}
-            except subprocess.TimeoutExpired:
-                return {"status": "error", "msg": "Execution timed out"}
+        # The harness runs every case in one JVM
+        lanes = 1 if tests is None or java_harness.JAVA_HARNESS else workers
+        with admission.slots("run", lanes) as workers:
+            if tests is None:
+                try:
+                    res, _ = _measured_run(
+                        cmd, timeout=timeout, cwd=d, env=java_env,
+                        limits=_sandbox_limits(timeout, skip_memory=True)
+                    )
+                    return {"status": "success", "stdout": res.stdout, "stderr": _clean_java_stderr(res.stderr), **build}
+                except subprocess.TimeoutExpired:
+                    return {"status": "error", "msg": "Execution timed out", **build}
+                except OutputLimitExceeded:
+                    return {"status": "error", "msg": output_limit.MESSAGE, **build}
             
-        return _run_tests(cmd, tests, timeout, cwd=d, skip_memory=True, env=java_env)
+            if java_harness.JAVA_HARNESS:
+                classpath = java_harness.harness_classpath(java_env)
+                if classpath:
+                    run_rest = lambda rest: _run_tests(cmd, rest, timeout, cwd=d, skip_memory=True, env=java_env)
+                    res = _run_java_harness(classpath, class_name, tests, timeout, d, java_env, on_event, run_rest)
+                    return {**res, **build}
+
+            return {**_run_tests(cmd, tests, timeout, cwd=d, skip_memory=True, env=java_env, workers=workers, on_event=on_event), **build}
+
+def _run_java_harness(classpath, class_name, tests, timeout, d, java_env, on_event=None, run_rest=None):
+    """Run every test case inside one JVM (see java/Harness.java).
+
+    The harness enforces the per-test timeout and output caps itself and halts after
+    the first timeout, so results and short-circuiting match `_run_tests`. When it
+    stops early because a case called System.exit or left threads running, the
+    remaining cases go to `run_rest(tests)` (one JVM per case).
+    """
+    for i, t in enumerate(tests, 1):
+        with open(os.path.join(d, f"in_{i}.txt"), 'w') as f:
+            f.write(t['input'])
+    with open(os.path.join(d, "caps.txt"), 'w') as f:
+        f.writelines("%d %d\n" % output_limit.caps(t['expected_output']) for t in tests)
+
+    cmd = [
+        "java",
+        "-cp", classpath,
+        f"-Xmx{MAX_MEMORY_MB}m",
+        f"-Xms32m",
+        "-XX:+TieredCompilation",
+        "-XX:TieredStopAtLevel=1",
+        "Harness", class_name, d, str(len(tests)), str(timeout * 1000)
+    ]
+    # One JVM pays for every test, so the budgets cover all of them plus startup
+    budget = timeout * (len(tests) + 1)
+    try:
+        r = _isolated_run(
+            cmd, budget, cwd=d, env=java_env, limits=_sandbox_limits(budget, skip_memory=True)
+        )
+        lines, crash, returncode = r.stdout.splitlines(), _clean_java_stderr(r.stderr), r.returncode
+    except subprocess.TimeoutExpired as e:
+        out = e.stdout or ""
+        if isinstance(out, bytes):
+            out = out.decode(errors="replace")
+        lines, crash, returncode = out.splitlines(), "Timeout", None
+
+    outcomes, usages, stopped = {}, {}, None
+    for line in lines:
+        parts = line.split()
+        if len(parts) == 5 and parts[0] == "CASE":
+            outcomes[int(parts[1])] = parts[2]
+            cpu_ns = int(parts[4])
+            # Memory is shared by the whole JVM, so there is no per-test peak
+            usages[int(parts[1])] = _usage(int(parts[3]) / 1e9, cpu_ns / 1e9 if cpu_ns >= 0 else None)
+        elif len(parts) == 3 and parts[0] == "EXIT" and returncode is not None:
+            # System.exit: the JVM's exit status is the case's
+            outcomes[int(parts[1])] = str(returncode)
+            usages[int(parts[1])] = _usage(int(parts[2]) / 1e9)
+            stopped = int(parts[1])
+        elif len(parts) == 2 and parts[0] == "STRAY":
+            stopped = int(parts[1])
+
+    results, status, msg = [], "correct", "All tests passed!"
+    for i, t in enumerate(tests, 1):
+        if stopped is not None and i > stopped and run_rest:
+            rest = run_rest(tests[i - 1:])
+            results += rest["tests"]
+            if rest["status"] == "timeout" or status == "correct":
+                status, msg = rest["status"], rest["msg"]
+            break
+        outcome = outcomes.get(i)
+        if outcome is None:
+            # The JVM died (or hit the overall budget) while running this case
+            if crash == "Timeout":
+                results.append(_timeout_result(t, _usage(timeout)))
+                status, msg = "timeout", "Time Limit Exceeded"
+            else:
+                results.append({**_judge(t, 1, "", crash), **_usage(0)})
+                status, msg = "incorrect", "Some tests failed."
+            break
+        if outcome == "TIMEOUT":
+            results.append(_timeout_result(t, usages[i]))
+            status, msg = "timeout", "Time Limit Exceeded"
+            break
+
+        stdout_cap, stderr_cap = output_limit.caps(t['expected_output'])
+        out_path, err_path = os.path.join(d, f"out_{i}.txt"), os.path.join(d, f"err_{i}.txt")
+        if outcome == "OUTPUT" or os.path.getsize(out_path) > stdout_cap or os.path.getsize(err_path) > stderr_cap:
+            results.append(_output_limit_result(t, usages[i]))
+            status, msg = "incorrect", "Some tests failed."
+            continue
+        with open(out_path, errors="replace") as f:
+            out = f.read()
+        with open(err_path, errors="replace") as f:
+            err = f.read()
+        res = {**_judge(t, int(outcome), out, err), **usages[i]}
+        results.append(res)
+        if res["status"] == "failed":
+            status, msg = "incorrect", "Some tests failed."
+
+    # The JVM reports all cases at once, so there is nothing left to cancel
+    for res in results:
+        _emit(on_event, "test", res)
+    return _with_totals({"status": status, "msg": msg, "tests": results})
 
-def _run_interpreted(code, lang, tests=None, timeout=None):
+def _run_interpreted(code, lang, tests=None, timeout=None, workers=1, on_event=None):
     """Run interpreted languages like Python/JS."""
     if timeout is None:
         timeout = MAX_RUN_TIME
     cfg = COMPILERS[lang]
-    with tempfile.TemporaryDirectory() as d:
+    with workspace_pool.lease() as d, contextlib.ExitStack() as stack:
         src = os.path.join(d, f"main{cfg['extension']}")
         with open(src, 'w') as f:
             f.write(code)
             
         cmd = [cfg['interpreter'], src]
-        if tests is None:
-            try:
-                res = subprocess.run(
-                    cmd, capture_output=True, text=True, 
-                    timeout=timeout, cwd=d, preexec_fn=_sandbox_preexec(timeout)
-                )
-                return {"status": "success", "stdout": res.stdout, "stderr": res.stderr}
-            except subprocess.TimeoutExpired:
-                return {"status": "error", "msg": "Execution timed out"}
+        backend = None
+        if lang == "python" and zygote.PYTHON_BACKEND == "zygote":
+            backend = lambda stdin, caps: zygote.run(src, d, stdin, timeout, _sandbox_limits(timeout), caps)
+        elif lang == "javascript" and node_pool.JAVASCRIPT_BACKEND == "pool":
+            # Runners serve this submission's cases; the extra second covers node's own startup
+            runners = stack.enter_context(node_pool.session(_sandbox_limits(timeout + 1)))
+            backend = lambda stdin, caps: runners.run(code, stdin, timeout, caps)
+
+        _emit(on_event, "compile", {"status": "skipped"})
+        with admission.slots("run", workers if tests else 1) as workers:
+            if tests is None:
+                try:
+                    if backend:
+                        _, stdout, stderr, _ = backend("", output_limit.caps())
+                        return {"status": "success", "stdout": stdout, "stderr": stderr}
+                    res, _ = _measured_run(
+                        cmd, timeout=timeout, cwd=d, limits=_sandbox_limits(timeout)
+                    )
+                    return {"status": "success", "stdout": res.stdout, "stderr": res.stderr}
+                except subprocess.TimeoutExpired:
+                    return {"status": "error", "msg": "Execution timed out"}
+                except OutputLimitExceeded:
+                    return {"status": "error", "msg": output_limit.MESSAGE}
             
-        return _run_tests(cmd, tests, timeout, cwd=d)
+            run_case = (lambda t: _run_backend_case(backend, t)) if backend else None
+            return _run_tests(cmd, tests, timeout, cwd=d, workers=workers, run_case=run_case, on_event=on_event)
+
+def _run_backend_case(backend, t):
+    """Run a single test case through a warm backend (zygote, Node pool)."""
+    started = time.monotonic()
+    try:
+        returncode, stdout, stderr, usage = backend(t['input'], output_limit.caps(t['expected_output']))
+    except subprocess.TimeoutExpired:
+        return _timeout_result(t, _usage(time.monotonic() - started)), True
+    except OutputLimitExceeded:
+        return _output_limit_result(t, _usage(time.monotonic() - started)), False
+    res = _judge(t, returncode, stdout, stderr)
+    res.update(_usage(time.monotonic() - started, usage.get("cpu_s"), usage.get("peak_rss_kb")))
+    return res, False
+
+def _run_test_case(cmd_base, t, timeout, cwd=None, skip_memory=False, env=None):
+    """Run a single test case. Returns (result, timed_out)."""
+    try:
+        run_kwargs = dict(
+            input=t['input'], timeout=timeout, cwd=cwd,
+            caps=output_limit.caps(t['expected_output']),
+            limits=_sandbox_limits(timeout, skip_memory)
+        )
+        if env:
+            run_kwargs['env'] = env
+        r, usage = _measured_run(cmd_base, **run_kwargs)
+        return {**_judge(t, r.returncode, r.stdout, r.stderr), **usage}, False
+
+    except subprocess.TimeoutExpired as e:
+        return _timeout_result(t, e.usage), True
+    except OutputLimitExceeded as e:
+        return _output_limit_result(t, e.usage), False
+
+def _judge(t, returncode, stdout, stderr):
+    """Build the result entry for one finished test case."""
+    out, err = stdout.strip(), stderr.strip()
+
+    # Simple correctness check
+    is_correct = not returncode and out == t['expected_output'].strip()
+    s = "passed" if is_correct else "failed"
+    m = "Test passed." if is_correct else f"Expected '{t['expected_output'].strip()}', got '{out}'"
+
+    return {"case": int(t['test_number']), "status": s, "msg": m, "stdout": out, "stderr": err, "exit_code": returncode}
+
+def _output_limit_result(t, usage):
+    m = output_limit.MESSAGE
+    return {"case": int(t['test_number']), "status": "failed", "msg": m, "stdout": "", "stderr": m, "exit_code": None, **usage}
+
+def _timeout_result(t, usage=None):
+    res = {"case": int(t['test_number']), "status": "failed", "msg": "Timeout", "stdout": "", "stderr": "Timeout", "exit_code": None}
+    return {**res, **(usage or _usage(0))}
+
+def _run_tests(cmd_base, tests, timeout, cwd=None, skip_memory=False, env=None, workers=1, run_case=None, on_event=None):
+    """Run code against multiple test cases, up to `workers` at a time.
+
+    Results keep test order and stop at the first timeout, exactly like a serial run;
+    cases queued behind a timeout are cancelled. `run_case` replaces the default
+    one-process-per-case runner for alternative backends; `on_event` gets each
+    result as soon as it is final and may cancel the rest.
+    """
+    def run_one(t):
+        if run_case:
+            return run_case(t)
+        return _run_test_case(cmd_base, t, timeout, cwd, skip_memory, env)
+
+    pool = None
+    if workers > 1 and len(tests) > 1:
+        stop = threading.Event()
+        pool = ThreadPoolExecutor(max_workers=workers)
+        futures = [pool.submit(lambda t: None if stop.is_set() else run_one(t), t) for t in tests]
+        outcomes = (f.result() for f in futures)
+    else:
+        outcomes = (run_one(t) for t in tests)
 
-def _run_tests(cmd_base, tests, timeout, cwd=None, skip_memory=False, env=None):
-    """Run code against multiple test cases."""
     results, status, msg = [], "correct", "All tests passed!"
-    for t in tests:
-        try:
-            run_kwargs = dict(
-                input=t['input'], capture_output=True,
-                text=True, timeout=timeout, cwd=cwd,
-                preexec_fn=_sandbox_preexec(timeout, skip_memory)
-            )
-            if env:
-                run_kwargs['env'] = env
-            r = subprocess.run(cmd_base, **run_kwargs)
-            out, err = r.stdout.strip(), r.stderr.strip()
-            
-            # Simple correctness check
-            is_correct = not r.returncode and out == t['expected_output'].strip()
-            s = "passed" if is_correct else "failed"
-            m = "Test passed." if is_correct else f"Expected '{t['expected_output'].strip()}', got '{out}'"
-            
-            if s == "failed":
+    try:
+        for res, timed_out in outcomes:
+            results.append(res)
+            if not _emit(on_event, "test", res):
+                status, msg = "cancelled", "Execution cancelled."
+                break
+            if timed_out:
+                status, msg = "timeout", "Time Limit Exceeded"
+                break
+            if res["status"] == "failed":
                 status, msg = "incorrect", "Some tests failed."
-                
-            results.append({"case": int(t['test_number']), "status": s, "msg": m, "stdout": out, "stderr": err})
-            
-        except subprocess.TimeoutExpired:
-            results.append({"case": int(t['test_number']), "status": "failed", "msg": "Timeout", "stdout": "", "stderr": "Timeout"})
-            status, msg = "timeout", "Time Limit Exceeded"
-            break
-            
-    return {"status": status, "msg": msg, "tests": results}
+    finally:
+        if pool:
+            stop.set()
+            pool.shutdown(wait=True, cancel_futures=True)
+
+    return _with_totals({"status": status, "msg": msg, "tests": results})
@@ -0,0 +1,48 @@
+import java.io.BufferedOutputStream;
+import java.io.BufferedReader;
+import java.io.ByteArrayOutputStream;
+import java.io.FileDescriptor;
+import java.io.FileOutputStream;
+import java.io.InputStreamReader;
+import java.io.OutputStream;
+import java.io.PrintStream;
+import java.nio.charset.StandardCharsets;
+import javax.tools.JavaCompiler;
+import javax.tools.ToolProvider;
+
+/**
+ * Long-lived javac for the Java compile daemon (see core/javac_daemon.py).
+ *
+ * Reads one compile request per line on stdin: the javac arguments separated by
+ * tabs (paths are absolute, the server's working directory is irrelevant).
+ * For each request it runs the in-process compiler and answers on stdout with a
+ * header line "<exit code> <byte count>" followed by exactly that many bytes of
+ * diagnostics, formatted as the javac launcher would print them on stderr.
+ * The server exits when stdin is closed.
+ */
+public final class CompileServer {
+    public static void main(String[] args) throws Exception {
+        JavaCompiler javac = ToolProvider.getSystemJavaCompiler();
+        OutputStream replies = new BufferedOutputStream(new FileOutputStream(FileDescriptor.out));
+        // Nothing but replies may reach the real stdout
+        System.setOut(new PrintStream(new FileOutputStream(FileDescriptor.err), true));
+
+        BufferedReader requests = new BufferedReader(new InputStreamReader(System.in, StandardCharsets.UTF_8));
+        String line;
+        while ((line = requests.readLine()) != null) {
+            String[] argv = line.isEmpty() ? new String[0] : line.split("\t", -1);
+            ByteArrayOutputStream diagnostics = new ByteArrayOutputStream();
+            int code;
+            try {
+                code = javac.run(null, diagnostics, diagnostics, argv);
+            } catch (Throwable t) {
+                t.printStackTrace(new PrintStream(diagnostics, true, "UTF-8"));
+                code = 4;
+            }
+            byte[] body = diagnostics.toByteArray();
+            replies.write((code + " " + body.length + "\n").getBytes(StandardCharsets.UTF_8));
+            replies.write(body);
+            replies.flush();
+        }
+    }
+}
@@ -0,0 +1,220 @@
+import java.io.ByteArrayInputStream;
+import java.io.ByteArrayOutputStream;
+import java.io.InputStream;
+import java.io.OutputStream;
+import java.io.PrintStream;
+import java.lang.management.ManagementFactory;
+import java.lang.reflect.InvocationTargetException;
+import java.lang.reflect.Method;
+import java.net.URL;
+import java.net.URLClassLoader;
+import java.nio.file.Files;
+import java.nio.file.Path;
+import java.nio.file.Paths;
+import java.util.List;
+
+/**
+ * Runs every test case of one Java submission inside a single JVM.
+ *
+ * Usage: java -cp <harness dir> Harness <class name> <work dir> <test count> <timeout ms>
+ *
+ * For test i the harness reads in_i.txt from the work dir, loads the submission
+ * in a fresh class loader (so static state never leaks between tests), swaps
+ * System.in/out/err for in-memory streams and invokes main on a dedicated thread
+ * in a thread group of its own. Like a plain `java` run, the case ends once every
+ * non-daemon thread it started has ended. Captured output is written to
+ * out_i.txt / err_i.txt and a status line
+ * "CASE <i> <exit code|TIMEOUT|OUTPUT> <wall ns> <cpu ns>" is printed on the real
+ * stdout (cpu is the main thread's user+sys time, -1 when unknown).
+ *
+ * caps.txt holds "<stdout bytes> <stderr bytes>" per test. A stream is kept only
+ * up to its cap: the write that crosses it throws OutputLimitError into the
+ * submission and the case is reported as OUTPUT.
+ *
+ * The JVM halts right after the first timeout since the runaway thread cannot be
+ * stopped safely. It also halts, after printing "STRAY <i>", when threads of case
+ * i are still running once it is over (daemon threads, or a main thread that
+ * swallowed OutputLimitError): they would write into the next case's streams.
+ * A submission that calls System.exit ends the JVM; a shutdown hook saves the
+ * case's output and prints "EXIT <i> <wall ns>", and the exit status is the JVM's.
+ * The caller runs the cases after a STRAY or EXIT line on their own.
+ */
+public final class Harness {
+    /** Thrown into the submission by the write that crosses a stream's cap. */
+    static final class OutputLimitError extends Error {
+        OutputLimitError() {
+            super("Output limit exceeded", null, false, false);
+        }
+    }
+
+    /** In-memory stream that keeps at most `cap` bytes. */
+    static final class CappedStream extends OutputStream {
+        private final ByteArrayOutputStream kept = new ByteArrayOutputStream();
+        private final long cap;
+        private volatile boolean exceeded;
+
+        CappedStream(long cap) {
+            this.cap = cap;
+        }
+
+        @Override
+        public void write(int b) {
+            write(new byte[] {(byte) b}, 0, 1);
+        }
+
+        @Override
+        public synchronized void write(byte[] b, int off, int len) {
+            if (exceeded || kept.size() + (long) len > cap) {
+                exceeded = true;
+                throw new OutputLimitError();
+            }
+            kept.write(b, off, len);
+        }
+
+        boolean exceeded() {
+            return exceeded;
+        }
+
+        synchronized byte[] toByteArray() {
+            return kept.toByteArray();
+        }
+    }
+
+    /** The case that is running, for the System.exit shutdown hook. */
+    static final class Case {
+        final int index;
+        final long started = System.nanoTime();
+        final CappedStream out;
+        final CappedStream err;
+
+        Case(int index, CappedStream out, CappedStream err) {
+            this.index = index;
+            this.out = out;
+            this.err = err;
+        }
+
+        void save(Path work) throws java.io.IOException {
+            Files.write(work.resolve("out_" + index + ".txt"), out.toByteArray());
+            Files.write(work.resolve("err_" + index + ".txt"), err.toByteArray());
+        }
+    }
+
+    private static volatile Case current;
+
+    /** Live threads of `group`; only non-daemon ones unless `all`. */
+    private static Thread[] live(ThreadGroup group, boolean all) {
+        Thread[] threads = new Thread[group.activeCount() + 16];
+        int n = group.enumerate(threads, true);
+        int kept = 0;
+        for (int j = 0; j < n; j++) {
+            if (threads[j].isAlive() && (all || !threads[j].isDaemon())) {
+                threads[kept++] = threads[j];
+            }
+        }
+        return java.util.Arrays.copyOf(threads, kept);
+    }
+
+    public static void main(String[] args) throws Exception {
+        String className = args[0];
+        Path work = Paths.get(args[1]);
+        int count = Integer.parseInt(args[2]);
+        long timeoutMs = Long.parseLong(args[3]);
+        URL[] classpath = { work.toUri().toURL() };
+        // Read before any case runs: the submission can write to the work dir
+        List<String> caps = Files.readAllLines(work.resolve("caps.txt"));
+
+        PrintStream realOut = System.out;
+        PrintStream realErr = System.err;
+        InputStream realIn = System.in;
+
+        Runtime.getRuntime().addShutdownHook(new Thread(() -> {
+            // Only System.exit gets here: the harness itself always halts
+            Case c = current;
+            if (c == null) {
+                return;
+            }
+            try {
+                c.save(work);
+            } catch (Exception e) {
+                return;
+            }
+            realOut.println("EXIT " + c.index + " " + (System.nanoTime() - c.started));
+            realOut.flush();
+        }));
+
+        for (int i = 1; i <= count; i++) {
+            byte[] input = Files.readAllBytes(work.resolve("in_" + i + ".txt"));
+            String[] cap = caps.get(i - 1).trim().split(" ");
+            CappedStream out = new CappedStream(Long.parseLong(cap[0]));
+            CappedStream err = new CappedStream(Long.parseLong(cap[1]));
+            PrintStream outStream = new PrintStream(out, true);
+            PrintStream errStream = new PrintStream(err, true);
+            int[] exit = {0};
+            long[] cpuNs = {-1};
+
+            URLClassLoader loader = new URLClassLoader(classpath, ClassLoader.getPlatformClassLoader());
+            ThreadGroup group = new ThreadGroup("case-" + i);
+            Thread runner = new Thread(group, () -> {
+                try {
+                    Class<?> cls = Class.forName(className, true, loader);
+                    Method main = cls.getMethod("main", String[].class);
+                    main.invoke(null, (Object) new String[0]);
+                } catch (InvocationTargetException e) {
+                    exit[0] = 1;
+                    errStream.print("Exception in thread \"main\" ");
+                    e.getCause().printStackTrace(errStream);
+                } catch (Throwable e) {
+                    exit[0] = 1;
+                    e.printStackTrace(errStream);
+                } finally {
+                    cpuNs[0] = ManagementFactory.getThreadMXBean().getCurrentThreadCpuTime();
+                }
+            }, "main");
+            runner.setContextClassLoader(loader);
+
+            System.setIn(new ByteArrayInputStream(input));
+            System.setOut(outStream);
+            System.setErr(errStream);
+            Case c = new Case(i, out, err);
+            current = c;
+            long deadline = c.started + timeoutMs * 1_000_000L;
+            runner.start();
+            // Wait for main and every non-daemon thread it started, up to the deadline
+            Thread[] waiting = { runner };
+            while (waiting.length > 0) {
+                long left = (deadline - System.nanoTime()) / 1_000_000L;
+                if (left <= 0) {
+                    break;
+                }
+                waiting[0].join(left);
+                waiting = live(group, false);
+            }
+            long wallNs = System.nanoTime() - c.started;
+            boolean timedOut = waiting.length > 0;
+            if (!timedOut) {
+                // Already over; makes its exit code and cpu time visible here
+                runner.join();
+            }
+            boolean stray = live(group, true).length > 0;
+            current = null;
+            System.setOut(realOut);
+            System.setErr(realErr);
+            System.setIn(realIn);
+
+            c.save(work);
+            String outcome = out.exceeded() || err.exceeded() ? "OUTPUT"
+                : timedOut ? "TIMEOUT" : String.valueOf(exit[0]);
+            realOut.println("CASE " + i + " " + outcome + " " + wallNs + " " + cpuNs[0]);
+            if (stray && !outcome.equals("TIMEOUT")) {
+                realOut.println("STRAY " + i);
+            }
+            realOut.flush();
+            if (stray) {
+                Runtime.getRuntime().halt(0);
+            }
+            loader.close();
+        }
+        // Stray non-daemon threads from the submission must not keep the JVM alive
+        Runtime.getRuntime().halt(0);
+    }
+}
@@ -0,0 +1,112 @@
+"""
+Build support for the Java helper classes in java/: the single-JVM test harness
+(Harness.java) and the javac daemon (CompileServer.java, see javac_daemon.py).
+
+They are compiled once per source revision into JAVA_HARNESS_DIR and the
+resulting directory is put on the classpath of every helper JVM. Like the C++
+precompiled header (see cpp_pch), the build is private to the service and sealed
+(see trusted_files); `harness_classpath` checks the class files' fingerprint on
+every call and rebuilds them when they changed.
+"""
+import os
+import time
+import hashlib
+import logging
+import tempfile
+import threading
+import subprocess
+import shutil
+from . import trusted_files
+
+JAVA_HARNESS = os.getenv("JAVA_HARNESS", "0") != "0"
+JAVA_HARNESS_DIR = os.getenv("JAVA_HARNESS_DIR", os.path.join(trusted_files.STATE_DIR, "java-harness"))
+
+_JAVA_SRC_DIR = os.path.join(os.path.dirname(__file__), "java")
+_SOURCES = [os.path.join(_JAVA_SRC_DIR, name) for name in ("Harness.java", "CompileServer.java")]
+# After a failed build, callers get None without retrying for this long
+_RETRY_AFTER = 300.0
+_lock = threading.Lock()
+_classpath = None
+_sealed = None  # (class file names, fingerprint) of _classpath
+_retry_at = 0.0
+
+
+def harness_classpath(env=None):
+    """Return the directory holding the helper classes, compiling them on first use.
+
+    Returns None when they cannot be built, so callers can fall back to one JVM
+    per test case and to the plain javac launcher. A failed build is retried at
+    most every _RETRY_AFTER seconds, so a broken javac does not hold up every
+    Java submission behind the lock.
+    """
+    global _classpath, _sealed, _retry_at
+    with _lock:
+        if _classpath:
+            names, fingerprint = _sealed
+            if trusted_files.fingerprint([os.path.join(_classpath, n) for n in names]) == fingerprint:
+                return _classpath
+            logging.warning("Java helper classes in %s changed after they were built, rebuilding them", _classpath)
+            _classpath = None
+        if time.monotonic() < _retry_at:
+            return None
+        built = _build(env)
+        if not built:
+            _retry_at = time.monotonic() + _RETRY_AFTER
+            return None
+        _classpath, _sealed = built[0], built[1:]
+        return _classpath
+
+
+def _classes(directory):
+    return sorted(n for n in os.listdir(directory) if n.endswith(".class"))
+
+
+def _check(target):
+    """(class file names, fingerprint) of the sealed build in `target`, or None."""
+    try:
+        names = _classes(target)
+    except OSError:
+        return None
+    fingerprint = trusted_files.sealed(target, names) if names else None
+    return (names, fingerprint) if fingerprint else None
+
+
+def _build(env):
+    """Compile the helper classes unless this revision is built already.
+
+    Returns (directory, class file names, fingerprint), or None.
+    """
+    digest = hashlib.sha256()
+    for path in _SOURCES:
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    digest = digest.hexdigest()[:16]
+    target = os.path.join(JAVA_HARNESS_DIR, f"{digest}-{trusted_files.KEY_OWNER}")
+
+    staging = None
+    try:
+        trusted_files.private_dir(JAVA_HARNESS_DIR)
+        trusted_files.remove_stale(JAVA_HARNESS_DIR)
+        sealed = _check(target)
+        if sealed:
+            return (target, *sealed)
+        # Not built yet, or altered since it was sealed
+        shutil.rmtree(target, ignore_errors=True)
+        staging = tempfile.mkdtemp(prefix=".staging-", suffix=f"-{trusted_files.KEY_OWNER}", dir=JAVA_HARNESS_DIR)
+        comp = subprocess.run(
+            ["javac", "--release", "11", "-d", staging, *_SOURCES],
+            capture_output=True, text=True, timeout=60, env=env
+        )
+        if comp.returncode:
+            shutil.rmtree(staging, ignore_errors=True)
+            return None
+        trusted_files.seal(staging, _classes(staging))
+        os.rename(staging, target)
+    except (OSError, subprocess.TimeoutExpired):
+        # Lost the publish race to a sibling worker, javac is unavailable, or
+        # JAVA_HARNESS_DIR belongs to someone else
+        if staging:
+            shutil.rmtree(staging, ignore_errors=True)
+
+    sealed = _check(target)
+    return (target, *sealed) if sealed else None
@@ -0,0 +1,159 @@
+"""
+Warm javac daemons for Java compiles (see java/CompileServer.java).
+
+Selected with JAVAC_DAEMON=1. Each worker process keeps up to JAVAC_DAEMON_POOL_SIZE
+long-lived compiler JVMs and sends each compile to an idle one over its stdin
+pipe, instead of paying the javac launcher's JVM startup per submission. The
+reply carries javac's exit code and its diagnostics exactly as the launcher
+prints them on stderr.
+
+A daemon is replaced after JAVAC_DAEMON_MAX_COMPILES compiles, when its RSS grows
+past JAVAC_DAEMON_MAX_RSS_MB, when it misses a deadline or when it dies. A compile
+whose daemon crashed is retried once with the plain `javac` launcher.
+"""
+import os
+import time
+import logging
+import selectors
+import subprocess
+from . import java_harness
+from .worker_pool import WorkerPool
+
+JAVAC_DAEMON = os.getenv("JAVAC_DAEMON", "0") == "1"
+JAVAC_DAEMON_POOL_SIZE = int(os.getenv("JAVAC_DAEMON_POOL_SIZE", 2))
+JAVAC_DAEMON_MAX_COMPILES = int(os.getenv("JAVAC_DAEMON_MAX_COMPILES", 500))
+JAVAC_DAEMON_MAX_RSS_MB = int(os.getenv("JAVAC_DAEMON_MAX_RSS_MB", 768))
+JAVAC_DAEMON_HEAP_MB = int(os.getenv("JAVAC_DAEMON_HEAP_MB", 512))
+
+
+class DaemonCrashed(Exception):
+    """The compiler JVM exited or sent a malformed reply mid-request."""
+
+
+def _rss_bytes(pid):
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+
+class _Daemon:
+    def __init__(self, classpath, env):
+        self.proc = subprocess.Popen(
+            [
+                "java", f"-Xmx{JAVAC_DAEMON_HEAP_MB}m", "-XX:+UseSerialGC", "-Dfile.encoding=UTF-8",
+                "-cp", classpath, "CompileServer"
+            ],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, env=env
+        )
+        self.compiles = 0
+        self._buf = b""
+
+    def alive(self):
+        return self.proc.poll() is None
+
+    def kill(self):
+        if self.alive():
+            self.proc.kill()
+        self.proc.wait()
+
+    def healthy(self):
+        return (
+            self.alive() and self.compiles < JAVAC_DAEMON_MAX_COMPILES
+            and _rss_bytes(self.proc.pid) < JAVAC_DAEMON_MAX_RSS_MB * 1024 * 1024
+        )
+
+    def _read(self, sel, fd, deadline, ready):
+        while not ready():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not sel.select(remaining):
+                raise subprocess.TimeoutExpired("javac", 0)
+            chunk = os.read(fd, 1 << 16)
+            if not chunk:
+                raise DaemonCrashed("compiler daemon exited")
+            self._buf += chunk
+
+    def compile(self, args, deadline):
+        """Run one compile. Returns (exit code, diagnostics)."""
+        self.compiles += 1
+        try:
+            self.proc.stdin.write("\t".join(args).encode() + b"\n")
+            self.proc.stdin.flush()
+        except OSError as e:
+            raise DaemonCrashed(str(e))
+
+        fd = self.proc.stdout.fileno()
+        with selectors.DefaultSelector() as sel:
+            sel.register(fd, selectors.EVENT_READ)
+            self._read(sel, fd, deadline, lambda: b"\n" in self._buf)
+            header, self._buf = self._buf.split(b"\n", 1)
+            try:
+                code, length = map(int, header.split())
+            except ValueError:
+                raise DaemonCrashed(f"malformed reply {header[:80]!r}")
+            self._read(sel, fd, deadline, lambda: len(self._buf) >= length)
+
+        body, self._buf = self._buf[:length], self._buf[length:]
+        return code, body.decode("utf-8", errors="replace")
+
+
+class JavacDaemonPool(WorkerPool):
+    """Compiler JVMs owned by the current worker process."""
+
+    def _release(self, daemon, classpath, env):
+        if daemon.healthy():
+            self._idle.put(daemon)
+            return
+        # Replace rather than shrink so waiting threads always get a daemon
+        daemon.kill()
+        try:
+            replacement = _Daemon(classpath, env)
+        except Exception:
+            self._vacate()
+            return
+        self._idle.put(replacement)
+
+    def run(self, cmd, timeout, cwd, env=None):
+        """Compile like subprocess.run(cmd, capture_output=True, text=True, timeout=timeout, cwd=cwd).
+
+        `cmd` is a `javac` command line with absolute paths; launcher-only -J options
+        are dropped since the daemon's JVM is already running. Returns a
+        CompletedProcess with the diagnostics on stderr, or raises
+        subprocess.TimeoutExpired.
+        """
+        classpath = java_harness.harness_classpath(env)
+        if not classpath:
+            return subprocess.run(cmd, capture_output=True, text=True, timeout=timeout, cwd=cwd, env=env)
+
+        args = [a for a in cmd[1:] if not a.startswith("-J")]
+        if "-cp" not in args and "-classpath" not in args:
+            # The launcher's default user classpath is its working directory
+            args = ["-cp", cwd] + args
+        daemon = self._take(lambda: _Daemon(classpath, env))
+        if not daemon.alive():
+            daemon.kill()
+            daemon = self._restart(lambda: _Daemon(classpath, env))
+        try:
+            code, diagnostics = daemon.compile(args, time.monotonic() + timeout)
+        except subprocess.TimeoutExpired:
+            daemon.kill()
+            raise subprocess.TimeoutExpired(cmd, timeout)
+        except DaemonCrashed:
+            logging.warning("javac daemon crashed, compiling with the launcher", exc_info=True)
+            daemon.kill()
+            return subprocess.run(cmd, capture_output=True, text=True, timeout=timeout, cwd=cwd, env=env)
+        finally:
+            self._release(daemon, classpath, env)
+        return subprocess.CompletedProcess(cmd, code, "", diagnostics)
+
+
+_pool = JavacDaemonPool(JAVAC_DAEMON_POOL_SIZE)
+
+
+def run(cmd, timeout, cwd, env=None):
+    """Compile a `javac` command line on this worker's warm compiler daemons."""
+    return _pool.run(cmd, timeout, cwd, env)
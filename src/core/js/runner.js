@@ -0,0 +1,178 @@
+'use strict';
+/*
+ * Pre-started JavaScript runner for the `pool` JavaScript backend (see core/node_pool.py).
+ *
+ * Reads one JSON job per line on stdin:
+ *   {"code", "input", "timeout", "max_stdout", "max_stderr"} (timeout in ms, caps in bytes)
+ * and answers with one JSON line on stdout:
+ *   {"stdout", "stderr", "exit", "timed_out", "output_limit", "rss", "cpu_us"}
+ * (rss is the runner's resident set after the job, cpu_us its user+sys time
+ * spent on the job). A job that writes past a cap is ended right away with
+ * output_limit set.
+ *
+ * The job runs in a fresh vm context with its own console, process shim and
+ * tracked timers. The shims come from this realm, so the context does not
+ * isolate the job from the runner: the pool sends each runner a single job and
+ * then kills it. The job is finished once the script returned and no timer or
+ * stdin delivery is pending.
+ * Start with --disallow-code-generation-from-strings so `constructor.constructor`
+ * tricks cannot compile code in the runner's own realm.
+ */
+const vm = require('vm');
+const util = require('util');
+const readline = require('readline');
+const { EventEmitter } = require('events');
+
+let current = null;
+
+class ExitSignal { constructor(code) { this.code = code; } }
+class OutputLimitSignal {}
+
+function runJob(job, done) {
+  const out = [];
+  const err = [];
+  const timers = new Map();
+  let exitCode = 0;
+  let finished = false;
+  let nextId = 1;
+  const cpuStart = process.cpuUsage();
+
+  const sizes = { out: 0, err: 0 };
+  const caps = { out: job.max_stdout, err: job.max_stderr };
+
+  const finish = (timedOut, outputLimit = false) => {
+    if (finished) return;
+    finished = true;
+    clearTimeout(deadline);
+    for (const [handle, kind] of timers.values()) {
+      if (kind === 'immediate') clearImmediate(handle); else clearTimeout(handle);
+    }
+    timers.clear();
+    current = null;
+    done({
+      stdout: out.join(''),
+      stderr: err.join(''),
+      exit: exitCode,
+      timed_out: timedOut,
+      output_limit: outputLimit,
+      rss: process.memoryUsage().rss,
+      cpu_us: (({ user, system }) => user + system)(process.cpuUsage(cpuStart)),
+    });
+  };
+
+  const write = (stream, s) => {
+    s = String(s);
+    sizes[stream] += Buffer.byteLength(s);
+    if (sizes[stream] > caps[stream]) {
+      finish(false, true);
+      throw new OutputLimitSignal();
+    }
+    (stream === 'out' ? out : err).push(s);
+  };
+
+  const fail = (e) => {
+    if (e instanceof OutputLimitSignal) return;
+    if (e instanceof ExitSignal) {
+      exitCode = e.code;
+      return finish(false);
+    }
+    // Hide the runner's own frames so traces look like a plain `node main.js` run
+    const trace = String((e && e.stack) || e).split('\n')
+      .filter((line) => !line.includes(__filename) && !line.includes('(node:'));
+    err.push(`${trace.join('\n')}\n`);
+    exitCode = 1;
+  };
+
+  const settle = () => {
+    if (!finished && timers.size === 0) setImmediate(() => timers.size === 0 && finish(false));
+  };
+
+  const track = (kind, schedule) => (fn, ...rest) => {
+    const id = nextId++;
+    const wrapped = (...args) => {
+      if (kind !== 'interval') timers.delete(id);
+      try { fn(...args); } catch (e) { fail(e); }
+      settle();
+    };
+    timers.set(id, [schedule(wrapped, ...rest), kind]);
+    return id;
+  };
+  const untrack = (clear) => (id) => {
+    const entry = timers.get(id);
+    if (entry) { clear(entry[0]); timers.delete(id); settle(); }
+  };
+
+  const stdin = new EventEmitter();
+  stdin.setEncoding = () => stdin;
+  stdin.resume = () => stdin;
+  stdin.pause = () => stdin;
+
+  const sandbox = {
+    console: {
+      log: (...a) => write('out', util.format(...a) + '\n'),
+      info: (...a) => write('out', util.format(...a) + '\n'),
+      error: (...a) => write('err', util.format(...a) + '\n'),
+      warn: (...a) => write('err', util.format(...a) + '\n'),
+    },
+    process: {
+      stdin,
+      stdout: { write: (s) => { write('out', s); return true; } },
+      stderr: { write: (s) => { write('err', s); return true; } },
+      argv: ['node', 'main.js'],
+      exit: (code) => { throw new ExitSignal(code || 0); },
+    },
+    setTimeout: track('timeout', setTimeout),
+    setInterval: track('interval', setInterval),
+    setImmediate: track('immediate', setImmediate),
+    clearTimeout: untrack(clearTimeout),
+    clearInterval: untrack(clearInterval),
+    clearImmediate: untrack(clearImmediate),
+    queueMicrotask,
+    Buffer,
+    TextEncoder,
+    TextDecoder,
+  };
+
+  const deadline = setTimeout(() => finish(true), job.timeout);
+  current = { fail };
+
+  try {
+    const context = vm.createContext(sandbox, { codeGeneration: { strings: false, wasm: false } });
+    new vm.Script(job.code, { filename: 'main.js' }).runInContext(context, { timeout: job.timeout });
+  } catch (e) {
+    if (e && e.code === 'ERR_SCRIPT_EXECUTION_TIMEOUT') return finish(true);
+    fail(e);
+    return finish(false);
+  }
+
+  // Deliver stdin the way a piped `node main.js` would: data, then end
+  sandbox.setImmediate(() => {
+    if (job.input) stdin.emit('data', job.input);
+    stdin.emit('end');
+  });
+}
+
+process.on('unhandledRejection', (reason) => {
+  if (current) current.fail(reason);
+});
+process.on('uncaughtException', (e) => {
+  if (current) current.fail(e);
+});
+
+const jobs = [];
+let busy = false;
+
+function pump() {
+  if (busy || jobs.length === 0) return;
+  busy = true;
+  runJob(jobs.shift(), (result) => {
+    process.stdout.write(JSON.stringify(result) + '\n');
+    busy = false;
+    setImmediate(pump);
+  });
+}
+
+readline.createInterface({ input: process.stdin }).on('line', (line) => {
+  jobs.push(JSON.parse(line));
+  pump();
+});
@@ -0,0 +1,14 @@
+"""Point-in-time execution engine metrics for this worker process (GET /metrics)."""
+from . import admission, process_group, result_cache, workspace_pool
+from .security import scan_pool, verdict_cache
+
+
+def snapshot():
+    return {
+        "admission": admission.stats(),
+        "processes": process_group.stats(),
+        "results": result_cache.stats(),
+        "sanitizer": verdict_cache.stats(),
+        "scans": scan_pool.stats(),
+        "workspaces": workspace_pool.stats(),
+    }
@@ -0,0 +1,257 @@
+"""
+Warm Node.js runner pool for the `pool` JavaScript backend (see js/runner.js).
+
+Selected with JAVASCRIPT_BACKEND=pool. Each worker process keeps up to
+NODE_POOL_SIZE `node` runners started ahead of time; a test case is sent to an
+idle runner as one JSON line and runs in a fresh vm context there.
+
+The vm context is not a security boundary: the shims it is given
+(process.stdin, Buffer, util.format's inspect hooks) lead back to the runner's
+own realm, so a job could tamper with whatever runs after it in the same
+process. A runner is therefore lent to one submission only (see `session`): it
+runs that submission's test cases one after another, so node starts once per
+submission instead of once per case, and it is killed when the submission is
+done, its replacement being started in the background. A runner is retired
+early after NODE_POOL_MAX_JOBS cases, once its RSS grows past
+NODE_POOL_MAX_RSS_MB, or after a case that did not end cleanly (timeout, output
+limit, garbled reply).
+
+Runners are started under the job's sandbox limits, except that RLIMIT_AS
+becomes a V8 heap limit (--max-old-space-size): V8 reserves far more address
+space than it uses and cannot start under a limit of a few hundred MB, and
+RLIMIT_CPU covers all NODE_POOL_MAX_JOBS jobs a runner may serve (each job is
+held to its own time by its deadline).
+"""
+import os
+import json
+import time
+import queue
+import resource
+import threading
+import selectors
+import contextlib
+import subprocess
+from . import output_limit, sandbox_spawn
+from .output_limit import OutputLimitExceeded
+from .worker_pool import WorkerPool
+
+JAVASCRIPT_BACKEND = os.getenv("JAVASCRIPT_BACKEND", "process")
+NODE_POOL_SIZE = int(os.getenv("NODE_POOL_SIZE", 2))
+NODE_POOL_MAX_JOBS = int(os.getenv("NODE_POOL_MAX_JOBS", 20))
+NODE_POOL_MAX_RSS_MB = int(os.getenv("NODE_POOL_MAX_RSS_MB", 256))
+
+_RUNNER_SCRIPT = os.path.join(os.path.dirname(__file__), "js", "runner.js")
+_REPLY_KEYS = {"stdout", "stderr", "exit", "timed_out", "output_limit", "rss", "cpu_us"}
+# Slack on top of the job timeout for the runner to report back before it is killed
+_GRACE = 1.0
+
+
+def _node_command(limits):
+    """(node command line, limits without RLIMIT_AS) for a runner started under `limits`."""
+    cmd = ["node", "--disallow-code-generation-from-strings"]
+    rest = []
+    for res, value in limits or []:
+        if res == resource.RLIMIT_AS:
+            cmd.append(f"--max-old-space-size={max(1, value // (1024 * 1024))}")
+        elif res == resource.RLIMIT_CPU:
+            rest.append((res, value * NODE_POOL_MAX_JOBS))
+        else:
+            rest.append((res, value))
+    return cmd + [_RUNNER_SCRIPT], rest
+
+
+class _Runner:
+    def __init__(self, limits):
+        self.limits = limits
+        cmd, limits = _node_command(limits)
+        cmd, extra = sandbox_spawn.wrap(cmd, limits)
+        self.proc = subprocess.Popen(
+            cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, **extra
+        )
+        self._buf = b""
+        # Set once the runner closed its stdout, i.e. it is exiting
+        self.closed = False
+        self.jobs = 0
+
+    def reusable(self, reply):
+        """Whether the runner may take another case of the same submission after `reply`."""
+        return (
+            reply is not None and not reply["timed_out"] and not reply["output_limit"]
+            and not self.closed and self.alive() and self.jobs < NODE_POOL_MAX_JOBS
+            and isinstance(reply["rss"], int) and reply["rss"] < NODE_POOL_MAX_RSS_MB * 1024 * 1024
+        )
+
+    def alive(self):
+        return self.proc.poll() is None
+
+    def kill(self):
+        if self.alive():
+            self.proc.kill()
+        self.proc.wait()
+
+    def request(self, job, deadline):
+        """Send one job and wait for its JSON reply. Returns None if the deadline passes."""
+        self.jobs += 1
+        self.proc.stdin.write(json.dumps(job).encode() + b"\n")
+        self.proc.stdin.flush()
+
+        fd = self.proc.stdout.fileno()
+        with selectors.DefaultSelector() as sel:
+            sel.register(fd, selectors.EVENT_READ)
+            while b"\n" not in self._buf:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not sel.select(remaining):
+                    return None
+                chunk = os.read(fd, 1 << 16)
+                if not chunk:
+                    self.closed = True
+                    return None
+                self._buf += chunk
+
+        line, self._buf = self._buf.split(b"\n", 1)
+        try:
+            reply = json.loads(line)
+        except ValueError:
+            return None
+        # The job runs in this process and can garble its own reply
+        return reply if isinstance(reply, dict) and _REPLY_KEYS <= reply.keys() else None
+
+
+class NodePool(WorkerPool):
+    """Fixed-size pool of runners owned by the current worker process, lent out per submission."""
+
+    def _acquire(self, limits, block=True):
+        """An idle runner started under `limits`. Without `block`, None when all are lent out."""
+        try:
+            runner = self._take(lambda: _Runner(limits), block)
+        except queue.Empty:
+            return None
+        # A runner with other limits was started for another problem
+        if runner.limits != limits or not runner.alive():
+            runner.kill()
+            return self._restart(lambda: _Runner(limits))
+        return runner
+
+    def _replace(self, limits):
+        try:
+            runner = _Runner(limits)
+        except Exception:
+            self._vacate()
+            return
+        self._idle.put(runner)
+
+    def _retire(self, runner):
+        """Kill a used runner and start its replacement off the request thread."""
+        runner.kill()
+        threading.Thread(target=self._replace, args=(runner.limits,), daemon=True).start()
+
+    @contextlib.contextmanager
+    def session(self, limits=None):
+        """Lend runners started under `limits` to one submission; they are retired when it ends."""
+        session = _Session(self, limits)
+        try:
+            yield session
+        finally:
+            session.close()
+
+    def run(self, code, stdin_data, timeout, limits=None, caps=None):
+        """Run a JavaScript submission on a runner of its own (see _Session.run)."""
+        with self.session(limits) as session:
+            return session.run(code, stdin_data, timeout, caps)
+
+
+class _Session:
+    """The runners lent to one submission. Its test cases may run from several threads."""
+
+    def __init__(self, pool, limits):
+        self._pool = pool
+        self._limits = limits
+        # Runners between two cases, or None for a runner that was retired in between
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._lent = 0
+
+    def _take(self):
+        try:
+            runner = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                first = self._lent == 0
+                self._lent += 1
+            # Only the first runner is waited for: two submissions that each hold a
+            # runner while waiting for another could otherwise wait for each other
+            runner = self._from_pool(block=first)
+            if runner is not None:
+                return runner
+            with self._lock:
+                self._lent -= 1
+            runner = self._idle.get()
+        # A retired runner's replacement is on its way to the pool
+        return runner if runner is not None else self._from_pool(block=True)
+
+    def _from_pool(self, block):
+        try:
+            return self._pool._acquire(self._limits, block)
+        except Exception:
+            # Let a case that is waiting for a runner of this session try itself
+            self._idle.put(None)
+            raise
+
+    def close(self):
+        while True:
+            try:
+                runner = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            if runner is not None:
+                self._pool._retire(runner)
+
+    def run(self, code, stdin_data, timeout, caps=None):
+        """Run a JavaScript submission. Returns (returncode, stdout, stderr, usage).
+
+        `usage` holds the job's "cpu_s" and the runner's resident set afterwards as
+        "peak_rss_kb".
+
+        Raises subprocess.TimeoutExpired like subprocess.run, and OutputLimitExceeded
+        once the job writes past `caps` = (stdout bytes, stderr bytes).
+        """
+        runner = self._take()
+        result = exited = None
+        try:
+            max_stdout, max_stderr = caps or output_limit.caps()
+            job = {
+                "code": code, "input": stdin_data or "", "timeout": int(timeout * 1000),
+                "max_stdout": max_stdout, "max_stderr": max_stderr,
+            }
+            result = runner.request(job, time.monotonic() + timeout + _GRACE)
+            if runner.closed:
+                exited = runner.proc.wait()
+        finally:
+            if runner.reusable(result):
+                self._idle.put(runner)
+            else:
+                self._pool._retire(runner)
+                self._idle.put(None)
+
+        if result is None and exited is not None:
+            # The runner died under the job (heap limit, CPU limit): report it like a crashed `node main.js`
+            return exited or 1, "", "", {}
+        if result is None or result.get("timed_out"):
+            raise subprocess.TimeoutExpired("node", timeout)
+        if result.get("output_limit"):
+            raise OutputLimitExceeded()
+        usage = {"cpu_s": result["cpu_us"] / 1e6, "peak_rss_kb": result["rss"] // 1024}
+        return result["exit"], result["stdout"], result["stderr"], usage
+
+
+_pool = NodePool(NODE_POOL_SIZE)
+
+
+def session(limits=None):
+    """Lend this worker's warm runners to one submission (see NodePool.session)."""
+    return _pool.session(limits)
+
+
+def run(code, stdin_data, timeout, limits=None, caps=None):
+    """Run a JavaScript submission on this worker's warm runner pool."""
+    return _pool.run(code, stdin_data, timeout, limits, caps)
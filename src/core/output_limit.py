@@ -0,0 +1,31 @@
+"""
+Output caps shared by every execution backend.
+
+A run is killed as soon as it writes more than MAX_OUTPUT_KB to stdout or stderr.
+When a test case's expected output is known, stdout is capped tighter: answers are
+compared after stripping whitespace, so anything longer than the expected output
+plus OUTPUT_SLACK_BYTES of padding cannot pass anyway.
+"""
+import os
+
+MAX_OUTPUT_KB = int(os.getenv("MAX_OUTPUT_KB", 1024))
+OUTPUT_SLACK_BYTES = int(os.getenv("OUTPUT_SLACK_BYTES", 4096))
+
+MESSAGE = "Output limit exceeded"
+
+
+class OutputLimitExceeded(Exception):
+    """The child wrote more than its output cap and was killed."""
+
+    def __init__(self, stream="stdout"):
+        super().__init__(f"{MESSAGE} on {stream}")
+        self.stream = stream
+        self.usage = None
+
+
+def caps(expected_output=None):
+    """Byte caps for (stdout, stderr) of one run."""
+    cap = MAX_OUTPUT_KB * 1024
+    if expected_output is None:
+        return cap, cap
+    return min(cap, len(expected_output.encode()) + OUTPUT_SLACK_BYTES), cap
@@ -0,0 +1,72 @@
+"""
+Process-group cleanup for sandboxed runs.
+
+Every submission process is started in its own session (start_new_session=True),
+so it and everything it forks share one process group whose id is the
+submission's pid. The whole group is SIGKILLed when the submission exits, times
+out or exceeds its output cap, while the submission itself is still an unreaped
+zombie: until it is reaped its pid, and so the group id, cannot be reused by an
+unrelated process.
+
+After reaping, a cheap kill(-pgid, 0) tells whether anything of the group is
+still around (processes that were mid-exit, or orphans whose new parent has not
+reaped them yet). Leftovers are killed again for a short while and counted;
+groups that never drain are logged. A submission that calls setsid() itself
+leaves the group and is not covered.
+"""
+import os
+import time
+import signal
+import logging
+import threading
+
+# How long to keep re-killing a group whose members outlived the leader
+LEFTOVER_GRACE_SECONDS = 0.1
+
+_lock = threading.Lock()
+_stats = {"leftover_groups": 0, "surviving_groups": 0}
+
+
+def kill(pgid):
+    """SIGKILL every process in the group. Missing groups are ignored."""
+    try:
+        os.killpg(pgid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+def _alive(pgid):
+    try:
+        os.killpg(pgid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def reap_leftovers(pgid):
+    """Check a group whose leader was just reaped; kill whatever is left of it.
+
+    Returns True when the group is gone.
+    """
+    if not _alive(pgid):
+        return True
+    with _lock:
+        _stats["leftover_groups"] += 1
+    deadline = time.monotonic() + LEFTOVER_GRACE_SECONDS
+    while time.monotonic() < deadline:
+        kill(pgid)
+        time.sleep(0.005)
+        if not _alive(pgid):
+            return True
+    with _lock:
+        _stats["surviving_groups"] += 1
+    # Usually zombies waiting for an init process that does not reap orphans
+    logging.warning("Process group %s still has members after the run was killed", pgid)
+    return False
+
+
+def stats():
+    with _lock:
+        return dict(_stats)
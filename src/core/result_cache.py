@@ -0,0 +1,151 @@
+"""
+In-memory cache of grading results for repeated submissions.
+
+Entries are keyed by (problem_id, test-set version, language, normalized code hash).
+The test-set version is a hash of the problem's test cases and grading config, so
+adding or changing test cases yields new keys in every worker process; the worker
+that made the change also drops the problem's old entries right away (`invalidate`).
+
+Only verdicts that depend on nothing but the code and the tests are stored
+("correct", "incorrect"); timeouts, errors and cancelled runs are always re-executed.
+An "incorrect" result is stored only when every failed case exited cleanly with a
+wrong answer: a nonzero exit may come from the CPU or memory limit or the output
+cap under load, and one such flaky failure must not stick for the TTL.
+Entries expire after RESULT_CACHE_TTL seconds and the least recently used ones are
+evicted once the cache holds more than RESULT_CACHE_MAX_MB of results.
+"""
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+
+RESULT_CACHE = os.getenv("RESULT_CACHE", "1") != "0"
+RESULT_CACHE_TTL = int(os.getenv("RESULT_CACHE_TTL", 600))
+RESULT_CACHE_MAX_MB = int(os.getenv("RESULT_CACHE_MAX_MB", 64))
+
+CACHEABLE_STATUSES = {"correct", "incorrect"}
+
+# Config keys that change how a problem is graded
+_GRADING_KEYS = ("timeout", "templates", "rules")
+
+
+def _digest(value) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True, ensure_ascii=False).encode()).hexdigest()
+
+
+def test_set_version(test_cases: list, cfg: dict = None) -> str:
+    """Version of a problem's test set: a hash of its test cases and grading config."""
+    cfg = cfg or {}
+    return _digest([test_cases, {k: cfg.get(k) for k in _GRADING_KEYS}])
+
+
+def normalize_code(code: str) -> str:
+    """Drop differences no compiler or interpreter can observe: line endings and trailing blank space."""
+    return code.replace("\r\n", "\n").replace("\r", "\n").rstrip() + "\n"
+
+
+def cacheable(result: dict) -> bool:
+    """Whether `result` depends only on the code and the tests (see module docstring)."""
+    if result.get("status") not in CACHEABLE_STATUSES:
+        return False
+    return all(t.get("status") != "failed" or t.get("exit_code") == 0 for t in result.get("tests") or [])
+
+
+def make_key(problem_id, version: str, lang: str, code: str) -> str:
+    return _digest([str(problem_id), version, lang, hashlib.sha256(normalize_code(code).encode()).hexdigest()])
+
+
+class ResultCache:
+    """Thread-safe LRU of results with a TTL and a size bound (in bytes of JSON)."""
+
+    def __init__(self, ttl, max_bytes):
+        self._ttl = ttl
+        self._max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (expires, size, problem_id, result)
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    def _drop(self, key):
+        _, size, _, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def get(self, key):
+        """Return a copy of the cached result tagged `result_cache: "hit"`, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] < time.monotonic():
+                self._drop(key)
+                entry = None
+            if entry is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return {**entry[3], "result_cache": "hit"}
+
+    def put(self, key, problem_id, result):
+        """Store `result` if its verdict is cacheable. Returns True when stored."""
+        if not cacheable(result):
+            return False
+        size = len(json.dumps(result, ensure_ascii=False))
+        if size > self._max_bytes:
+            return False
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.monotonic() + self._ttl, size, str(problem_id), dict(result))
+            self._bytes += size
+            while self._bytes > self._max_bytes:
+                self._drop(next(iter(self._entries)))
+        return True
+
+    def invalidate(self, problem_id):
+        """Drop every entry of one problem. Returns the number of entries removed."""
+        problem_id = str(problem_id)
+        with self._lock:
+            stale = [k for k, entry in self._entries.items() if entry[2] == problem_id]
+            for key in stale:
+                self._drop(key)
+        return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "enabled": RESULT_CACHE,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self._max_bytes,
+                "ttl_seconds": self._ttl,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+_cache = ResultCache(RESULT_CACHE_TTL, RESULT_CACHE_MAX_MB * 1024 * 1024)
+
+
+def get(key):
+    return _cache.get(key) if RESULT_CACHE else None
+
+
+def put(key, problem_id, result):
+    return RESULT_CACHE and _cache.put(key, problem_id, result)
+
+
+def invalidate(problem_id):
+    return _cache.invalidate(problem_id)
+
+
+def stats():
+    return _cache.stats()
@@ -0,0 +1,51 @@
+"""
+How sandboxed children get their resource limits.
+
+SANDBOX_SPAWN=prlimit (the default) starts each command through util-linux
+`prlimit`, which sets the limits on itself and execs the command in place (same
+pid). No Python code runs in the child, so subprocess creates it with vfork()
+instead of fork(): the worker's page tables are not copied, and spawning stays
+cheap and safe however large and multi-threaded the worker is.
+
+SANDBOX_SPAWN=preexec applies the limits from a preexec_fn in the forked child,
+as before. It is also the fallback when prlimit is not installed.
+
+`python -m scripts.bench_spawn` compares the two.
+"""
+import os
+import shutil
+import logging
+import resource
+
+SANDBOX_SPAWN = os.getenv("SANDBOX_SPAWN", "prlimit")
+PRLIMIT = shutil.which("prlimit")
+
+_OPTIONS = {
+    resource.RLIMIT_AS: "--as",
+    resource.RLIMIT_CPU: "--cpu",
+    resource.RLIMIT_FSIZE: "--fsize",
+    resource.RLIMIT_NOFILE: "--nofile",
+}
+
+if SANDBOX_SPAWN == "prlimit" and not PRLIMIT:
+    logging.warning("prlimit is not installed, sandbox limits are applied with preexec_fn")
+
+
+def _preexec(limits):
+    def set_limits():
+        for res, value in limits:
+            resource.setrlimit(res, (value, value))
+    return set_limits
+
+
+def wrap(cmd, limits, mode=None):
+    """Return (command line, extra Popen kwargs) that start `cmd` under `limits`.
+
+    `limits` are (resource, value) pairs, applied as both soft and hard limit.
+    """
+    if not limits:
+        return list(cmd), {}
+    mode = mode or SANDBOX_SPAWN
+    if mode == "prlimit" and PRLIMIT and all(res in _OPTIONS for res, _ in limits):
+        return [PRLIMIT, *(f"{_OPTIONS[res]}={value}" for res, value in limits), "--", *cmd], {}
+    return list(cmd), {"preexec_fn": _preexec(limits)}
@@ -1 +1 @@
-from .sanitizer import sanitize_code
+from .sanitizer import sanitize_code, analyze_code
@@ -116,14 +116,126 @@ DETECTORS = {
     "java": _JAVA_PATTERNS,
 }
 
-def detect_violations(lang: str, code: str) -> dict:
-    violations = []
-    for regex, reason in DETECTORS.get(lang, []):
-        if regex.search(code):
-            if "Security policy violation prohibited code pattern detected." not in violations:
-                violations.append("Security policy violation prohibited code pattern detected.")
-                
+VIOLATION = "Security policy violation prohibited code pattern detected."
+
+# ── Combined scanner ──
+# Each language's patterns are compiled into one alternation with a named group
+# per rule, so the source is scanned once. Python's backtracking engine tries
+# every alternative at every position, which on its own is slower than the
+# separate searches; two cheap tricks make it pay off: the leading \b that most
+# rules share is factored out in front of the alternation, and a lookahead on
+# the possible first characters skips positions no rule can start at.
+# `python -m scripts.bench_detector` compares it with one search per pattern.
+#
+# Scanners are built on first use and rebuilt when a language's rules change
+# (the same fingerprint the verdict cache versions its entries with), so rules
+# added to DETECTORS at runtime are enforced.
+
+_META = set('\\.^$*+?{}[]()|')
+
+
+def _alternatives(pattern):
+    """Split a pattern at its top-level `|` (outside groups and character classes)."""
+    parts, depth, start, i, in_class = [], 0, 0, 0, False
+    while i < len(pattern):
+        ch = pattern[i]
+        if ch == '\\':
+            i += 1
+        elif in_class:
+            in_class = ch != ']'
+        elif ch == '[':
+            in_class = True
+        elif ch == '(':
+            depth += 1
+        elif ch == ')':
+            depth -= 1
+        elif ch == '|' and depth == 0:
+            parts.append(pattern[start:i])
+            start = i + 1
+        i += 1
+    parts.append(pattern[start:])
+    return parts
+
+
+def _first_char(alternative):
+    """Character class a match of `alternative` starts with, or None if unknown."""
+    if alternative.startswith('\\b'):
+        alternative = alternative[2:]
+        # \b before a word character: the match starts at the beginning of a word
+        return r'\w' if alternative[:1].isalnum() or alternative[:1] == '_' else None
+    ch = alternative[:1]
+    if not ch or ch in _META:
+        return None
+    return r'\w' if ch.isalnum() or ch == '_' else re.escape(ch)
+
+
+def _combine(patterns):
+    anchored, other, first = [], [], set()
+    for i, (regex, _) in enumerate(patterns):
+        alternatives = _alternatives(regex.pattern)
+        first.update(_first_char(alt) for alt in alternatives)
+        if len(alternatives) == 1 and regex.pattern.startswith('\\b'):
+            anchored.append(f"(?P<r{i}>{regex.pattern[2:]})")
+        else:
+            other.append(f"(?P<r{i}>{regex.pattern})")
+    body = "|".join(([r"\b(?:" + "|".join(anchored) + ")"] if anchored else []) + other)
+    if None not in first:
+        body = f"(?=[{''.join(sorted(first))}])(?:{body})"
+    return re.compile(body, re.IGNORECASE | re.MULTILINE)
+
+
+def rules_fingerprint(patterns):
+    """Hashable summary of a language's rules: pattern, flags and reason of each."""
+    return tuple((regex.pattern, regex.flags, reason) for regex, reason in patterns)
+
+
+_SCANNERS = {}  # lang -> (rules fingerprint, combined scanner, rules)
+
+
+def _scanner(lang):
+    """(combined scanner, rules) for `lang`, or (None, None) for a language without rules."""
+    patterns = DETECTORS.get(lang)
+    if patterns is None:
+        return None, None
+    fingerprint = rules_fingerprint(patterns)
+    entry = _SCANNERS.get(lang)
+    if entry is None or entry[0] != fingerprint:
+        entry = _SCANNERS[lang] = (fingerprint, _combine(patterns), list(patterns))
+    return entry[1], entry[2]
+
+
+def matched_rules(lang: str, code: str) -> list:
+    """Reasons of the rules that fire on `code`, in order of first occurrence.
+
+    One pass over the source; a rule whose only match overlaps an earlier
+    rule's match is not reported.
+    """
+    scanner, patterns = _scanner(lang)
+    if scanner is None:
+        return []
+    rules = []
+    for match in scanner.finditer(code):
+        reason = patterns[int(match.lastgroup[1:])][1]
+        if reason not in rules:
+            rules.append(reason)
+    return rules
+
+
+def has_violation(lang: str, code: str) -> bool:
+    """True as soon as any pattern matches; stops at the first hit."""
+    scanner, _ = _scanner(lang)
+    return scanner is not None and scanner.search(code) is not None
+
+
+def detect_violations(lang: str, code: str, report_rules: bool = False) -> dict:
+    """Blacklist scan. With `report_rules`, the result also lists the rules that fired
+    under "rules" (for logs and telemetry; callers only show the generic violation).
+    """
+    if report_rules:
+        rules = matched_rules(lang, code)
+        return {"safe": not rules, "violations": [VIOLATION] if rules else [], "rules": rules}
+    flagged = has_violation(lang, code)
     return {
-        "safe": len(violations) == 0,
-        "violations": violations
+        "safe": not flagged,
+        "violations": [VIOLATION] if flagged else []
     }
@@ -1,5 +1,7 @@
+import os
 import ast
 import re
+import traceback
 
 try:
     import esprima
@@ -31,12 +33,13 @@ PYTHON_BLOCKED_CALLS = {
     'delattr', 'vars',
 }
 
-def inspect_python(code):
+def inspect_python(code, tree=None):
     violations = []
-    try:
-        tree = ast.parse(code)
-    except SyntaxError:
-        return {"safe": True, "violations": []}
+    if tree is None:
+        try:
+            tree = ast.parse(code)
+        except SyntaxError:
+            return {"safe": True, "violations": []}
 
     for node in ast.walk(tree):
         if isinstance(node, ast.Import):
@@ -65,50 +68,46 @@ JS_BLOCKED_REQUIRES = {
     'perf_hooks', 'async_hooks', 'trace_events', 'crypto',
 }
 
-def _walk_esprima(node):
-    if isinstance(node, dict):
-        yield node
-        for v in node.values():
-            yield from _walk_esprima(v)
-    elif isinstance(node, list):
-        for item in node:
-            yield from _walk_esprima(item)
+def _js_visitor(violations):
+    """esprima delegate that checks each node as the parser finishes it."""
+    def visit(node, metadata):
+        if node.type == 'CallExpression':
+            callee = node.callee
+            if callee.type == 'Identifier' and callee.name == 'require':
+                args = node.arguments
+                if args and args[0].type == 'Literal':
+                    mod = args[0].value
+                    if mod in JS_BLOCKED_REQUIRES or mod not in ('', None):
+                        violations.append(f"require('{mod}') is not whitelisted")
+
+            if callee.type == 'Identifier' and callee.name in ('eval', 'Function'):
+                violations.append(f"{callee.name}() is not allowed")
+
+        elif node.type == 'MemberExpression':
+            if node.object.name == 'process' and node.property.name in ('env', 'exit', 'kill', 'pid', 'cwd'):
+                violations.append(f"process.{node.property.name} is not allowed")
+    return visit
 
-def inspect_javascript(code):
+def inspect_javascript(code, tree=None):
+    """Checks run inside the parse (esprima delegate), so no dict tree is built or walked.
+
+    `tree` is unused and only keeps the inspector signature uniform.
+    """
     if not _HAS_ESPRIMA:
         return {"safe": True, "violations": []}
         
     violations = []
     try:
-        tree = esprima.parseScript(code).toDict()
+        esprima.parseScript(code, delegate=_js_visitor(violations))
     except Exception:
         return {"safe": True, "violations": []}
-
-    for node in _walk_esprima(tree):
-        if not isinstance(node, dict) or 'type' not in node:
-            continue
-            
-        if node['type'] == 'CallExpression':
-            callee = node.get('callee', {})
-            if callee.get('type') == 'Identifier' and callee.get('name') == 'require':
-                args = node.get('arguments', [])
-                if args and args[0].get('type') == 'Literal':
-                    mod = args[0].get('value', '')
-                    if mod in JS_BLOCKED_REQUIRES or mod not in ('', None):
-                        violations.append(f"require('{mod}') is not whitelisted")
-            
-            if callee.get('type') == 'Identifier' and callee.get('name') in ('eval', 'Function'):
-                violations.append(f"{callee.get('name')}() is not allowed")
-                
-        if node['type'] == 'MemberExpression':
-            obj = node.get('object', {})
-            prop = node.get('property', {})
-            if obj.get('name') == 'process' and prop.get('name') in ('env', 'exit', 'kill', 'pid', 'cwd'):
-                violations.append(f"process.{prop.get('name')} is not allowed")
                 
     return {"safe": len(violations) == 0, "violations": violations}
 
 # ── Java Whitelist ──
+# "javalang" builds a full AST; "tokens" checks a token stream in linear time
+JAVA_INSPECTOR = os.getenv("JAVA_INSPECTOR", "javalang")
+
 JAVA_ALLOWED_PACKAGES = {'java.util', 'java.lang', 'java.math', 'java.text', 'java.time'}
 JAVA_ALLOWED_IO_CLASSES = {
     'java.io.BufferedReader', 'java.io.InputStreamReader', 'java.io.PrintWriter',
@@ -116,27 +115,32 @@ JAVA_ALLOWED_IO_CLASSES = {
     'java.io.InputStream', 'java.io.StringReader', 'java.io.StringWriter',
     'java.io.ByteArrayInputStream', 'java.io.ByteArrayOutputStream',
 }
+JAVA_BLOCKED_CLASSES = {
+    'ProcessBuilder', 'File', 'FileInputStream', 'FileOutputStream',
+    'FileReader', 'FileWriter', 'Socket', 'ServerSocket',
+    'URL', 'HttpURLConnection', 'DatagramSocket',
+}
+
+def _java_name_allowed(name):
+    """Whether a fully qualified Java name lies inside the whitelist."""
+    if name in JAVA_ALLOWED_IO_CLASSES:
+        return True
+    return any(name == pkg or name.startswith(pkg + '.') for pkg in JAVA_ALLOWED_PACKAGES)
 
-def inspect_java(code):
+def inspect_java(code, tree=None):
     if not _HAS_JAVALANG:
         return {"safe": True, "violations": []}
         
     violations = []
-    try:
-        tree = javalang.parse.parse(code)
-    except Exception:
-        return {"safe": True, "violations": []}
+    if tree is None:
+        try:
+            tree = javalang.parse.parse(code)
+        except Exception:
+            return {"safe": True, "violations": []}
 
     for imp in (tree.imports or []):
         clean = imp.path.rstrip('.*').rstrip('.')
-        is_allowed = clean in JAVA_ALLOWED_IO_CLASSES
-        if not is_allowed:
-            for pkg in JAVA_ALLOWED_PACKAGES:
-                if clean == pkg or clean.startswith(pkg + '.'):
-                    is_allowed = True
-                    break
-        
-        if not is_allowed:
+        if not _java_name_allowed(clean):
             violations.append(f"Import '{imp.path}' is not whitelisted")
 
     for _, node in tree.filter(javalang.tree.MethodInvocation):
@@ -147,16 +151,217 @@ def inspect_java(code):
 
     for _, node in tree.filter(javalang.tree.ClassCreator):
         type_name = node.type.name if node.type else ''
-        blocked_classes = (
-            'ProcessBuilder', 'File', 'FileInputStream', 'FileOutputStream', 
-            'FileReader', 'FileWriter', 'Socket', 'ServerSocket', 
-            'URL', 'HttpURLConnection', 'DatagramSocket'
-        )
-        if type_name in blocked_classes:
+        if type_name in JAVA_BLOCKED_CLASSES:
             violations.append(f"new {type_name}() is not allowed")
             
     return {"safe": len(violations) == 0, "violations": violations}
 
+# Comments and literals are matched only to be skipped; unterminated ones run to the end
+_JAVA_TOKEN = re.compile(r'''
+    (?P<skip> //[^\n]*
+            | /\*.*?(?:\*/|\Z)
+            | """.*?(?:(?<!\\)"""|\Z)
+            | "(?:\\.|[^"\\\n])*"?
+            | '(?:\\.|[^'\\\n])*'?
+            | \d[\w.]* )
+  | (?P<tok> [A-Za-z_$][\w$]* | [^\s\w] )
+''', re.VERBOSE | re.DOTALL)
+
+# Roots of fully qualified names that are checked against the package whitelist
+_JAVA_PACKAGE_ROOTS = {'java', 'javax', 'jdk', 'sun', 'com', 'org'}
+
+# A \u escape counts only when its backslash is not itself escaped (JLS 3.3)
+_JAVA_UNICODE_ESCAPE = re.compile(r'(?<!\\)((?:\\\\)*)\\u+([0-9A-Fa-f]{4})')
+
+def decode_java_escapes(code):
+    """`code` with its \\uXXXX escapes translated, as javac (and javalang) do before lexing."""
+    if '\\u' not in code:
+        return code
+    return _JAVA_UNICODE_ESCAPE.sub(lambda m: m.group(1) + chr(int(m.group(2), 16)), code)
+
+def java_tokens(code):
+    """Identifiers and punctuation of `code`, without comments, literals and numbers."""
+    return [m.group('tok') for m in _JAVA_TOKEN.finditer(decode_java_escapes(code)) if m.group('tok')]
+
+def _dotted_name(toks, i):
+    """Read `a.b.c` starting at toks[i]. Returns (name, index after it)."""
+    parts = [toks[i]]
+    i += 1
+    while i + 1 < len(toks) and toks[i] == '.' and toks[i + 1].isidentifier():
+        parts.append(toks[i + 1])
+        i += 2
+    return '.'.join(parts), i
+
+# Words that may precede a declared name as part of its type and modifiers
+_JAVA_DECL_WORDS = {
+    'final', 'static', 'private', 'protected', 'public', 'transient', 'volatile',
+    'var', 'boolean', 'byte', 'char', 'short', 'int', 'long', 'float', 'double',
+    'extends', 'super',
+}
+_JAVA_KEYWORDS = _JAVA_DECL_WORDS | {
+    'abstract', 'assert', 'break', 'case', 'catch', 'class', 'const', 'continue',
+    'default', 'do', 'else', 'enum', 'finally', 'for', 'goto', 'if', 'implements',
+    'import', 'instanceof', 'interface', 'native', 'new', 'package', 'return',
+    'strictfp', 'switch', 'synchronized', 'this', 'throw', 'throws', 'try', 'void',
+    'while', 'yield', 'record', 'permits', 'sealed', 'true', 'false', 'null',
+}
+_JAVA_TYPE_BODY = {'class', 'interface', 'enum', 'record'}
+
+def _java_type_prefix(toks):
+    """Whether `toks` can only be the modifiers and type of a declaration."""
+    if not toks or not (toks[-1] in ('>', ']') or (toks[-1].isidentifier() and toks[-1] not in _JAVA_KEYWORDS)):
+        return False
+    return all(
+        t in _JAVA_DECL_WORDS or (t.isidentifier() and t not in _JAVA_KEYWORDS) or t in ('.', '<', '>', '[', ']', '?', ',', '@')
+        for t in toks
+    )
+
+def _java_declarations(toks):
+    """Token spans where a variable (local, parameter or field) is in scope, by name.
+
+    A variable obscures a package of the same name (JLS 6.4.2), so `sun.pos.set(1)`
+    with a field `sun` is not a package reference. The spans only ever fall short:
+    a name is counted from its declaration to the end of its block, and parameters
+    only for the block right after their parentheses (methods, catch, for, try).
+    Anything else, lambda parameters and pattern variables included, is left out,
+    so a missed declaration costs a false report, never a skipped check.
+    """
+    spans = {}
+    blocks = [({}, True)]  # per open '{': (name -> declared at, is a type body)
+    groups = []            # per open '(': [accepts declarations, segment start, names, is a for header]
+    header = []            # names from the last parameter list, for the block that follows
+    stmt = 0
+    for i, tok in enumerate(toks):
+        prev = toks[i - 1] if i else ';'
+        if tok == '{':
+            prefix = toks[stmt:i] if not groups else []
+            names = {name: i for name in header}
+            blocks.append((names, any(t in _JAVA_TYPE_BODY for t in prefix)))
+            header, stmt = [], i + 1
+        elif tok == '}':
+            if len(blocks) > 1:
+                for name, start in blocks.pop()[0].items():
+                    spans.setdefault(name, []).append((start, i))
+            header, stmt = [], i + 1
+        elif tok == '(':
+            prefix = toks[stmt:i]
+            accepts = prev in ('catch', 'for', 'try') or (
+                blocks[-1][1] and not groups and prev.isidentifier() and prev not in _JAVA_KEYWORDS
+                and '=' not in prefix and 'new' not in prefix
+            )
+            groups.append([accepts, i + 1, [], prev == 'for'])
+        elif tok == ')':
+            if groups:
+                accepts, _, names, _ = groups.pop()
+                if accepts and not groups:
+                    header = names
+        elif tok in (',', ';') and groups:
+            group = groups[-1]
+            group[1] = i + 1
+            if tok == ';' and group[3]:
+                # Past a for loop's initializer come expressions
+                group[0] = False
+        elif tok == ';':
+            header, stmt = [], i + 1
+        elif tok.isidentifier() and tok not in _JAVA_KEYWORDS and i + 1 < len(toks):
+            nxt = toks[i + 1]
+            if groups:
+                group = groups[-1]
+                if group[0] and nxt in ('=', ',', ')', ':', ';') and _java_type_prefix(toks[group[1]:i]):
+                    group[2].append(tok)
+            elif nxt in ('=', ';', ',') and _java_type_prefix(toks[stmt:i]):
+                blocks[-1][0].setdefault(tok, i)
+    for names, _ in blocks:
+        for name, start in names.items():
+            spans.setdefault(name, []).append((start, len(toks)))
+    return spans
+
+def _java_in_scope(spans, name, i):
+    return any(start <= i < end for start, end in spans.get(name, ()))
+
+def inspect_java_tokens(code, toks=None):
+    """`inspect_java` without an AST: one linear pass over the token stream.
+
+    There is no parse to fail, so code javalang cannot read is still checked.
+    Fully qualified references (`new java.net.Socket(`, `java.nio.file.Files.readAllBytes(`)
+    are checked against the package whitelist as imports are, unless a call's first
+    name is a variable in scope (see _java_declarations). After `new` the name is
+    always a type, which no variable obscures.
+    """
+    if toks is None:
+        toks = java_tokens(code)
+    declared = None
+    imports, calls, creations = [], [], []
+    n = len(toks)
+    i = 0
+    while i < n:
+        tok = toks[i]
+        prev = toks[i - 1] if i else ';'
+        if tok == 'import' and prev in (';', '}'):
+            j = i + 1
+            if j < n and toks[j] == 'static':
+                j += 1
+            if j < n and toks[j].isidentifier():
+                path, j = _dotted_name(toks, j)
+                if not _java_name_allowed(path):
+                    imports.append(f"Import '{path}' is not whitelisted")
+            i = j
+            continue
+
+        if tok == 'new' and i + 1 < n and toks[i + 1].isidentifier():
+            type_name, j = _dotted_name(toks, i + 1)
+            simple = type_name.rsplit('.', 1)[-1]
+            qualified = '.' in type_name and type_name.split('.', 1)[0] in _JAVA_PACKAGE_ROOTS
+            if simple in JAVA_BLOCKED_CLASSES:
+                creations.append(f"new {simple}() is not allowed")
+            elif qualified and not _java_name_allowed(type_name):
+                creations.append(f"new {type_name}() is not allowed")
+            i = j
+            continue
+
+        if tok.isidentifier() and prev != '.' and i + 1 < n and toks[i + 1] in ('.', '('):
+            # A call chain `a.b.member(`; `x().member(` has no qualifier, as in javalang
+            name, j = _dotted_name(toks, i)
+            if j < n and toks[j] == '(' and prev != 'new':
+                qualifier, _, member = name.rpartition('.')
+                if qualifier in ('this', 'super'):
+                    qualifier = ''
+                owner = qualifier.rsplit('.', 1)[-1]
+                if owner == 'Runtime' or (member == 'exec' and qualifier):
+                    calls.append("Runtime.exec() is not allowed")
+                if owner == 'System' and member in ('exit', 'getenv', 'getProperty'):
+                    calls.append(f"System.{member}() is not allowed")
+                root = qualifier.split('.', 1)[0]
+                if root in _JAVA_PACKAGE_ROOTS and '.' in qualifier and not _java_name_allowed(qualifier):
+                    if declared is None:
+                        declared = _java_declarations(toks)
+                    if not _java_in_scope(declared, root, i):
+                        calls.append(f"Reference to '{qualifier}' is not whitelisted")
+            i = j
+            continue
+        i += 1
+
+    violations = imports + calls + creations
+    return {"safe": len(violations) == 0, "violations": violations}
+
+def _java_token_class_name(toks):
+    """First public top-level class in the token stream, else the first top-level class."""
+    depth, public, first = 0, False, None
+    for i, tok in enumerate(toks):
+        if tok == '{':
+            depth += 1
+        elif tok == '}':
+            depth -= 1
+        if tok in ('{', '}', ';'):
+            public = False
+        elif depth == 0 and tok == 'public':
+            public = True
+        elif depth == 0 and tok == 'class' and i + 1 < len(toks) and toks[i + 1].isidentifier():
+            if public:
+                return toks[i + 1]
+            first = first or toks[i + 1]
+    return first
+
 # ── C / C++ Whitelist ──
 C_CPP_ALLOWED_HEADERS = {
     'stdio.h', 'stdlib.h', 'string.h', 'math.h', 'ctype.h', 'limits.h', 
@@ -175,7 +380,7 @@ C_CPP_ALLOWED_HEADERS = {
     'cwchar', 'cwctype',
 }
 
-def inspect_c_cpp(code):
+def inspect_c_cpp(code, tree=None):
     violations = []
     for match in re.finditer(r'#\s*include\s*[<"]([^>"]+)[>"]', code):
         header = match.group(1)
@@ -190,3 +395,88 @@ INSPECTORS = {
     "cpp": inspect_c_cpp,
     "java": inspect_java,
 }
+
+# ── Shared parse ──
+def _parse(lang, code):
+    """Parse `code` once for everything that needs a tree. Returns (tree, syntax_error).
+
+    Only Python reports syntax errors: esprima and javalang lag behind the
+    language versions Node and javac accept, so their parse failures prove nothing.
+    JavaScript is not parsed here; its inspector checks nodes during its own parse.
+    """
+    if lang == "python":
+        try:
+            return ast.parse(code, filename="main.py"), None
+        except SyntaxError as e:
+            return None, "".join(traceback.format_exception_only(type(e), e))
+    try:
+        if lang == "java" and JAVA_INSPECTOR == "tokens":
+            return java_tokens(code), None
+        if lang == "java" and _HAS_JAVALANG:
+            return javalang.parse.parse(code), None
+    except Exception:
+        pass
+    return None, None
+
+def java_class_name(code, tree=None):
+    """Name of the class to compile and run: the first public class, else the first class.
+
+    `tree` is a javalang tree or, with JAVA_INSPECTOR=tokens, a `java_tokens` list.
+    """
+    if isinstance(tree, list):
+        return _java_token_class_name(tree)
+    if tree is not None:
+        classes = [t for t in tree.types if isinstance(t, javalang.tree.ClassDeclaration)]
+        public = [t for t in classes if 'public' in t.modifiers]
+        return (public or classes)[0].name if classes else None
+
+    # No tree: strip comments and look for a class declaration
+    code_clean = re.sub(r'//.*?$', '', code, flags=re.MULTILINE)
+    code_clean = re.sub(r'/\*.*?\*/', '', code_clean, flags=re.DOTALL)
+    match = re.search(r'public\s+(?:abstract|final|static|strictfp\s+)*class\s+(\w+)', code_clean)
+    if not match:
+        match = re.search(r'(?:public\s+)?(?:(?:abstract|final|static|strictfp)\s+)*class\s+(\w+)', code_clean)
+    return match.group(1) if match else None
+
+def analyze(lang, code):
+    """Parse `code` once and derive everything the sanitizer and executor need from it.
+
+    Returns the whitelist verdict {"safe", "violations"} plus:
+      syntax_error: the interpreter's message when the code cannot run at all, else None
+      class_name: the Java class to compile and run (None when not found or not Java)
+    """
+    tree, syntax_error = _parse(lang, code)
+    inspect = INSPECTORS[lang]
+    if lang == "java" and JAVA_INSPECTOR == "tokens":
+        inspect = inspect_java_tokens
+    if tree is not None or lang in ("c", "cpp", "javascript"):
+        verdict = inspect(code, tree)
+    else:
+        # Nothing parsed, so the inspector would have nothing to flag either
+        verdict = {"safe": True, "violations": []}
+    class_name = java_class_name(code, tree) if lang == "java" else None
+    return {**verdict, "syntax_error": syntax_error, "class_name": class_name}
+
+# ── Policy ──
+# Module settings a verdict depends on. Scan workers start from this file's
+# defaults and are sent the parent's current values (see scan_pool).
+POLICY_SETTINGS = (
+    "PYTHON_ALLOWED_MODULES", "PYTHON_BLOCKED_CALLS", "JS_BLOCKED_REQUIRES",
+    "JAVA_ALLOWED_PACKAGES", "JAVA_ALLOWED_IO_CLASSES", "JAVA_BLOCKED_CLASSES",
+    "C_CPP_ALLOWED_HEADERS", "JAVA_INSPECTOR",
+)
+
+def policy_settings():
+    """Current POLICY_SETTINGS as JSON-ready values (sets become sorted lists)."""
+    settings = {}
+    for name in POLICY_SETTINGS:
+        value = globals()[name]
+        settings[name] = sorted(value) if isinstance(value, (set, frozenset)) else value
+    return settings
+
+def apply_policy(settings):
+    """Replace POLICY_SETTINGS with values from `policy_settings()` of another process."""
+    for name, value in settings.items():
+        if name in POLICY_SETTINGS:
+            globals()[name] = set(value) if isinstance(value, list) else value
+
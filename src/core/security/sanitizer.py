@@ -1,20 +1,52 @@
+import logging
+from . import scan_pool, verdict_cache
 from .inspector import INSPECTORS
 from .detector import detect_violations
+from .scan_pool import ScanFailed
 
 def sanitize_code(lang: str, code: str) -> dict:
     """Two-pass scan: 1. Whitelist (AST) 2. Blacklist (Regex)."""
+    analysis = analyze_code(lang, code)
+    return {"safe": analysis["safe"], "violations": analysis["violations"]}
+
+def analyze_code(lang: str, code: str) -> dict:
+    """`sanitize_code` verdict plus what the single parse found, for the executor.
+
+    syntax_error: the interpreter's message when the code cannot run (Python only), else None
+    class_name: the Java class to compile and run, None when unknown
+    """
+    key = verdict_cache.make_key(lang, code)
+    cached = verdict_cache.get(key)
+    if cached is not None:
+        return cached
+
     violations = []
+    syntax_error = class_name = None
+    # A scan that timed out says nothing about the code; scan again next time
+    cacheable = True
 
     if lang in INSPECTORS:
-        wl = INSPECTORS[lang](code)
-        if not wl.get("safe", True):
-            violations.append("Functionality or library not found in the allowed runtime environment.")
+        try:
+            wl = scan_pool.inspect(lang, code)
+            if not wl.get("safe", True):
+                violations.append("Functionality or library not found in the allowed runtime environment.")
+            syntax_error, class_name = wl.get("syntax_error"), wl.get("class_name")
+        except ScanFailed as e:
+            violations.append(str(e))
+            cacheable = False
 
-    bl = detect_violations(lang, code)
+    bl = detect_violations(lang, code, report_rules=True)
     if not bl.get("safe", True):
         violations.extend(bl.get("violations", []))
-            
-    return {
+        # Users only see the generic violation; the log says which rules fired
+        logging.warning("Rejected %s submission, detector rules: %s", lang, "; ".join(bl["rules"]))
+
+    result = {
         "safe": len(violations) == 0,
-        "violations": violations
+        "violations": violations,
+        "syntax_error": syntax_error,
+        "class_name": class_name,
     }
+    if cacheable:
+        verdict_cache.put(key, result)
+    return result
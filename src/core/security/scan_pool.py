@@ -0,0 +1,160 @@
+"""
+Bounded pool of scan worker processes for the whitelist inspectors.
+
+`ast.parse`, esprima and javalang are pure-Python (or GIL-holding) parsers that
+can take hundreds of milliseconds on a large submission; run inline they stall
+every other thread of the worker. With SCAN_POOL=1 (the default) each worker
+process keeps up to SCAN_POOL_SIZE long-lived `scan_worker.py` processes and
+sends them one submission at a time. A scan that does not answer within
+SCAN_TIMEOUT_MS is rejected with ScanFailed and its worker is killed and
+replaced; time spent waiting for an idle scan worker does not count against the
+budget. The regex-only C/C++ inspector always runs inline.
+
+A scan worker imports its own copy of the inspector, with the file defaults.
+Whenever the parent's policy version (verdict_cache.policy_version) differs from
+the one a worker last received, the job carries the parent's current settings,
+so policy changes made at runtime apply to the next scan.
+"""
+import os
+import sys
+import json
+import time
+import selectors
+import subprocess
+from . import verdict_cache
+from ..worker_pool import WorkerPool
+from .inspector import analyze, policy_settings
+
+SCAN_POOL = os.getenv("SCAN_POOL", "1") != "0"
+SCAN_POOL_SIZE = int(os.getenv("SCAN_POOL_SIZE", 2))
+SCAN_TIMEOUT_MS = int(os.getenv("SCAN_TIMEOUT_MS", 2000))
+
+# Inspectors that parse the submission; the others are cheap enough to run inline
+POOLED_LANGS = {"python", "javascript", "java"}
+
+_WORKER_SCRIPT = os.path.join(os.path.dirname(__file__), "scan_worker.py")
+# How long a fresh scan worker may take to import its parsers
+_STARTUP_TIMEOUT = 30.0
+
+
+class ScanFailed(Exception):
+    """The inspector did not produce a verdict (time budget exceeded or worker failure)."""
+
+
+class _Worker:
+    def __init__(self):
+        try:
+            self.proc = subprocess.Popen(
+                [sys.executable, _WORKER_SCRIPT],
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            )
+        except OSError as e:
+            raise ScanFailed("Security scan could not be started.") from e
+        self._buf = b""
+        # Policy version whose settings this worker last received
+        self.policy = None
+        if self._read_line(time.monotonic() + _STARTUP_TIMEOUT) != b"ready":
+            self.kill()
+            raise ScanFailed("Security scan could not be started.")
+
+    def alive(self):
+        return self.proc.poll() is None
+
+    def kill(self):
+        if self.alive():
+            self.proc.kill()
+        self.proc.wait()
+
+    def _read_line(self, deadline):
+        fd = self.proc.stdout.fileno()
+        with selectors.DefaultSelector() as sel:
+            sel.register(fd, selectors.EVENT_READ)
+            while b"\n" not in self._buf:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not sel.select(remaining):
+                    return None
+                chunk = os.read(fd, 1 << 16)
+                if not chunk:
+                    return None
+                self._buf += chunk
+        line, self._buf = self._buf.split(b"\n", 1)
+        return line
+
+    def request(self, job, deadline):
+        """Send one job and wait for its JSON reply. Returns None if the deadline passes."""
+        try:
+            self.proc.stdin.write(json.dumps(job).encode() + b"\n")
+            self.proc.stdin.flush()
+        except BrokenPipeError:
+            return None
+        line = self._read_line(deadline)
+        return json.loads(line) if line is not None else None
+
+
+class ScanPool(WorkerPool):
+    """Fixed-size pool of scan workers owned by the current worker process."""
+
+    def __init__(self, size):
+        super().__init__(size)
+        self._stats = {"scans": 0, "timeouts": 0, "failures": 0}
+
+    def _release(self, worker, healthy):
+        if not healthy:
+            worker.kill()
+            self._vacate()
+            return
+        self._idle.put(worker)
+
+    def inspect(self, lang, code, timeout):
+        """Run inspector.analyze on `code` in a scan worker. Raises ScanFailed."""
+        worker = self._take(_Worker)
+        while not worker.alive():
+            self._release(worker, healthy=False)
+            worker = self._take(_Worker)
+        job = {"lang": lang, "code": code}
+        version = verdict_cache.policy_version()
+        if worker.policy != version:
+            job["policy"] = policy_settings()
+        reply, alive = None, False
+        try:
+            reply = worker.request(job, time.monotonic() + timeout)
+            alive = worker.alive()
+            if reply is not None and "error" not in reply:
+                worker.policy = version
+        finally:
+            self._release(worker, healthy=reply is not None and alive)
+
+        timed_out = reply is None and alive
+        failed = not timed_out and (reply is None or "error" in reply)
+        with self._lock:
+            self._stats["scans"] += 1
+            self._stats["timeouts"] += timed_out
+            self._stats["failures"] += failed
+        if timed_out:
+            raise ScanFailed("Security scan exceeded its time budget.")
+        if failed:
+            raise ScanFailed("Security scan failed.")
+        return reply
+
+    def stats(self):
+        workers = self._live()
+        with self._lock:
+            return {"workers": workers, **self._stats}
+
+
+_pool = ScanPool(SCAN_POOL_SIZE)
+
+
+def inspect(lang, code):
+    """Whitelist verdict and parse results for `code` (see inspector.analyze), from a
+    scan worker when the pool is enabled.
+
+    Raises ScanFailed when the scan does not finish within SCAN_TIMEOUT_MS.
+    """
+    if not SCAN_POOL or lang not in POOLED_LANGS:
+        return analyze(lang, code)
+    return _pool.inspect(lang, code, SCAN_TIMEOUT_MS / 1000)
+
+
+def stats():
+    return {"enabled": SCAN_POOL, "size": SCAN_POOL_SIZE, "timeout_ms": SCAN_TIMEOUT_MS, **_pool.stats()}
@@ -0,0 +1,37 @@
+"""
+Long-lived security scan worker (see scan_pool.py). Run as a script, not imported.
+
+Prints one "ready" line once the parsers are imported, then reads one JSON job
+per line on stdin:
+  {"lang", "code"[, "policy"]}
+"policy" (see inspector.policy_settings) replaces the inspector settings for
+this and every later job; the pool sends it whenever the parent's policy
+version differs from the one the worker last received. The worker then answers with one JSON line on stdout: the analysis (see inspector.analyze)
+  {"safe", "violations", "syntax_error", "class_name"}
+or {"error"} when the inspector raised.
+"""
+import sys
+import json
+
+# The script's own directory is on sys.path: inspector.py only needs the parsers
+from inspector import analyze, apply_policy
+
+
+def main():
+    out = sys.stdout
+    out.write("ready\n")
+    out.flush()
+    for line in sys.stdin:
+        job = json.loads(line)
+        try:
+            if "policy" in job:
+                apply_policy(job["policy"])
+            reply = analyze(job["lang"], job["code"])
+        except Exception as e:
+            reply = {"error": f"{type(e).__name__}: {e}"}
+        out.write(json.dumps(reply) + "\n")
+        out.flush()
+
+
+if __name__ == "__main__":
+    main()
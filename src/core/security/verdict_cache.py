@@ -0,0 +1,133 @@
+"""
+In-memory cache of sanitizer verdicts for repeated submission texts.
+
+Resubmissions, batch regrades and chunk runs with default snippets send the same
+code through `sanitize_code` over and over. Verdicts are keyed by (language,
+sha256 of the exact code, policy version) and shared by all threads of the
+worker process; the least recently used ones are evicted beyond
+SANITIZER_CACHE_SIZE entries. An entry holds the whole `analyze_code` result, so
+a hit also answers the executor's syntax and class-name questions.
+
+The policy version is a hash of the inspector whitelists and blocklists, the
+Java inspection engine and the detector patterns. It is rechecked on every lookup (a cheap fingerprint of
+the live sets), so a policy change in this process empties the cache instead of
+serving verdicts made under the old rules.
+"""
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from . import inspector, detector
+
+SANITIZER_CACHE = os.getenv("SANITIZER_CACHE", "1") != "0"
+SANITIZER_CACHE_SIZE = int(os.getenv("SANITIZER_CACHE_SIZE", 4096))
+
+_version_lock = threading.Lock()
+_version = (None, None)  # (fingerprint, version)
+
+
+def _policy():
+    settings = tuple(
+        (name, frozenset(value) if isinstance(value, (set, frozenset)) else value)
+        for name, value in ((name, getattr(inspector, name)) for name in inspector.POLICY_SETTINGS)
+    )
+    patterns = tuple(
+        (lang, detector.rules_fingerprint(rules))
+        for lang, rules in sorted(detector.DETECTORS.items())
+    )
+    return settings, patterns
+
+
+def policy_version() -> str:
+    """Hash of the current sanitizer policy (whitelists, blocklists, detector patterns)."""
+    global _version
+    policy = _policy()
+    fingerprint = hash(policy)
+    with _version_lock:
+        if _version[0] != fingerprint:
+            settings, patterns = policy
+            text = repr((
+                [(name, sorted(value) if isinstance(value, frozenset) else value) for name, value in settings],
+                patterns,
+            ))
+            _version = (fingerprint, hashlib.sha256(text.encode()).hexdigest()[:16])
+        return _version[1]
+
+
+def make_key(lang: str, code: str) -> tuple:
+    return lang, hashlib.sha256(code.encode()).hexdigest(), policy_version()
+
+
+class VerdictCache:
+    """Thread-safe LRU of sanitizer verdicts, emptied when the policy version changes."""
+
+    def __init__(self, size):
+        self._size = size
+        self._entries = OrderedDict()  # key -> verdict
+        self._version = None
+        self._hits = 0
+        self._misses = 0
+        self._invalidations = 0
+        self._lock = threading.Lock()
+
+    def _check_version(self, key):
+        version = key[2]
+        if version != self._version:
+            if self._entries:
+                self._invalidations += 1
+            self._entries.clear()
+            self._version = version
+
+    def get(self, key):
+        """Return a copy of the cached verdict, or None."""
+        with self._lock:
+            self._check_version(key)
+            verdict = self._entries.get(key)
+            if verdict is None:
+                self._misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self._hits += 1
+            return {**verdict, "violations": list(verdict["violations"])}
+
+    def put(self, key, verdict):
+        with self._lock:
+            self._check_version(key)
+            self._entries[key] = {**verdict, "violations": list(verdict["violations"])}
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "enabled": SANITIZER_CACHE,
+                "entries": len(self._entries),
+                "max_entries": self._size,
+                "policy_version": self._version,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / lookups, 4) if lookups else 0.0,
+                "invalidations": self._invalidations,
+            }
+
+
+_cache = VerdictCache(SANITIZER_CACHE_SIZE)
+
+
+def get(key):
+    return _cache.get(key) if SANITIZER_CACHE else None
+
+
+def put(key, verdict):
+    if SANITIZER_CACHE:
+        _cache.put(key, verdict)
+
+
+def stats():
+    return _cache.stats()
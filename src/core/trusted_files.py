@@ -0,0 +1,123 @@
+"""
+Files the service builds once and then trusts: compiled artifacts, the C++
+precompiled header, the Java helper classes and the job database.
+
+They live under STATE_DIR in directories created by `private_dir`: mode 0700,
+owned by the service's uid, so a sandbox running under a uid of its own can
+neither read nor plant files there.
+
+In the default image the sandboxes run under the service's own uid, and no
+directory permission keeps them out. Artifacts that are later executed or
+compiled into other submissions are therefore signed as well: `sign` is an HMAC
+over their names and contents with a key that exists only in this process's
+memory (gunicorn workers forked after --preload share it), and a signature made
+by another key, or over altered files, does not verify. `fingerprint` is a
+cheap stat-based check that a verified file has not been rewritten since: any
+write or rename changes its inode change time.
+
+Directories that only processes sharing the key can use are named after
+KEY_OWNER, the pid that created the key, and `remove_stale` deletes those whose
+owner has exited.
+"""
+import os
+import hmac
+import stat
+import shutil
+import hashlib
+import tempfile
+
+STATE_DIR = os.getenv("STATE_DIR", os.path.join(tempfile.gettempdir(), f"code-exec-{os.getuid()}"))
+
+SIGNATURE = ".signature"
+
+_KEY = os.urandom(32)
+KEY_OWNER = os.getpid()
+
+
+def private_dir(path):
+    """Create `path` (mode 0700) unless it exists, and check that only this uid can use it.
+
+    Raises PermissionError for a directory owned by another user or a symlink.
+    """
+    os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid():
+        raise PermissionError(f"{path} is not a directory owned by this user")
+    if st.st_mode & 0o077:
+        os.chmod(path, 0o700)
+    return path
+
+
+def sign(directory, names):
+    """HMAC of the named files in `directory`, their names included."""
+    mac = hmac.new(_KEY, digestmod=hashlib.sha256)
+    for name in sorted(names):
+        with open(os.path.join(directory, name), 'rb') as f:
+            mac.update(f"{name}\0{os.fstat(f.fileno()).st_size}\0".encode())
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                mac.update(chunk)
+    return mac.hexdigest()
+
+
+def verify(directory, names, signature):
+    """Whether `signature` (from `sign`) matches the named files as they are now."""
+    try:
+        return hmac.compare_digest(sign(directory, names), signature)
+    except OSError:
+        return False
+
+
+def seal(directory, names):
+    """Sign the named files and store the signature next to them."""
+    with open(os.path.join(directory, SIGNATURE), 'w') as f:
+        f.write(sign(directory, names))
+
+
+def sealed(directory, names):
+    """Fingerprint of the named files when they still match their `seal`, else None.
+
+    The fingerprint is taken around the check, so a file rewritten meanwhile fails it.
+    """
+    paths = [os.path.join(directory, name) for name in names]
+    before = fingerprint(paths)
+    try:
+        with open(os.path.join(directory, SIGNATURE)) as f:
+            signature = f.read()
+    except OSError:
+        return None
+    if before is None or not verify(directory, names, signature) or fingerprint(paths) != before:
+        return None
+    return before
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def remove_stale(directory):
+    """Delete entries of `directory` named `...-<pid>` whose KEY_OWNER pid has exited."""
+    for name in os.listdir(directory):
+        owner = name.rsplit("-", 1)[-1]
+        if owner.isdigit() and int(owner) != KEY_OWNER and not _alive(int(owner)):
+            shutil.rmtree(os.path.join(directory, name), ignore_errors=True)
+
+
+def fingerprint(paths):
+    """(inode, size, mtime, ctime) of each path; None when one is missing."""
+    try:
+        return tuple(
+            (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns, st.st_ctime_ns)
+            for st in map(os.stat, paths)
+        )
+    except OSError:
+        return None
@@ -0,0 +1,65 @@
+"""
+Bookkeeping shared by the pools of long-lived helper processes (Node runners,
+javac daemons, scan workers).
+
+Each gunicorn worker process owns its pool: processes inherited through fork
+belong to the parent, so a pool first used in a new process starts out empty.
+Up to `size` processes exist at a time. Idle ones wait in a queue; a process
+that dies or fails to start gives up its slot (`_vacate`), which leaves None in
+the queue so that a thread waiting for a process starts one itself.
+"""
+import os
+import queue
+import threading
+
+
+class WorkerPool:
+    """Up to `size` helper processes owned by the current worker process."""
+
+    def __init__(self, size):
+        self._size = size
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._spawned = 0
+        self._owner = None
+
+    def _take(self, start, block=True):
+        """An idle process, or a new one from `start()` while the pool has a free slot.
+
+        Without `block`, raises queue.Empty when every process is in use. The slot
+        is given up again when `start()` raises.
+        """
+        while True:
+            with self._lock:
+                if self._owner != os.getpid():
+                    # Processes inherited through fork belong to the parent process
+                    self._idle, self._spawned, self._owner = queue.Queue(), 0, os.getpid()
+                spawn = self._idle.empty() and self._spawned < self._size
+                if spawn:
+                    self._spawned += 1
+            if spawn:
+                return self._restart(start)
+            item = self._idle.get(block)
+            if item is not None:
+                return item
+            # A slot was vacated: start a process in it, unless another thread was first
+
+    def _restart(self, start):
+        """`start()` in the slot of a process that is gone; gives the slot up if it raises."""
+        try:
+            return start()
+        except Exception:
+            self._vacate()
+            raise
+
+    def _vacate(self):
+        """Give up the slot of a process that is gone and wake a thread waiting for one."""
+        with self._lock:
+            if self._owner == os.getpid():
+                self._spawned -= 1
+        self._idle.put(None)
+
+    def _live(self):
+        """Processes this worker process has running or starting."""
+        with self._lock:
+            return self._spawned if self._owner == os.getpid() else 0
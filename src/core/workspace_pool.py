@@ -0,0 +1,193 @@
+"""
+Reusable sandbox workspaces for executions.
+
+With WORKSPACE_POOL=1 each worker process keeps WORKSPACE_POOL_SIZE directories
+under WORKSPACE_POOL_DIR (RAM-backed /dev/shm when available) and leases one per
+execution, instead of creating and recursively deleting a TemporaryDirectory on
+the container's overlay filesystem. A returned workspace is emptied in place and
+handed to the next execution.
+
+Quota: with WORKSPACE_POOL_MOUNT=1 (needs CAP_SYS_ADMIN) every workspace is its
+own tmpfs mount of WORKSPACE_QUOTA_MB, so writes past the quota fail with ENOSPC.
+Without it the per-file RLIMIT_FSIZE still applies, and workspaces found over the
+quota on return are counted in `quota_exceeded`.
+
+When every workspace is leased, callers wait up to WORKSPACE_LEASE_TIMEOUT
+seconds and then fall back to a plain temporary directory (`overflows`).
+"""
+import os
+import time
+import queue
+import shutil
+import logging
+import tempfile
+import threading
+import subprocess
+from contextlib import contextmanager
+
+WORKSPACE_POOL = os.getenv("WORKSPACE_POOL", "0") == "1"
+WORKSPACE_POOL_DIR = os.getenv(
+    "WORKSPACE_POOL_DIR",
+    os.path.join("/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir(), "code-exec-workspaces")
+)
+WORKSPACE_POOL_SIZE = int(os.getenv("WORKSPACE_POOL_SIZE", 8))
+WORKSPACE_QUOTA_MB = int(os.getenv("WORKSPACE_QUOTA_MB", 64))
+WORKSPACE_POOL_MOUNT = os.getenv("WORKSPACE_POOL_MOUNT", "0") == "1"
+WORKSPACE_LEASE_TIMEOUT = float(os.getenv("WORKSPACE_LEASE_TIMEOUT", 30))
+
+
+def _wipe(path):
+    """Empty `path` without removing it. Returns the number of bytes it held."""
+    used = 0
+    for entry in os.scandir(path):
+        if entry.is_dir(follow_symlinks=False):
+            for root, _, files in os.walk(entry.path):
+                used += sum(os.lstat(os.path.join(root, f)).st_size for f in files)
+            shutil.rmtree(entry.path)
+        else:
+            used += entry.stat(follow_symlinks=False).st_size
+            os.unlink(entry.path)
+    return used
+
+
+class WorkspacePool:
+    """Fixed set of workspaces owned by the current worker process."""
+
+    def __init__(self, root, size, quota_mb, mount=False):
+        self._root = root
+        self._size = size
+        self._quota = quota_mb * 1024 * 1024
+        self._mount = mount
+        self._lock = threading.Lock()
+        self._owner = None
+        self._idle = queue.Queue()
+        self._stats = {}
+
+    def _reset(self):
+        # Workspaces inherited through fork are still leased by the parent's threads
+        self._owner = os.getpid()
+        self._idle = queue.Queue()
+        self._stats = {
+            "leases": 0, "overflows": 0, "quota_exceeded": 0,
+            "wait_seconds_total": 0.0, "wait_seconds_max": 0.0,
+        }
+        os.makedirs(self._root, exist_ok=True)
+        self._remove_stale()
+        for i in range(self._size):
+            self._idle.put(self._create(i))
+
+    def _remove_stale(self):
+        """Delete workspaces left behind by worker processes that no longer exist."""
+        for entry in os.scandir(self._root):
+            pid = entry.name.split("-", 1)[0].split(".", 1)[0]
+            if not pid.isdigit() or int(pid) == os.getpid():
+                continue
+            try:
+                os.kill(int(pid), 0)
+                continue
+            except ProcessLookupError:
+                pass
+            except PermissionError:
+                continue
+            if os.path.ismount(entry.path):
+                subprocess.run(["umount", entry.path], capture_output=True)
+            shutil.rmtree(entry.path, ignore_errors=True)
+
+    def _create(self, index):
+        path = os.path.join(self._root, f"{os.getpid()}-{index}")
+        os.makedirs(path, mode=0o700, exist_ok=True)
+        if self._mount and not os.path.ismount(path):
+            res = subprocess.run(
+                ["mount", "-t", "tmpfs", "-o", f"size={self._quota},mode=0700", "tmpfs", path],
+                capture_output=True, text=True
+            )
+            if res.returncode != 0:
+                logging.warning("Workspace %s not mounted, quota is not enforced: %s", path, res.stderr.strip())
+        _wipe(path)
+        return path
+
+    @contextmanager
+    def lease(self):
+        """Yield an empty workspace directory for one execution."""
+        with self._lock:
+            if self._owner != os.getpid():
+                self._reset()
+
+        start = time.monotonic()
+        try:
+            path = self._idle.get(timeout=WORKSPACE_LEASE_TIMEOUT)
+        except queue.Empty:
+            path = None
+        waited = time.monotonic() - start
+        with self._lock:
+            self._stats["leases"] += 1
+            self._stats["wait_seconds_total"] += waited
+            self._stats["wait_seconds_max"] = max(self._stats["wait_seconds_max"], waited)
+            if path is None:
+                self._stats["overflows"] += 1
+
+        if path is None:
+            with tempfile.TemporaryDirectory() as d:
+                yield d
+            return
+
+        try:
+            yield path
+        finally:
+            self._release(path)
+
+    def _release(self, path):
+        try:
+            used = _wipe(path)
+        except OSError:
+            # Something the submission left behind cannot be removed in place
+            # (e.g. a directory it made unreadable); move it aside and start over
+            logging.warning("Failed to wipe workspace %s, replacing it", path, exc_info=True)
+            trash = f"{path}.trash-{time.monotonic_ns()}"
+            try:
+                os.rename(path, trash)
+            except OSError:
+                logging.exception("Dropping workspace %s from the pool", path)
+                with self._lock:
+                    self._size -= 1
+                return
+            shutil.rmtree(trash, ignore_errors=True)
+            os.makedirs(path, mode=0o700)
+            used = 0
+        if used > self._quota:
+            with self._lock:
+                self._stats["quota_exceeded"] += 1
+        self._idle.put(path)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats) if self._owner == os.getpid() else {}
+            available = self._idle.qsize() if self._owner == os.getpid() else self._size
+        leases = stats.get("leases", 0)
+        return {
+            "enabled": WORKSPACE_POOL,
+            "capacity": self._size,
+            "available": available,
+            "in_use": self._size - available,
+            "quota_mb": self._quota // (1024 * 1024),
+            "leases": leases,
+            "overflows": stats.get("overflows", 0),
+            "quota_exceeded": stats.get("quota_exceeded", 0),
+            "wait_seconds_avg": stats["wait_seconds_total"] / leases if leases else 0.0,
+            "wait_seconds_max": stats.get("wait_seconds_max", 0.0),
+        }
+
+
+_pool = WorkspacePool(WORKSPACE_POOL_DIR, WORKSPACE_POOL_SIZE, WORKSPACE_QUOTA_MB, WORKSPACE_POOL_MOUNT)
+
+
+def lease():
+    """Context manager yielding a working directory for one execution."""
+    if not WORKSPACE_POOL:
+        return tempfile.TemporaryDirectory()
+    return _pool.lease()
+
+
+def stats():
+    """Lease wait times and capacity of this worker's workspace pool."""
+    return _pool.stats()
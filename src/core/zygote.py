@@ -0,0 +1,146 @@
+"""
+Client side of the Python zygote backend (see zygote_server.py).
+
+Selected with PYTHON_BACKEND=zygote. Each worker process lazily starts one
+warm zygote that has already imported PYTHON_ALLOWED_MODULES; every test case
+is then a fork of that process instead of a fresh `python main.py`.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import signal
+import socket
+import tempfile
+import threading
+import selectors
+import subprocess
+
+from . import output_limit
+from .output_limit import OutputLimitExceeded
+from .security.inspector import PYTHON_ALLOWED_MODULES
+
+PYTHON_BACKEND = os.getenv("PYTHON_BACKEND", "process")
+
+_SERVER_SCRIPT = os.path.join(os.path.dirname(__file__), "zygote_server.py")
+
+
+class Zygote:
+    """Handle to one zygote process owned by the current worker process."""
+
+    def __init__(self, modules):
+        self._modules = sorted(modules)
+        self._lock = threading.Lock()
+        self._proc = None
+        self._owner = None
+        self._dir = None
+
+    @property
+    def _sock_path(self):
+        return os.path.join(self._dir, "zygote.sock")
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._proc and self._owner == os.getpid() and self._proc.poll() is None:
+                return
+            self._stop()
+            self._dir = tempfile.mkdtemp(prefix="zygote-")
+            self._proc = subprocess.Popen(
+                [sys.executable, _SERVER_SCRIPT, self._sock_path] + self._modules,
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE, cwd=self._dir
+            )
+            self._owner = os.getpid()
+            if self._proc.stdout.readline().strip() != b"ready":
+                self._stop()
+                raise RuntimeError("Python zygote failed to start")
+
+    def _stop(self):
+        # A zygote inherited through fork belongs to the parent; leave it alone
+        if self._proc and self._owner == os.getpid():
+            self._proc.kill()
+            self._proc.wait()
+        if self._dir and self._owner == os.getpid():
+            shutil.rmtree(self._dir, ignore_errors=True)
+        self._proc, self._dir = None, None
+
+    def run(self, src, cwd, stdin_data, timeout, limits, caps=None):
+        """Run `src` in a forked child. Returns (returncode, stdout, stderr, usage).
+
+        `usage` holds the child's "cpu_s" and "peak_rss_kb" (empty if it was killed).
+
+        Raises subprocess.TimeoutExpired (after killing the child) like subprocess.run,
+        and OutputLimitExceeded once stdout/stderr outgrow `caps` (bytes).
+        """
+        self._ensure_started()
+
+        conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        out_r, out_w = os.pipe()
+        err_r, err_w = os.pipe()
+        try:
+            with tempfile.TemporaryFile() as stdin_file:
+                stdin_file.write((stdin_data or "").encode())
+                stdin_file.seek(0)
+                conn.connect(self._sock_path)
+                request = {"src": src, "cwd": cwd, "limits": limits}
+                socket.send_fds(conn, [json.dumps(request).encode()], [stdin_file.fileno(), out_w, err_w])
+            # The child holds the write ends now; ours must go so EOF can be seen
+            os.close(out_w)
+            os.close(err_w)
+            out_w = err_w = None
+            return self._collect(conn, out_r, err_r, timeout, caps or output_limit.caps())
+        finally:
+            conn.close()
+            for fd in (out_r, err_r, out_w, err_w):
+                if fd is not None:
+                    os.close(fd)
+
+    def _collect(self, conn, out_r, err_r, timeout, caps):
+        streams = {out_r: [], err_r: [], conn.fileno(): []}
+        sizes = {out_r: 0, err_r: 0, conn.fileno(): 0}
+        limits = {out_r: caps[0], err_r: caps[1], conn.fileno(): float("inf")}
+        deadline = time.monotonic() + timeout
+        with selectors.DefaultSelector() as sel:
+            for fd in streams:
+                sel.register(fd, selectors.EVENT_READ)
+            while sel.get_map():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self._kill(streams[conn.fileno()])
+                    raise subprocess.TimeoutExpired("python", timeout)
+                for key, _ in sel.select(remaining):
+                    chunk = os.read(key.fd, 65536)
+                    if not chunk:
+                        sel.unregister(key.fd)
+                        continue
+                    streams[key.fd].append(chunk)
+                    sizes[key.fd] += len(chunk)
+                    if sizes[key.fd] > limits[key.fd]:
+                        self._kill(streams[conn.fileno()])
+                        raise OutputLimitExceeded("stdout" if key.fd == out_r else "stderr")
+
+        status = b"".join(streams[conn.fileno()]).decode().split()
+        # No exit line means the child was killed by a signal (rlimit, segfault, ...)
+        returncode = int(status[1]) if len(status) > 1 else -signal.SIGKILL
+        usage = {"cpu_s": float(status[2]), "peak_rss_kb": int(status[3])} if len(status) > 3 else {}
+        stdout = b"".join(streams[out_r]).decode(errors="replace")
+        stderr = b"".join(streams[err_r]).decode(errors="replace")
+        return returncode, stdout, stderr, usage
+
+    @staticmethod
+    def _kill(status_chunks):
+        status = b"".join(status_chunks).split(b"\n", 1)
+        if len(status) > 1 and status[0].isdigit():
+            try:
+                # The child leads its own process group (os.setsid in zygote_server)
+                os.killpg(int(status[0]), signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+
+
+_zygote = Zygote(PYTHON_ALLOWED_MODULES)
+
+
+def run(src, cwd, stdin_data, timeout, limits, caps=None):
+    """Run a Python submission through this worker's zygote."""
+    return _zygote.run(src, cwd, stdin_data, timeout, limits, caps)
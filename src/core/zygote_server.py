@@ -0,0 +1,148 @@
+"""
+Python fork-server ("zygote") for the `zygote` Python execution backend.
+
+Started by core.zygote as a standalone script:
+
+    python zygote_server.py <socket path> <module> [<module> ...]
+
+It pre-imports the whitelisted modules once, then listens on a Unix socket
+until its stdin (a pipe held by the owning worker) reaches EOF.
+Each connection carries one JSON request plus three file descriptors
+(stdin, stdout, stderr). The server forks a child per request; the child
+reports its pid, applies the requested rlimits, swaps in the passed fds and
+runs the submission as __main__. Its exit code, CPU seconds (user+sys) and
+peak RSS in KB are sent back on the same connection right before it exits.
+
+This file must not import anything from the application: the zygote's memory
+is inherited by every submission.
+"""
+import os
+import sys
+import json
+import runpy
+import signal
+import socket
+import resource
+import importlib
+import selectors
+import traceback
+
+MAX_FDS = 3
+
+
+def _preload(modules):
+    for name in modules:
+        try:
+            importlib.import_module(name)
+        except Exception:
+            pass
+
+
+def _exit_code(exc):
+    code = exc.code
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    print(code, file=sys.stderr)
+    return 1
+
+
+def _print_user_traceback(src):
+    """Print the traceback the way `python main.py` would, without zygote/runpy frames."""
+    etype, value, tb = sys.exc_info()
+    while tb is not None and tb.tb_frame.f_code.co_filename != src:
+        tb = tb.tb_next
+    traceback.print_exception(etype, value, tb)
+
+
+def _child(conn, request, fds):
+    signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+    # Lead a process group so the worker can kill everything the submission forks
+    os.setsid()
+    conn.sendall(f"{os.getpid()}\n".encode())
+
+    for res, value in request["limits"]:
+        resource.setrlimit(res, (value, value))
+    for target, fd in enumerate(fds):
+        os.dup2(fd, target)
+        os.close(fd)
+    os.chdir(request["cwd"])
+
+    sys.stdin = open(0, closefd=False)
+    sys.stdout = open(1, "w", closefd=False)
+    sys.stderr = open(2, "w", closefd=False)
+    sys.argv = [request["src"]]
+    if "random" in sys.modules:
+        # Every child would otherwise share the zygote's RNG state
+        sys.modules["random"].seed()
+
+    code = 0
+    try:
+        runpy.run_path(request["src"], run_name="__main__")
+    except SystemExit as e:
+        code = _exit_code(e)
+    except BaseException:
+        _print_user_traceback(request["src"])
+        code = 1
+    finally:
+        for stream in (sys.stdout, sys.stderr):
+            try:
+                stream.flush()
+            except Exception:
+                code = code or 1
+        try:
+            ru = resource.getrusage(resource.RUSAGE_SELF)
+            conn.sendall(f"{code} {ru.ru_utime + ru.ru_stime} {ru.ru_maxrss}\n".encode())
+        finally:
+            # The exit line is out: take down anything left in the group along with this process
+            try:
+                os.killpg(0, signal.SIGKILL)
+            finally:
+                os._exit(code & 0xFF)
+
+
+def serve(path, modules):
+    _preload(modules)
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)  # auto-reap children
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(path)
+    server.listen(128)
+    print("ready", flush=True)
+
+    # stdin is a pipe held by the owning worker: EOF means the worker is gone
+    sel = selectors.DefaultSelector()
+    sel.register(server, selectors.EVENT_READ)
+    sel.register(sys.stdin, selectors.EVENT_READ)
+
+    while True:
+        ready = [key.fileobj for key, _ in sel.select()]
+        if sys.stdin in ready:
+            os.unlink(path)
+            return
+        conn, _ = server.accept()
+        fds = []
+        try:
+            msg, fds, _, _ = socket.recv_fds(conn, 1 << 16, MAX_FDS)
+            request = json.loads(msg.decode())
+            if len(fds) != MAX_FDS:
+                continue
+            sys.stdout.flush()
+            sys.stderr.flush()
+            if os.fork() == 0:
+                try:
+                    server.close()
+                    _child(conn, request, fds)
+                finally:
+                    os._exit(1)
+        except Exception:
+            traceback.print_exc()
+        finally:
+            for fd in fds:
+                os.close(fd)
+            conn.close()
+
+
+if __name__ == "__main__":
+    serve(sys.argv[1], sys.argv[2:])
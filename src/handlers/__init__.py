@@ -3,4 +3,5 @@ from .problem_handler import ProblemHandler
 from .question_handler import QuestionHandler
 from .riddle_handler import RiddleHandler
 from .execution_handler import ExecutionHandler
-from .chunk_handler import ChunkHandler
\ No newline at end of file
+from .chunk_handler import ChunkHandler
+from .job_handler import JobHandler
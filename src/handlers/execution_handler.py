@@ -1,6 +1,8 @@
-from flask import request, jsonify
+import json
+from flask import request, jsonify, Response, stream_with_context
 from services import ExecutionService
-from core import execute_custom_code
+from services.execution_service import BATCH_MAX_SUBMISSIONS
+from core import execute_custom_code, admission
 
 class ExecutionHandler:
     def __init__(self):
@@ -45,3 +47,82 @@ class ExecutionHandler:
         
         res = self.execution_service.run_chunk_code(chunk_id, snippets, lang)
         return jsonify(res), (500 if res.get("status") == "error" else 200)
+
+    def stream_problem_code(self, problem_id):
+        """Execute code against a problem's test cases, streaming results as Server-Sent Events."""
+        lang = request.args.get('lang')
+        if not lang or not request.is_json:
+            return jsonify(status="error", message="Missing 'lang' or invalid body"), 400
+
+        data = request.get_json()
+        code = data.get('code')
+        if not code:
+            return jsonify(status="error", message="Missing 'code'"), 400
+
+        return self._event_stream(self.execution_service.stream_problem_code(problem_id, code, lang))
+
+    def stream_chunk_code(self, chunk_id):
+        """Execute chunk code against its test cases, streaming results as Server-Sent Events."""
+        lang = request.args.get('lang')
+        if not lang or not request.is_json:
+            return jsonify(status="error", message="Missing 'lang' or invalid body"), 400
+
+        data = request.get_json()
+        snippets = data.get('snippets', {})
+
+        return self._event_stream(self.execution_service.stream_chunk_code(chunk_id, snippets, lang))
+
+    def execute_problem_batch(self, problem_id):
+        """Execute many submissions against one problem, streaming results as NDJSON."""
+        if not request.is_json:
+            return jsonify(status="error", message="Invalid body"), 400
+
+        submissions = request.get_json().get('submissions')
+        if not isinstance(submissions, list) or not submissions:
+            return jsonify(status="error", message="Missing 'submissions'"), 400
+        if len(submissions) > BATCH_MAX_SUBMISSIONS:
+            return jsonify(status="error", message=f"At most {BATCH_MAX_SUBMISSIONS} submissions per batch"), 400
+
+        # `?lang=` is the default for entries that do not name their own language
+        default_lang = request.args.get('lang')
+        entries = []
+        for i, sub in enumerate(submissions):
+            if not isinstance(sub, dict):
+                return jsonify(status="error", message=f"Submission {i} must be an object"), 400
+            lang = sub.get('lang') or default_lang
+            if sub.get('submission_id') is None or not sub.get('code') or not lang:
+                return jsonify(status="error", message=f"Submission {i} needs 'submission_id', 'code' and 'lang'"), 400
+            entries.append({"submission_id": sub['submission_id'], "code": sub['code'], "lang": lang})
+
+        # Refused with 429 up front; entries rejected later report it in their result
+        admission.admit_background("run")
+        results = self.execution_service.run_problem_batch(problem_id, entries)
+
+        def generate():
+            try:
+                for res in results:
+                    yield json.dumps(res) + "\n"
+            finally:
+                results.close()
+
+        return Response(
+            stream_with_context(generate()),
+            mimetype="application/x-ndjson",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+
+    @staticmethod
+    def _event_stream(events):
+        def generate():
+            # Closing this generator (client went away) closes `events`, which cancels the run
+            try:
+                for name, data in events:
+                    yield f"event: {name}\ndata: {json.dumps(data)}\n\n"
+            finally:
+                events.close()
+
+        return Response(
+            stream_with_context(generate()),
+            mimetype="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
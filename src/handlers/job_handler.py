@@ -0,0 +1,39 @@
+from flask import request, jsonify
+from services import JobService
+
+class JobHandler:
+    def __init__(self):
+        self.job_service = JobService()
+
+    def submit_problem_code(self, problem_id):
+        """Queue code for execution against a problem's test cases."""
+        lang = request.args.get('lang')
+        if not lang or not request.is_json:
+            return jsonify(status="error", message="Missing 'lang' or invalid body"), 400
+
+        data = request.get_json()
+        code = data.get('code')
+        if not code:
+            return jsonify(status="error", message="Missing 'code'"), 400
+
+        job = self.job_service.submit_problem_code(problem_id, code, lang)
+        return jsonify(status="success", data=job), 202
+
+    def submit_chunk_code(self, chunk_id):
+        """Queue chunk snippets for execution against the chunk's test cases."""
+        lang = request.args.get('lang')
+        if not lang or not request.is_json:
+            return jsonify(status="error", message="Missing 'lang' or invalid body"), 400
+
+        data = request.get_json()
+        snippets = data.get('snippets', {})
+
+        job = self.job_service.submit_chunk_code(chunk_id, snippets, lang)
+        return jsonify(status="success", data=job), 202
+
+    def get_job(self, job_id):
+        """Poll a job's status and result."""
+        job = self.job_service.get_job(job_id)
+        if not job:
+            return jsonify(status="error", message="Job not found"), 404
+        return jsonify(status="success", data=job), 200
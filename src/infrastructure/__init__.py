@@ -1 +1,2 @@
 from .database import engine, SessionLocal, get_session
+from .job_queue import create_job_queue, MemoryJobQueue, SQLiteJobQueue, JobQueueFull
@@ -0,0 +1,223 @@
+"""
+Job queue backends for asynchronous code execution.
+
+JOB_QUEUE_BACKEND selects the store:
+  • sqlite  (default) — a single SQLite file shared by every worker process on
+                         the host, so any gunicorn worker can answer a poll.
+  • memory             — in-process only; enough for tests and single-process dev.
+
+Jobs move queued → running → done | failed. A running job whose lease expires
+(its worker died) becomes claimable again. Past JOB_MAX_PENDING queued jobs,
+`enqueue` raises JobQueueFull and the API answers 429.
+
+The SQLite file holds submitted code and results, so it lives in a 0700
+directory under STATE_DIR (the same one core.trusted_files uses), out of reach
+of a sandbox running under a uid of its own.
+"""
+import os
+import json
+import time
+import uuid
+import queue
+import stat
+import sqlite3
+import tempfile
+import threading
+from contextlib import contextmanager
+
+STATE_DIR = os.getenv("STATE_DIR", os.path.join(tempfile.gettempdir(), f"code-exec-{os.getuid()}"))
+
+JOB_QUEUE_BACKEND = os.getenv("JOB_QUEUE_BACKEND", "sqlite")
+JOB_QUEUE_PATH = os.getenv("JOB_QUEUE_PATH", os.path.join(STATE_DIR, "jobs", "jobs.sqlite3"))
+JOB_LEASE_SECONDS = int(os.getenv("JOB_LEASE_SECONDS", 300))
+JOB_TTL_SECONDS = int(os.getenv("JOB_TTL_SECONDS", 3600))
+JOB_MAX_PENDING = int(os.getenv("JOB_MAX_PENDING", 1000))
+JOB_RETRY_AFTER = int(os.getenv("JOB_RETRY_AFTER", 5))
+
+
+class JobQueueFull(Exception):
+    """JOB_MAX_PENDING jobs are already waiting to run."""
+
+    def __init__(self, retry_after=None):
+        self.retry_after = JOB_RETRY_AFTER if retry_after is None else retry_after
+        super().__init__(f"Too many queued jobs, retry in {self.retry_after}s")
+
+
+def _private_dir(path):
+    """Create `path` (mode 0700) unless it exists; refuse one this uid does not own."""
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid():
+        raise PermissionError(f"{path} is not a directory owned by this user")
+    if st.st_mode & 0o077:
+        os.chmod(path, 0o700)
+
+
+def _new_job(kind, payload):
+    return {
+        "id": str(uuid.uuid4()),
+        "kind": kind,
+        "payload": payload,
+        "status": "queued",
+        "result": None,
+        "created_at": time.time(),
+        "started_at": None,
+        "finished_at": None,
+    }
+
+
+def _public(job):
+    """Job fields exposed to API clients (the payload holds submitted code)."""
+    return {k: v for k, v in job.items() if k != "payload"}
+
+
+class MemoryJobQueue:
+    """In-process queue; jobs are only visible to the process that created them."""
+
+    def __init__(self):
+        self._jobs = {}
+        self._pending = queue.Queue()
+        self._lock = threading.Lock()
+
+    def enqueue(self, kind, payload):
+        job = _new_job(kind, payload)
+        with self._lock:
+            if self._pending.qsize() >= JOB_MAX_PENDING:
+                raise JobQueueFull()
+            self._jobs[job["id"]] = job
+            self._pending.put(job["id"])
+        return _public(job)
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return _public(job) if job else None
+
+    def claim(self, wait=0.0):
+        try:
+            job_id = self._pending.get(timeout=wait) if wait else self._pending.get_nowait()
+        except queue.Empty:
+            return None
+        with self._lock:
+            job = self._jobs[job_id]
+            job.update(status="running", started_at=time.time())
+            return dict(job)
+
+    def complete(self, job_id, result, failed=False):
+        with self._lock:
+            self._jobs[job_id].update(
+                status="failed" if failed else "done", result=result, finished_at=time.time()
+            )
+
+    def purge(self):
+        cutoff = time.time() - JOB_TTL_SECONDS
+        with self._lock:
+            for job_id in [k for k, j in self._jobs.items() if j["finished_at"] and j["finished_at"] < cutoff]:
+                del self._jobs[job_id]
+
+
+class SQLiteJobQueue:
+    """Queue stored in one SQLite file; safe across threads and processes on one host."""
+
+    def __init__(self, path):
+        self._path = path
+        _private_dir(os.path.dirname(os.path.abspath(path)))
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    result TEXT,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL,
+                    lease_until REAL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at)")
+
+    @contextmanager
+    def _connect(self):
+        # One short-lived connection per call: sqlite3 connections are not thread-safe
+        conn = sqlite3.connect(self._path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _row_to_job(row):
+        job = dict(row)
+        job.pop("lease_until", None)
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        return job
+
+    def enqueue(self, kind, payload):
+        job = _new_job(kind, payload)
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            (pending,) = conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued'").fetchone()
+            if pending >= JOB_MAX_PENDING:
+                conn.execute("ROLLBACK")
+                raise JobQueueFull()
+            conn.execute(
+                "INSERT INTO jobs (id, kind, payload, status, created_at) VALUES (?, ?, ?, ?, ?)",
+                (job["id"], kind, json.dumps(payload), job["status"], job["created_at"])
+            )
+            conn.execute("COMMIT")
+        return _public(job)
+
+    def get(self, job_id):
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return _public(self._row_to_job(row)) if row else None
+
+    def claim(self, wait=0.0):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("""
+                SELECT * FROM jobs
+                WHERE status = 'queued' OR (status = 'running' AND lease_until < ?)
+                ORDER BY created_at LIMIT 1
+            """, (now,)).fetchone()
+            if row:
+                conn.execute(
+                    "UPDATE jobs SET status = 'running', started_at = ?, lease_until = ? WHERE id = ?",
+                    (now, now + JOB_LEASE_SECONDS, row["id"])
+                )
+            conn.execute("COMMIT")
+
+        if row is None:
+            if wait:
+                time.sleep(wait)
+            return None
+        job = self._row_to_job(row)
+        job.update(status="running", started_at=now)
+        return job
+
+    def complete(self, job_id, result, failed=False):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, finished_at = ?, lease_until = NULL WHERE id = ?",
+                ("failed" if failed else "done", json.dumps(result), time.time(), job_id)
+            )
+
+    def purge(self):
+        with self._connect() as conn:
+            conn.execute(
+                "DELETE FROM jobs WHERE finished_at IS NOT NULL AND finished_at < ?",
+                (time.time() - JOB_TTL_SECONDS,)
+            )
+
+
+def create_job_queue():
+    """Build the queue selected by JOB_QUEUE_BACKEND."""
+    if JOB_QUEUE_BACKEND == "memory":
+        return MemoryJobQueue()
+    return SQLiteJobQueue(JOB_QUEUE_PATH)
@@ -0,0 +1,84 @@
+"""
+Blacklist detector: one combined scan vs one search per pattern.
+
+    cd src && python -m scripts.bench_detector [--repeat 200] [--size-kb 32] [--json]
+
+For each language it times `detect_violations` (the combined scanner) against
+the loop it replaced, which runs every pattern over the whole source, on
+
+  clean  the benchmark program repeated to --size-kb (no pattern matches, so
+         every pattern scans everything: the common case)
+  late   the same with a violation appended at the end
+  early  a violation at the start, then the clean source
+
+and prints the mean time per call in microseconds and the speed-up.
+"""
+import json
+import time
+import argparse
+
+from core.security.detector import DETECTORS, VIOLATION, detect_violations
+from scripts.benchmark import PROGRAMS
+
+VIOLATIONS = {
+    "python": "import subprocess\n",
+    "javascript": "require('child_process');\n",
+    "c": "int r = system(\"ls\");\n",
+    "cpp": "int r = system(\"ls\");\n",
+    "java": "new ProcessBuilder(\"ls\");\n",
+}
+
+
+def legacy_detect_violations(lang, code):
+    """The per-pattern loop `detect_violations` used before the combined scanner."""
+    violations = []
+    for regex, reason in DETECTORS.get(lang, []):
+        if regex.search(code):
+            if VIOLATION not in violations:
+                violations.append(VIOLATION)
+    return {"safe": len(violations) == 0, "violations": violations}
+
+
+def _mean_us(fn, lang, code, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn(lang, code)
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+def measure(lang, size_kb, repeat):
+    clean = PROGRAMS[lang] * max(1, size_kb * 1024 // len(PROGRAMS[lang]))
+    cases = {
+        "clean": clean,
+        "late": clean + VIOLATIONS[lang],
+        "early": VIOLATIONS[lang] + clean,
+    }
+    results = {}
+    for name, code in cases.items():
+        assert detect_violations(lang, code) == legacy_detect_violations(lang, code)
+        loop = _mean_us(legacy_detect_violations, lang, code, repeat)
+        combined = _mean_us(detect_violations, lang, code, repeat)
+        results[name] = {"loop_us": round(loop, 1), "combined_us": round(combined, 1), "speedup": round(loop / combined, 2)}
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--size-kb", type=int, default=32)
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+
+    results = {lang: measure(lang, args.size_kb, args.repeat) for lang in PROGRAMS}
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{args.size_kb} KB sources, {args.repeat} calls each, mean microseconds per call")
+    print(f"{'language':<12}{'case':<8}{'loop':>12}{'combined':>12}{'speed-up':>10}")
+    for lang, cases in results.items():
+        for name, res in cases.items():
+            print(f"{lang:<12}{name:<8}{res['loop_us']:>12}{res['combined_us']:>12}{res['speedup']:>9}x")
+
+
+if __name__ == "__main__":
+    main()
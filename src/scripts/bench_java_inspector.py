@@ -0,0 +1,139 @@
+"""
+Java whitelist inspection: javalang AST vs the linear token scan.
+
+    cd src && python -m scripts.bench_java_inspector [--repeat 20] [--scale 1 8 32] [--json]
+
+The sources are the seeded Java chunk templates (scripts/data/java/*/chunks*.json).
+Placeholders are filled with the chunk's own snippet code where the data has it,
+otherwise with `if (true) {`, the shape most described-snippet templates close;
+templates expecting another shape stay unparseable for javalang, as real partial
+submissions often are. --scale repeats everything below the imports to mimic
+large classes.
+
+The verdict check also covers ESCAPED, calls spelled with \\uXXXX escapes that
+javac decodes before lexing; the token scan must reject them even without
+javalang installed.
+
+For each scale it prints the mean time per template in microseconds for
+`inspect_java` (javalang) and `inspect_java_tokens`, the speed-up, how many
+templates javalang could not parse (and so passed unchecked), and how many
+verdicts the two engines disagree on.
+"""
+import os
+import re
+import glob
+import json
+import time
+import argparse
+
+from core.security import inspector
+from core.security.inspector import inspect_java, inspect_java_tokens
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data", "java")
+SNIPPET = re.compile(r"\{\{\{(\w+)\}\}\}")
+ESCAPED = [
+    'public class Main { void f() { new \\u0050rocessBuilder("ls").start(); } }',
+    'public class Main { void f() throws Exception { \\u0052untime.getRuntime().exec("ls"); } }',
+]
+
+
+def _java_template(chunk):
+    """(template code, {placeholder: snippet code}) from either chunk data layout."""
+    templates = chunk.get("templates", {})
+    if isinstance(templates, dict):
+        java = templates.get("java") or {}
+        # Snippets here are task descriptions, not code
+        return java.get("template_code"), {}
+    for t in templates:
+        if t.get("lang") == "java":
+            return t.get("code"), dict(t.get("snippets", []))
+    return None, {}
+
+
+def load_templates():
+    """(title, source) for every seeded Java chunk template, placeholders filled."""
+    templates = []
+    for path in sorted(glob.glob(os.path.join(DATA_DIR, "*", "chunks*.json"))):
+        with open(path) as f:
+            chunks = json.load(f)
+        for chunk in chunks:
+            code, snippets = _java_template(chunk)
+            if code:
+                fill = lambda m: snippets.get(m.group(1), "if (true) {")
+                templates.append((chunk["title"], SNIPPET.sub(fill, code)))
+    return templates
+
+
+def _scaled(code, scale):
+    """`code` with everything except its package and import lines repeated `scale` times."""
+    lines = code.splitlines()
+    head = [line for line in lines if line.startswith(("package ", "import "))]
+    body = [line for line in lines if not line.startswith(("package ", "import "))]
+    return "\n".join(head + body * scale)
+
+
+def _parses(code):
+    try:
+        inspector.javalang.parse.parse(code)
+        return True
+    except Exception:
+        return False
+
+
+def _mean_us(fn, sources, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for code in sources:
+            fn(code)
+    return (time.perf_counter() - started) / (repeat * len(sources)) * 1e6
+
+
+def measure(templates, scale, repeat):
+    sources = [_scaled(code, scale) for _, code in templates]
+    assert not any(inspect_java_tokens(code)["safe"] for code in ESCAPED)
+    tokens = _mean_us(inspect_java_tokens, sources, repeat)
+    result = {
+        "templates": len(sources),
+        "mean_kb": round(sum(map(len, sources)) / len(sources) / 1024, 1),
+        "tokens_us": round(tokens, 1),
+    }
+    if not inspector._HAS_JAVALANG:
+        return result
+    javalang = _mean_us(inspect_java, sources, repeat)
+    result.update({
+        "javalang_us": round(javalang, 1),
+        "speedup": round(javalang / tokens, 2),
+        "javalang_parse_failures": sum(not _parses(code) for code in sources),
+        "verdict_mismatches": sum(
+            inspect_java(code)["safe"] != inspect_java_tokens(code)["safe"] for code in sources + ESCAPED
+        ),
+    })
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--scale", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+
+    templates = load_templates()
+    results = {str(scale): measure(templates, scale, args.repeat) for scale in args.scale}
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    if not inspector._HAS_JAVALANG:
+        print("javalang is not installed: timing the token scan only")
+    print(f"{len(templates)} chunk templates, {args.repeat} rounds, mean microseconds per template")
+    print(f"{'scale':<7}{'KB':>7}{'javalang':>12}{'tokens':>10}{'speed-up':>10}{'unparsed':>10}{'mismatch':>10}")
+    for scale, res in results.items():
+        print(
+            f"{scale:<7}{res['mean_kb']:>7}{res.get('javalang_us', '-'):>12}{res['tokens_us']:>10}"
+            f"{str(res.get('speedup', '-')) + 'x':>10}{res.get('javalang_parse_failures', '-'):>10}"
+            f"{res.get('verdict_mismatches', '-'):>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
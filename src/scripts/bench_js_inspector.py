@@ -0,0 +1,141 @@
+"""
+JavaScript whitelist inspection: esprima delegate vs toDict() tree walk.
+
+    cd src && python -m scripts.bench_js_inspector [--repeat 5] [--size-kb 8 32 128] [--json]
+
+`inspect_javascript` checks nodes in an esprima delegate while the script is
+parsed. The path it replaced converted the whole AST to nested dicts with
+`toDict()` and walked them recursively. For each source size this prints the
+mean latency per call in milliseconds and the peak traced allocation of one
+call (tracemalloc) for both, and checks that their verdicts agree.
+
+Sources are generated functions (maps, loops, arrow functions, spreads) plus
+one `require('fs')`, so both paths report a violation.
+"""
+import json
+import time
+import argparse
+import tracemalloc
+
+from core.security import inspector
+from core.security.inspector import JS_BLOCKED_REQUIRES, inspect_javascript
+
+FUNCTION = (
+    "function f{i}(xs) {{\n"
+    "    const seen = new Map();\n"
+    "    for (const x of xs) {{ seen.set(x, (seen.get(x) || 0) + 1); }}\n"
+    "    return [...seen.entries()].filter(([k, v]) => v > 1).map(([k]) => Math.max(k, {i}));\n"
+    "}}\n"
+)
+
+
+def source(size_kb):
+    parts, size, i = ["const fs = require('fs');\n"], 0, 0
+    while size < size_kb * 1024:
+        parts.append(FUNCTION.format(i=i))
+        size += len(parts[-1])
+        i += 1
+    return "".join(parts)
+
+
+def _walk_esprima(node):
+    if isinstance(node, dict):
+        yield node
+        for v in node.values():
+            yield from _walk_esprima(v)
+    elif isinstance(node, list):
+        for item in node:
+            yield from _walk_esprima(item)
+
+
+def legacy_inspect_javascript(code):
+    """The toDict() walk `inspect_javascript` used before the delegate."""
+    violations = []
+    try:
+        tree = inspector.esprima.parseScript(code).toDict()
+    except Exception:
+        return {"safe": True, "violations": []}
+
+    for node in _walk_esprima(tree):
+        if not isinstance(node, dict) or 'type' not in node:
+            continue
+
+        if node['type'] == 'CallExpression':
+            callee = node.get('callee', {})
+            if callee.get('type') == 'Identifier' and callee.get('name') == 'require':
+                args = node.get('arguments', [])
+                if args and args[0].get('type') == 'Literal':
+                    mod = args[0].get('value', '')
+                    if mod in JS_BLOCKED_REQUIRES or mod not in ('', None):
+                        violations.append(f"require('{mod}') is not whitelisted")
+
+            if callee.get('type') == 'Identifier' and callee.get('name') in ('eval', 'Function'):
+                violations.append(f"{callee.get('name')}() is not allowed")
+
+        if node['type'] == 'MemberExpression':
+            obj = node.get('object', {})
+            prop = node.get('property', {})
+            if obj.get('name') == 'process' and prop.get('name') in ('env', 'exit', 'kill', 'pid', 'cwd'):
+                violations.append(f"process.{prop.get('name')} is not allowed")
+
+    return {"safe": len(violations) == 0, "violations": violations}
+
+
+def _mean_ms(fn, code, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn(code)
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def _peak_kb(fn, code):
+    tracemalloc.start()
+    try:
+        fn(code)
+        return tracemalloc.get_traced_memory()[1] / 1024
+    finally:
+        tracemalloc.stop()
+
+
+def measure(size_kb, repeat):
+    code = source(size_kb)
+    legacy, visitor = legacy_inspect_javascript(code), inspect_javascript(code)
+    assert sorted(legacy["violations"]) == sorted(visitor["violations"]) and not visitor["safe"]
+    walk_ms = _mean_ms(legacy_inspect_javascript, code, repeat)
+    visitor_ms = _mean_ms(inspect_javascript, code, repeat)
+    walk_kb = _peak_kb(legacy_inspect_javascript, code)
+    visitor_kb = _peak_kb(inspect_javascript, code)
+    return {
+        "walk_ms": round(walk_ms, 1),
+        "visitor_ms": round(visitor_ms, 1),
+        "speedup": round(walk_ms / visitor_ms, 2),
+        "walk_peak_kb": round(walk_kb),
+        "visitor_peak_kb": round(visitor_kb),
+        "memory_ratio": round(walk_kb / visitor_kb, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--size-kb", type=int, nargs="+", default=[8, 32, 128])
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+
+    if not inspector._HAS_ESPRIMA:
+        parser.exit(1, "esprima is not installed\n")
+    results = {str(kb): measure(kb, args.repeat) for kb in args.size_kb}
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{args.repeat} calls per size; latency is the mean per call, memory the peak of one call")
+    print(f"{'KB':<6}{'walk ms':>10}{'visitor ms':>12}{'speed-up':>10}{'walk KB':>10}{'visitor KB':>12}{'ratio':>8}")
+    for kb, res in results.items():
+        print(
+            f"{kb:<6}{res['walk_ms']:>10}{res['visitor_ms']:>12}{str(res['speedup']) + 'x':>10}"
+            f"{res['walk_peak_kb']:>10}{res['visitor_peak_kb']:>12}{str(res['memory_ratio']) + 'x':>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
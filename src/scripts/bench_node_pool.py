@@ -0,0 +1,83 @@
+"""
+Wall time of JavaScript submissions per backend: a fresh `node` per test case,
+pool runners that serve one case each, and pool runners reused across a
+submission's cases (NODE_POOL_MAX_JOBS).
+
+    cd src && python -m scripts.bench_node_pool [--submissions 20] [--tests 10] [--workers 4] [--memory-mb 16384] [--json]
+
+Each submission reads its input and prints it back, so the time is mostly
+node's startup and the runner round trips. Prints p50/p95 per submission in
+milliseconds. A plain `node` reserves gigabytes of address space at startup and
+dies under the default MAX_MEMORY_MB, so --memory-mb raises it for all backends.
+"""
+import json
+import time
+import argparse
+
+from core import executor, node_pool
+
+CODE = "let d = ''; process.stdin.on('data', c => d += c); process.stdin.on('end', () => console.log(d.trim()));"
+
+# (JAVASCRIPT_BACKEND, NODE_POOL_MAX_JOBS)
+BACKENDS = {
+    "process": ("process", None),
+    "pool-single-use": ("pool", 1),
+    "pool-reused": ("pool", node_pool.NODE_POOL_MAX_JOBS),
+}
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def measure(backend, submissions, n_tests, workers):
+    node_pool.JAVASCRIPT_BACKEND, max_jobs = BACKENDS[backend]
+    if max_jobs is not None:
+        node_pool.NODE_POOL_MAX_JOBS = max_jobs
+        # Runners from another setting carry a different CPU limit; start from a warm pool of our own
+        node_pool._pool = node_pool.NodePool(node_pool.NODE_POOL_SIZE)
+    tests = [{"input": str(i), "expected_output": str(i), "test_number": i} for i in range(1, n_tests + 1)]
+    # One untimed submission to start the pool
+    executor._run_interpreted(CODE, "javascript", tests, 5, workers)
+    time.sleep(0.5)
+
+    samples = []
+    for _ in range(submissions):
+        started = time.perf_counter()
+        res = executor._run_interpreted(CODE, "javascript", tests, 5, workers)
+        samples.append(time.perf_counter() - started)
+        assert res["status"] == "correct", res
+    return {
+        "p50_ms": round(_percentile(samples, 50) * 1000, 1),
+        "p95_ms": round(_percentile(samples, 95) * 1000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--submissions", type=int, default=20)
+    parser.add_argument("--tests", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=executor.MAX_PARALLEL_TESTS)
+    parser.add_argument("--memory-mb", type=int, default=16384)
+    parser.add_argument("--json", action="store_true", help="print machine-readable results")
+    args = parser.parse_args()
+    executor.MAX_MEMORY_MB = args.memory_mb
+
+    results = {
+        "submissions": args.submissions, "tests": args.tests, "workers": args.workers,
+        "node_pool_size": node_pool.NODE_POOL_SIZE,
+        "backends": {b: measure(b, args.submissions, args.tests, args.workers) for b in BACKENDS},
+    }
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{args.submissions} submissions x {args.tests} tests, {args.workers} workers, pool size {node_pool.NODE_POOL_SIZE}")
+    print(f"{'backend':<18}{'p50':>10}{'p95':>10}")
+    for backend, res in results["backends"].items():
+        print(f"{backend:<18}{res['p50_ms']:>10}{res['p95_ms']:>10}")
+
+
+if __name__ == "__main__":
+    main()
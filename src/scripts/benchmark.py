@@ -0,0 +1,293 @@
+"""
+Execution engine benchmark: latency per language and throughput under concurrency.
+
+    cd src && python -m scripts.benchmark [--langs c,cpp,java,python,javascript]
+        [--iterations 20] [--tests 10] [--concurrency 1,2,4,8] [--submissions 32]
+        [--output bench.json]
+    cd src && python -m scripts.benchmark --compare old.json new.json
+
+Canned programs (sum the integers on stdin) run through `execute_code` and
+`execute_custom_code` in this process, with the engine configured by the usual
+environment variables. Per language it reports p50/p95/p99 in milliseconds of
+
+  cold    unique source per run (compile cache miss): compile, first test,
+          each later test, and the whole submission
+  warm    the same source again (compile cache hit), same figures
+  custom  a whole `execute_custom_code` run
+
+and, for warm submissions, throughput (submissions/s) and latency at each
+--concurrency level. Languages whose toolchain is not installed are skipped.
+--output writes the results as JSON (stdout otherwise); --compare prints the
+p50 change of every figure between two such files.
+"""
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import platform
+import subprocess
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+
+from core import execute_code, execute_custom_code, admission, cpp_pch, executor
+from core.config import COMPILERS
+
+PROGRAMS = {
+    "c": (
+        '#include <stdio.h>\n\n'
+        'int main() {\n'
+        '    long long s = 0, x;\n'
+        '    while (scanf("%lld", &x) == 1) s += x;\n'
+        '    printf("%lld\\n", s);\n'
+        '    return 0;\n'
+        '}\n'
+    ),
+    "cpp": (
+        '#include <iostream>\n\n'
+        'int main() {\n'
+        '    long long s = 0, x;\n'
+        '    while (std::cin >> x) s += x;\n'
+        '    std::cout << s << "\\n";\n'
+        '}\n'
+    ),
+    "java": (
+        'import java.util.Scanner;\n\n'
+        'public class Main {\n'
+        '    public static void main(String[] args) {\n'
+        '        Scanner in = new Scanner(System.in);\n'
+        '        long s = 0;\n'
+        '        while (in.hasNextLong()) s += in.nextLong();\n'
+        '        System.out.println(s);\n'
+        '    }\n'
+        '}\n'
+    ),
+    "python": (
+        'import sys\n\n'
+        'print(sum(int(x) for x in sys.stdin.read().split()))\n'
+    ),
+    "javascript": (
+        "let data = '';\n"
+        "process.stdin.on('data', c => data += c);\n"
+        "process.stdin.on('end', () => {\n"
+        "    console.log(data.split(/\\s+/).filter(Boolean).reduce((a, b) => a + Number(b), 0));\n"
+        "});\n"
+    ),
+}
+COMMENT = {"python": "#"}
+
+# Engine settings recorded with every result file
+CONFIG_VARS = (
+    "PYTHON_BACKEND", "JAVASCRIPT_BACKEND", "JAVA_HARNESS", "JAVAC_DAEMON", "COMPILE_CACHE_ENABLED",
+    "CPP_PCH", "WORKSPACE_POOL", "SANDBOX_SPAWN", "PARALLEL_TESTS", "MAX_PARALLEL_TESTS", "ADMISSION_CONTROL",
+)
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def summarize(samples):
+    if not samples:
+        return None
+    return {
+        "n": len(samples),
+        "p50": round(percentile(samples, 50), 2),
+        "p95": round(percentile(samples, 95), 2),
+        "p99": round(percentile(samples, 99), 2),
+        "mean": round(sum(samples) / len(samples), 2),
+    }
+
+
+def make_tests(count, seed=0):
+    rng = random.Random(seed)
+    tests = []
+    for i in range(1, count + 1):
+        numbers = [rng.randint(-10**6, 10**6) for _ in range(100)]
+        tests.append({"input": " ".join(map(str, numbers)), "expected_output": str(sum(numbers)), "test_number": i})
+    return tests
+
+
+def available(lang):
+    cfg = COMPILERS[lang]
+    return all(shutil.which(tool) for tool in (cfg.get("compiler"), cfg.get("interpreter")) if tool)
+
+
+def _with_nonce(lang, code):
+    """Append a unique comment so the source misses the compile cache."""
+    return f"{code}{COMMENT.get(lang, '//')} {time.time_ns()} {random.random()}\n"
+
+
+def _submit(lang, code, tests, timeout):
+    started = time.perf_counter()
+    result = execute_code(code, lang, tests, timeout=timeout)
+    return result, (time.perf_counter() - started) * 1000
+
+
+def latency(lang, tests, iterations, timeout, cold):
+    figures = {"compile": [], "first_test": [], "per_test": [], "submission": []}
+    errors = []
+    for _ in range(iterations):
+        code = _with_nonce(lang, PROGRAMS[lang]) if cold else PROGRAMS[lang]
+        result, elapsed = _submit(lang, code, tests, timeout)
+        if result.get("status") != "correct":
+            errors.append(result.get("msg"))
+            continue
+        figures["submission"].append(elapsed)
+        if result.get("compile_time_ms") is not None:
+            figures["compile"].append(result["compile_time_ms"])
+        runs = [t["wall_time_ms"] for t in result["tests"]]
+        figures["first_test"].append(runs[0])
+        figures["per_test"].extend(runs[1:])
+    summary = {name: summarize(samples) for name, samples in figures.items()}
+    summary["errors"] = len(errors)
+    if errors:
+        summary["first_error"] = errors[0]
+    return summary
+
+
+def custom_latency(lang, iterations):
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        execute_custom_code(PROGRAMS[lang], lang)
+        samples.append((time.perf_counter() - started) * 1000)
+    return summarize(samples)
+
+
+def throughput(lang, tests, concurrency, submissions, timeout):
+    samples, failed = [], 0
+
+    def one(_):
+        result, elapsed = _submit(lang, PROGRAMS[lang], tests, timeout)
+        return result.get("status") == "correct", elapsed
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for ok, elapsed in pool.map(one, range(submissions)):
+            samples.append(elapsed)
+            failed += not ok
+    wall = time.perf_counter() - started
+    return {
+        "submissions": submissions,
+        "failed": failed,
+        "seconds": round(wall, 3),
+        "per_second": round(submissions / wall, 2),
+        "latency": summarize(samples),
+    }
+
+
+def run(args):
+    executor.warm_up()
+    # Let the C++ precompiled header finish so cold C++ numbers include it
+    deadline = time.monotonic() + 120
+    while not cpp_pch.flags_for("#include <iostream>\n", executor.C_CPP_FLAGS) and time.monotonic() < deadline:
+        if not cpp_pch.CPP_PCH or not shutil.which("g++"):
+            break
+        time.sleep(0.2)
+
+    tests = make_tests(args.tests)
+    results = {}
+    for lang in args.langs:
+        if not available(lang):
+            print(f"{lang}: skipped, toolchain not installed", file=sys.stderr)
+            results[lang] = {"skipped": "toolchain not installed"}
+            continue
+        print(f"{lang}: measuring", file=sys.stderr)
+        # Warm-up round, not measured
+        _submit(lang, PROGRAMS[lang], tests, args.timeout)
+        results[lang] = {
+            "cold": latency(lang, tests, args.iterations, args.timeout, cold=True),
+            "warm": latency(lang, tests, args.iterations, args.timeout, cold=False),
+            "custom": custom_latency(lang, args.iterations),
+            "throughput": {
+                str(c): throughput(lang, tests, c, args.submissions, args.timeout) for c in args.concurrency
+            },
+        }
+
+    return {"meta": meta(args), "languages": results}
+
+
+def meta(args):
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip() or None
+    except (OSError, subprocess.TimeoutExpired):
+        commit = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "host": platform.node(),
+        "cpus": os.cpu_count(),
+        "python": platform.python_version(),
+        "iterations": args.iterations,
+        "tests_per_submission": args.tests,
+        "config": {name: os.getenv(name) for name in CONFIG_VARS if os.getenv(name) is not None},
+    }
+
+
+def _p50s(node, prefix=""):
+    """Flatten a result tree into {"lang.section.figure": p50}."""
+    flat = {}
+    for key, value in node.items():
+        if isinstance(value, dict):
+            if "p50" in value:
+                flat[prefix + key] = value["p50"]
+            elif "per_second" in value:
+                flat[prefix + key + ".per_second"] = value["per_second"]
+                flat[prefix + key + ".latency"] = value["latency"]["p50"] if value["latency"] else None
+            else:
+                flat.update(_p50s(value, f"{prefix}{key}."))
+    return flat
+
+
+def compare(old_path, new_path):
+    with open(old_path) as f:
+        old = _p50s(json.load(f)["languages"])
+    with open(new_path) as f:
+        new = _p50s(json.load(f)["languages"])
+    print(f"{'figure':<42}{'old':>12}{'new':>12}{'change':>10}")
+    for name in sorted(old.keys() & new.keys()):
+        a, b = old[name], new[name]
+        change = f"{(b - a) / a * 100:+.1f}%" if a and b is not None else ""
+        print(f"{name:<42}{a if a is not None else '-':>12}{b if b is not None else '-':>12}{change:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--langs", default=",".join(PROGRAMS), type=lambda s: s.split(","))
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--tests", type=int, default=10, help="test cases per submission")
+    parser.add_argument("--concurrency", default="1,2,4,8", type=lambda s: [int(c) for c in s.split(",")])
+    parser.add_argument("--submissions", type=int, default=32, help="submissions per concurrency level")
+    parser.add_argument("--timeout", type=int, default=10)
+    parser.add_argument("--output", help="write JSON results to this file")
+    parser.add_argument("--compare", nargs=2, metavar=("OLD", "NEW"), help="compare two result files")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    unknown = [lang for lang in args.langs if lang not in PROGRAMS]
+    if unknown:
+        parser.error(f"unknown language(s): {', '.join(unknown)}")
+
+    # Benchmark submissions queue for execution slots instead of being rejected
+    with admission.waiting():
+        results = run(args)
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
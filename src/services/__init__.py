@@ -4,3 +4,4 @@ from .random_service import RandomService
 from .question_service import QuestionService
 from .riddle_service import RiddleService
 from .chunk_service import ChunkService
+from .job_service import JobService
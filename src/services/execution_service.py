@@ -1,8 +1,17 @@
+import os
 import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from repositories import ProblemRepository, TestCaseRepository, ChunkRepository
-from core import execute_code as core_execute
+from core import execute_code as core_execute, is_cheat_mode, admission, result_cache, AdmissionRejected
 from pybars import Compiler
 
+# Submissions evaluated concurrently by one batch request (each one may also run
+# its test cases in parallel, see MAX_PARALLEL_TESTS)
+BATCH_WORKERS = int(os.getenv("BATCH_WORKERS", 4))
+BATCH_MAX_SUBMISSIONS = int(os.getenv("BATCH_MAX_SUBMISSIONS", 1000))
+
 class ExecutionService:
     def __init__(self):
         self.test_case_repo = TestCaseRepository()
@@ -10,7 +19,7 @@ class ExecutionService:
         self.chunk_repo = ChunkRepository()
         self.compiler = Compiler()
 
-    def run_problem_code(self, problem_id, code, lang):
+    def run_problem_code(self, problem_id, code, lang, on_event=None):
         """Execute provided code against all test cases for a specific problem."""
         problem = self.problem_repo.find_by_id(problem_id)
         if not problem:
@@ -18,17 +27,85 @@ class ExecutionService:
             
         test_cases = self.test_case_repo.find_all_by_problem(problem_id)
         cfg = problem.config if hasattr(problem, 'config') else {}
-        
-        return core_execute(
+        version = result_cache.test_set_version(test_cases, cfg)
+
+        return self._execute_problem(problem_id, version, cfg, test_cases, code, lang, on_event)
+
+    def run_problem_batch(self, problem_id, submissions):
+        """Evaluate many submissions against one problem, yielding one result per submission.
+
+        The problem and its test cases are loaded once. Results are yielded as they
+        finish, each tagged with its `submission_id`. Byte-identical submissions in the
+        same language are executed once and share the result. Closing the generator
+        cancels submissions that have not started yet.
+        """
+        problem = self.problem_repo.find_by_id(problem_id)
+        if not problem:
+            yield {"status": "error", "message": "Problem not found"}
+            return
+
+        test_cases = self.test_case_repo.find_all_by_problem(problem_id)
+        cfg = problem.config if hasattr(problem, 'config') else {}
+        version = result_cache.test_set_version(test_cases, cfg)
+
+        groups = {}
+        for sub in submissions:
+            groups.setdefault((sub["lang"], sub["code"]), []).append(sub["submission_id"])
+
+        pool = ThreadPoolExecutor(max_workers=max(1, min(BATCH_WORKERS, len(groups))))
+        try:
+            futures = {
+                pool.submit(self._execute_queued, problem_id, version, cfg, test_cases, code, lang): ids
+                for (lang, code), ids in groups.items()
+            }
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except AdmissionRejected as e:
+                    result = {"status": "error", "msg": str(e), "retry_after": e.retry_after}
+                except Exception as e:
+                    logging.exception("Batch submission failed")
+                    result = {"status": "error", "msg": str(e)}
+                for submission_id in futures[future]:
+                    yield {"submission_id": submission_id, **result}
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    @classmethod
+    def _execute_queued(cls, problem_id, version, cfg, test_cases, code, lang):
+        # Batches wait in the background queue (pool threads do not inherit the
+        # caller's context, so this is set per submission)
+        with admission.waiting():
+            return cls._execute_problem(problem_id, version, cfg, test_cases, code, lang)
+
+    @staticmethod
+    def _execute_problem(problem_id, version, cfg, test_cases, code, lang, on_event=None):
+        """Grade one submission, answering repeats from the result cache.
+
+        Cheat mode bypasses the cache in both directions. Streaming callers always
+        execute (they want live events) but still refresh the cache.
+        """
+        key = None if is_cheat_mode() else result_cache.make_key(problem_id, version, lang, code)
+        if key and on_event is None:
+            cached = result_cache.get(key)
+            if cached:
+                return cached
+
+        result = core_execute(
             code=code, 
             lang=lang, 
             tests=test_cases, 
             timeout=cfg.get("timeout", 5),
             templates=cfg.get("templates", {}),
-            rules=cfg.get("rules", {})
+            rules=cfg.get("rules", {}),
+            parallel=cfg.get("parallel_tests"),
+            on_event=on_event
         )
+        if key:
+            result_cache.put(key, problem_id, result)
+        return result
 
-    def run_chunk_code(self, chunk_id, snippets_payload, lang):
+    def run_chunk_code(self, chunk_id, snippets_payload, lang, on_event=None):
         """Execute chunk by combining template code with provided snippets against chunk's expectations."""
         chunk = self.chunk_repo.find_by_id(chunk_id)
         if not chunk:
@@ -71,5 +148,48 @@ class ExecutionService:
             tests=test_cases,
             timeout=5,
             templates={},
-            rules={}
+            rules={},
+            on_event=on_event
         )
+
+    def stream_problem_code(self, problem_id, code, lang):
+        """Yield (event, data) pairs while executing code against a problem's test cases."""
+        return self._stream(lambda on_event: self.run_problem_code(problem_id, code, lang, on_event))
+
+    def stream_chunk_code(self, chunk_id, snippets_payload, lang):
+        """Yield (event, data) pairs while executing a chunk against its expectations."""
+        return self._stream(lambda on_event: self.run_chunk_code(chunk_id, snippets_payload, lang, on_event))
+
+    def _stream(self, run):
+        """Run `run(on_event)` on a helper thread and yield its events as they happen.
+
+        Yields "compile" and "test" events, then a final "done" event carrying the full
+        result. Closing the generator early (client disconnected) cancels the remaining
+        test cases.
+        """
+        events = queue.Queue()
+        cancelled = threading.Event()
+
+        def on_event(name, data):
+            events.put((name, data))
+            return not cancelled.is_set()
+
+        def worker():
+            try:
+                result = run(on_event)
+            except AdmissionRejected as e:
+                result = {"status": "error", "msg": str(e), "retry_after": e.retry_after}
+            except Exception as e:
+                logging.exception("Streaming execution failed")
+                result = {"status": "error", "msg": str(e)}
+            events.put(("done", result))
+
+        threading.Thread(target=worker, daemon=True).start()
+        try:
+            while True:
+                name, data = events.get()
+                yield name, data
+                if name == "done":
+                    return
+        finally:
+            cancelled.set()
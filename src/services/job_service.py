@@ -0,0 +1,90 @@
+import os
+import time
+import logging
+import threading
+from infrastructure import create_job_queue
+from core import admission, AdmissionRejected
+from services.execution_service import ExecutionService
+
+# In-process execution threads per web worker; set to 0 when running the
+# standalone worker (`python -m services.job_service`) instead.
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 2))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", 0.2))
+
+class JobService:
+    def __init__(self, job_queue=None, execution_service=None):
+        self.job_queue = job_queue or create_job_queue()
+        self.execution_service = execution_service or ExecutionService()
+        self._lock = threading.Lock()
+        self._owner = None
+
+    def submit_problem_code(self, problem_id, code, lang):
+        """Queue an execution against a problem's test cases and return the job."""
+        self.ensure_workers()
+        return self.job_queue.enqueue("problem", {"problem_id": str(problem_id), "code": code, "lang": lang})
+
+    def submit_chunk_code(self, chunk_id, snippets, lang):
+        """Queue a chunk execution and return the job."""
+        self.ensure_workers()
+        return self.job_queue.enqueue("chunk", {"chunk_id": str(chunk_id), "snippets": snippets, "lang": lang})
+
+    def get_job(self, job_id):
+        """Fetch job status and, once finished, its result."""
+        return self.job_queue.get(job_id)
+
+    def run_next(self, wait=0.0):
+        """Claim and execute a single job. Returns False when the queue was empty."""
+        job = self.job_queue.claim(wait=wait)
+        if not job:
+            return False
+
+        payload = job["payload"]
+        try:
+            # Queued jobs wait in the background queue, which is deeper and waits longer
+            with admission.waiting():
+                if job["kind"] == "problem":
+                    result = self.execution_service.run_problem_code(payload["problem_id"], payload["code"], payload["lang"])
+                else:
+                    result = self.execution_service.run_chunk_code(payload["chunk_id"], payload["snippets"], payload["lang"])
+            self.job_queue.complete(job["id"], result)
+        except AdmissionRejected as e:
+            self.job_queue.complete(job["id"], {"status": "error", "msg": str(e), "retry_after": e.retry_after}, failed=True)
+        except Exception as e:
+            logging.exception("Job %s failed", job["id"])
+            self.job_queue.complete(job["id"], {"status": "error", "msg": str(e)}, failed=True)
+        return True
+
+    def ensure_workers(self, count=None):
+        """Start the in-process execution threads once per worker process."""
+        count = JOB_WORKERS if count is None else count
+        with self._lock:
+            # Threads do not survive gunicorn's fork, so track the owning pid
+            if self._owner == os.getpid() or count <= 0:
+                return
+            self._owner = os.getpid()
+            for i in range(count):
+                threading.Thread(target=self.serve_forever, name=f"job-worker-{i}", daemon=True).start()
+
+    def serve_forever(self):
+        """Drain the queue until the process exits."""
+        last_purge = 0
+        while True:
+            try:
+                self.run_next(wait=JOB_POLL_INTERVAL)
+                if time.time() - last_purge > 60:
+                    self.job_queue.purge()
+                    last_purge = time.time()
+            except Exception:
+                logging.exception("Job worker loop error")
+                time.sleep(JOB_POLL_INTERVAL)
+
+if __name__ == "__main__":
+    # Standalone execution worker: python -m services.job_service [threads]
+    import sys
+    logging.basicConfig(level=logging.INFO)
+    service = JobService()
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else max(JOB_WORKERS, 1)
+    service.ensure_workers(threads)
+    logging.info("Job worker started with %d threads", threads)
+    while True:
+        time.sleep(3600)
@@ -1,6 +1,7 @@
 import io
 import zipfile
 from repositories import ProblemRepository, TestCaseRepository
+from core import result_cache
 
 class ProblemService:
     def __init__(self):
@@ -98,6 +99,10 @@ class ProblemService:
 
             if created:
                 created_testcases.append(created)
+
+        if created_testcases:
+            # Stale verdicts would ignore the new tests
+            result_cache.invalidate(problem_id)
             
         return {'status': 'success', 'data': {
             'created_count': len(created_testcases),
@@ -171,6 +176,9 @@ class ProblemService:
                 if created:
                     created_testcases.append(created)
 
+            if created_testcases:
+                result_cache.invalidate(problem_id)
+
             return {'status': 'success', 'data': {
                 'created_count': len(created_testcases),
                 'testcases': created_testcases,
@@ -0,0 +1,189 @@
+import threading
+import time
+import pytest
+from unittest.mock import patch
+from src.core import admission
+from src.core.admission import AdmissionRejected
+
+HANDLER_SERVICE = "api.routes.execution_routes.execution_handler.execution_service"
+
+
+@pytest.fixture(autouse=True)
+def limits(tmp_path, monkeypatch):
+    monkeypatch.setattr(admission, "ADMISSION_CONTROL", True)
+    monkeypatch.setattr(admission, "ADMISSION_DIR", str(tmp_path / "admission"))
+    monkeypatch.setattr(admission, "MAX_CONCURRENT_COMPILES", 1)
+    monkeypatch.setattr(admission, "MAX_CONCURRENT_RUNS", 2)
+    monkeypatch.setattr(admission, "ADMISSION_QUEUE_DEPTH", 1)
+    monkeypatch.setattr(admission, "ADMISSION_MAX_WAIT", 5)
+
+
+def _hold(kind, held, release):
+    with admission.slot(kind):
+        held.set()
+        release.wait(5)
+
+
+def _start_holder(kind):
+    held, release = threading.Event(), threading.Event()
+    thread = threading.Thread(target=_hold, args=(kind, held, release))
+    thread.start()
+    assert held.wait(5)
+    return thread, release
+
+
+def test_slots_are_limited_per_kind():
+    holders = [_start_holder("run") for _ in range(2)]
+    try:
+        assert admission.stats()["run"]["in_use"] == 2
+        # Compiles have their own slots
+        with admission.slot("compile"):
+            assert admission.stats()["compile"]["in_use"] == 1
+    finally:
+        for thread, release in holders:
+            release.set()
+            thread.join()
+    assert admission.stats()["run"]["in_use"] == 0
+
+
+def test_queued_caller_gets_the_next_free_slot():
+    thread, release = _start_holder("compile")
+    threading.Timer(0.2, release.set).start()
+
+    started = time.monotonic()
+    with admission.slot("compile"):
+        waited = time.monotonic() - started
+    thread.join()
+
+    assert waited >= 0.15
+    assert admission.stats()["compile"]["wait_seconds_max"] >= 0.15
+
+
+def test_rejects_when_the_queue_is_full():
+    thread, release = _start_holder("compile")
+    queued = threading.Thread(target=_hold, args=("compile", threading.Event(), threading.Event()))
+    queued.start()
+    try:
+        deadline = time.monotonic() + 5
+        while admission.stats()["compile"]["queued"] < 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        with pytest.raises(AdmissionRejected) as exc:
+            with admission.slot("compile"):
+                pass
+        assert exc.value.retry_after == admission.ADMISSION_RETRY_AFTER
+    finally:
+        release.set()
+        thread.join()
+        queued.join()
+
+
+def test_rejects_after_max_wait(monkeypatch):
+    monkeypatch.setattr(admission, "ADMISSION_MAX_WAIT", 0.1)
+    thread, release = _start_holder("compile")
+    try:
+        with pytest.raises(AdmissionRejected):
+            with admission.slot("compile"):
+                pass
+        assert admission.stats()["compile"]["queued"] == 0
+    finally:
+        release.set()
+        thread.join()
+
+
+def test_waiting_callers_use_the_background_queue(monkeypatch):
+    monkeypatch.setattr(admission, "ADMISSION_QUEUE_DEPTH", 0)
+    monkeypatch.setattr(admission, "ADMISSION_MAX_WAIT", 0)
+    thread, release = _start_holder("compile")
+    threading.Timer(0.1, release.set).start()
+
+    with admission.waiting():
+        with admission.slot("compile"):
+            pass
+    thread.join()
+
+
+def test_waiting_callers_are_rejected_past_the_background_limits(monkeypatch):
+    monkeypatch.setattr(admission, "ADMISSION_BACKGROUND_QUEUE_DEPTH", 0)
+    thread, release = _start_holder("compile")
+    try:
+        with pytest.raises(AdmissionRejected), admission.waiting():
+            with admission.slot("compile"):
+                pass
+        with pytest.raises(AdmissionRejected):
+            admission.admit_background("compile")
+
+        monkeypatch.setattr(admission, "ADMISSION_BACKGROUND_QUEUE_DEPTH", 1)
+        monkeypatch.setattr(admission, "ADMISSION_BACKGROUND_MAX_WAIT", 0.1)
+        admission.admit_background("compile")
+        with pytest.raises(AdmissionRejected), admission.waiting():
+            with admission.slot("compile"):
+                pass
+    finally:
+        release.set()
+        thread.join()
+
+
+def test_slots_takes_only_the_free_extra_slots():
+    with admission.slots("run", 4) as held:
+        assert held == 2 and admission.stats()["run"]["in_use"] == 2
+    assert admission.stats()["run"]["in_use"] == 0
+
+    thread, release = _start_holder("run")
+    try:
+        with admission.slots("run", 4) as held:
+            assert held == 1
+    finally:
+        release.set()
+        thread.join()
+
+
+def test_parallel_tests_hold_a_slot_per_sandbox(monkeypatch):
+    from src.core import executor, zygote
+
+    running, peak = [0], [0]
+    lock = threading.Lock()
+    real = executor._run_test_case
+
+    def counting(*args, **kwargs):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        try:
+            time.sleep(0.05)
+            return real(*args, **kwargs)
+        finally:
+            with lock:
+                running[0] -= 1
+
+    monkeypatch.setattr(executor, "_run_test_case", counting)
+    monkeypatch.setattr(executor, "PARALLEL_TESTS", True)
+    monkeypatch.setattr(zygote, "PYTHON_BACKEND", "process")
+    tests = [{"input": "", "expected_output": "1", "test_number": i} for i in range(1, 9)]
+    res = executor._run_interpreted("print(1)", "python", tests, 5, workers=4)
+
+    assert res["status"] == "correct"
+    assert peak[0] == admission.MAX_CONCURRENT_RUNS
+
+
+def test_disabled_admits_everything(monkeypatch):
+    monkeypatch.setattr(admission, "ADMISSION_CONTROL", False)
+    with admission.slot("compile"), admission.slot("compile"):
+        pass
+
+
+def test_rejection_returns_429_with_retry_after(client):
+    from core import AdmissionRejected as AppAdmissionRejected
+
+    with patch(HANDLER_SERVICE) as mock_svc:
+        mock_svc.run_problem_code.side_effect = AppAdmissionRejected("run", 7)
+        response = client.post("/code/abc-123?lang=python", json={"code": "print(1)"})
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "7"
+    assert response.get_json()["status"] == "error"
+
+
+def test_metrics_endpoint_reports_admission(client):
+    data = client.get("/metrics").get_json()["data"]["admission"]
+    assert {"limit", "in_use", "queued", "wait_seconds_avg"} <= set(data["compile"])
@@ -0,0 +1,73 @@
+import threading
+import pytest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from src.core import cheat
+
+
+@pytest.fixture
+def row(monkeypatch):
+    """The cheat_mode row, with a counter of how often it was read."""
+    state = SimpleNamespace(enabled=False, reads=0)
+
+    def get_row(session):
+        state.reads += 1
+        return state
+
+    monkeypatch.setattr(cheat, "SessionFactory", MagicMock())
+    monkeypatch.setattr(cheat, "_get_cheat_row", get_row)
+    monkeypatch.setattr(cheat, "engine", None)
+    monkeypatch.setattr(cheat, "_cached", None)
+    monkeypatch.setattr(cheat, "CHEAT_MODE_TTL", 60)
+    return state
+
+
+def test_flag_is_read_once_per_ttl(row, monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(cheat.time, "monotonic", lambda: now[0])
+
+    assert [cheat.is_cheat_mode() for _ in range(5)] == [False] * 5
+    assert row.reads == 1
+
+    row.enabled = True
+    now[0] += 61
+    assert cheat.is_cheat_mode() is True
+    assert row.reads == 2
+
+
+def test_concurrent_checks_share_one_read(row):
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cheat.is_cheat_mode())) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results == [False] * 8
+    assert row.reads == 1
+
+
+def test_notification_replaces_cached_value(row):
+    cheat.is_cheat_mode()
+
+    cheat._notified(True)
+    assert cheat.is_cheat_mode() is True
+    cheat._notified()
+    assert cheat.is_cheat_mode() is False
+    assert row.reads == 2
+
+
+def test_toggle_updates_local_cache(row, monkeypatch):
+    secret = "open sesame"
+    monkeypatch.setenv("CHEAT_CODE", cheat._hash_secret(secret))
+    assert cheat.is_cheat_mode() is False
+
+    res = cheat.toggle_cheat_mode(secret)
+
+    assert res["success"] and res["cheat_mode"] is True
+    assert cheat.is_cheat_mode() is True
+
+
+def test_without_database_cheat_mode_is_off(monkeypatch):
+    monkeypatch.setattr(cheat, "SessionFactory", None)
+    assert cheat.is_cheat_mode() is False
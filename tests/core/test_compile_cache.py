@@ -0,0 +1,86 @@
+import os
+import time
+import pytest
+from src.core import compile_cache
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    d = tmp_path / "cache"
+    monkeypatch.setattr(compile_cache, "COMPILE_CACHE_DIR", str(d))
+    monkeypatch.setattr(compile_cache, "COMPILE_CACHE_ENABLED", True)
+    return d
+
+
+def _build(tmp_path, name, payload):
+    out = tmp_path / name
+    out.mkdir()
+    (out / "main").write_bytes(payload)
+    return out
+
+
+def test_make_key_changes_with_every_input():
+    base = compile_cache.make_key("cpp", "int main(){}", [], "g++ 12")
+    assert base == compile_cache.make_key("cpp", "int main(){}", [], "g++ 12")
+    assert base != compile_cache.make_key("c", "int main(){}", [], "g++ 12")
+    assert base != compile_cache.make_key("cpp", "int main(){ }", [], "g++ 12")
+    assert base != compile_cache.make_key("cpp", "int main(){}", ["-O2"], "g++ 12")
+    assert base != compile_cache.make_key("cpp", "int main(){}", [], "g++ 13")
+
+
+def test_lookup_miss_then_hit(cache_dir, tmp_path):
+    build = _build(tmp_path, "build", b"binary")
+    dest = tmp_path / "dest"
+    dest.mkdir()
+
+    assert compile_cache.lookup("k1", str(dest)) is False
+    compile_cache.store("k1", str(build), ["main"])
+    assert compile_cache.lookup("k1", str(dest)) is True
+    assert (dest / "main").read_bytes() == b"binary"
+
+
+def test_disabled_cache_never_hits(cache_dir, tmp_path, monkeypatch):
+    build = _build(tmp_path, "build", b"binary")
+    compile_cache.store("k1", str(build), ["main"])
+    monkeypatch.setattr(compile_cache, "COMPILE_CACHE_ENABLED", False)
+    assert compile_cache.lookup("k1", str(tmp_path)) is False
+
+
+def test_evicts_least_recently_used(cache_dir, tmp_path, monkeypatch):
+    # 1 MB cap, three ~400 KB entries: the oldest untouched one must go
+    monkeypatch.setattr(compile_cache, "COMPILE_CACHE_MAX_MB", 1)
+    blob = b"x" * (400 * 1024)
+    for key in ("a", "b"):
+        compile_cache.store(key, str(_build(tmp_path, f"build-{key}", blob)), ["main"])
+    past = time.time() - 60
+    os.utime(cache_dir / "a", (past, past))
+    os.utime(cache_dir / "b", (past - 60, past - 60))
+
+    compile_cache.store("c", str(_build(tmp_path, "build-c", blob)), ["main"])
+
+    assert sorted(os.listdir(cache_dir)) == ["a", "c"]
+
+
+def test_altered_entry_is_a_miss_and_gets_replaced(cache_dir, tmp_path):
+    compile_cache.store("k1", str(_build(tmp_path, "build", b"binary")), ["main"])
+    (cache_dir / "k1" / "main").write_bytes(b"forged")
+    dest = tmp_path / "dest"
+    dest.mkdir()
+
+    assert compile_cache.lookup("k1", str(dest)) is False
+    assert not (dest / "main").exists()
+
+    compile_cache.store("k1", str(_build(tmp_path, "rebuild", b"binary")), ["main"])
+    assert compile_cache.lookup("k1", str(dest)) is True
+    assert (dest / "main").read_bytes() == b"binary"
+
+
+def test_planted_file_fails_the_entry(cache_dir, tmp_path):
+    compile_cache.store("k1", str(_build(tmp_path, "build", b"class")), ["main"])
+    (cache_dir / "k1" / "Evil.class").write_bytes(b"forged")
+    assert compile_cache.lookup("k1", str(tmp_path)) is False
+
+
+def test_cache_dir_is_private(cache_dir, tmp_path):
+    compile_cache.store("k1", str(_build(tmp_path, "build", b"binary")), ["main"])
+    assert os.stat(cache_dir).st_mode & 0o777 == 0o700
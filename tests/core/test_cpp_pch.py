@@ -0,0 +1,83 @@
+import shutil
+import pytest
+from src.core import cpp_pch, trusted_files
+
+STL = "#include <iostream>\n#include <vector>\nint main(){}"
+
+
+@pytest.fixture
+def ready(tmp_path, monkeypatch):
+    paths = [tmp_path / name for name in cpp_pch._FILES]
+    for path in paths:
+        path.write_text(path.name)
+    monkeypatch.setattr(cpp_pch, "CPP_PCH", True)
+    monkeypatch.setattr(cpp_pch, "_header", str(paths[0]))
+    monkeypatch.setattr(cpp_pch, "_fingerprint", trusted_files.fingerprint(paths))
+    return str(paths[0])
+
+
+def test_uses_header_when_includes_are_a_subset(ready):
+    assert cpp_pch.flags_for(STL, []) == ["-include", ready, "-Winvalid-pch"]
+
+
+def test_changed_header_is_dropped_and_rebuilt(ready, monkeypatch):
+    started = []
+    monkeypatch.setattr(cpp_pch, "warm_up", lambda flags: started.append(flags))
+    with open(ready + ".gch", "a") as f:
+        f.write("int injected;")
+
+    assert cpp_pch.flags_for(STL, []) == []
+    assert started == [[]]
+    assert cpp_pch._header is None
+
+
+def test_skips_headers_outside_the_bundle(ready):
+    assert cpp_pch.flags_for("#include <iostream>\n#include <regex>\n", []) == []
+
+
+def test_skips_c_style_only_and_header_less_code(ready):
+    assert cpp_pch.flags_for("#include <cstdio>\n#include <cstring>\n", []) == []
+    assert cpp_pch.flags_for("int main(){}", []) == []
+
+
+def test_does_not_wait_for_the_build(monkeypatch):
+    started = []
+    monkeypatch.setattr(cpp_pch, "CPP_PCH", True)
+    monkeypatch.setattr(cpp_pch, "_header", None)
+    monkeypatch.setattr(cpp_pch, "warm_up", lambda flags: started.append(flags))
+
+    assert cpp_pch.flags_for(STL, ["-O2"]) == []
+    assert started == [["-O2"]]
+
+
+@pytest.mark.skipif(not shutil.which("g++"), reason="g++ not installed")
+def test_build_publishes_header(tmp_path, monkeypatch):
+    monkeypatch.setattr(cpp_pch, "CPP_PCH_DIR", str(tmp_path))
+    monkeypatch.setattr(cpp_pch, "CPP_PCH_HEADERS", ("vector",))
+
+    header, fingerprint = cpp_pch._build([])
+
+    assert header.startswith(str(tmp_path))
+    assert (tmp_path / header).with_suffix(".hpp.gch").exists()
+    assert cpp_pch._build([]) == (header, fingerprint)
+
+
+@pytest.mark.skipif(not shutil.which("g++"), reason="g++ not installed")
+def test_build_replaces_altered_header(tmp_path, monkeypatch):
+    monkeypatch.setattr(cpp_pch, "CPP_PCH_DIR", str(tmp_path))
+    monkeypatch.setattr(cpp_pch, "CPP_PCH_HEADERS", ("vector",))
+    header, _ = cpp_pch._build([])
+    with open(header, "a") as f:
+        f.write('static int injected = puts("INJECTED");\n')
+
+    rebuilt, fingerprint = cpp_pch._build([])
+
+    assert rebuilt == header and fingerprint
+    with open(header) as f:
+        assert "INJECTED" not in f.read()
+
+
+def test_caused_by_matches_only_diagnostics_from_the_header():
+    clash = "In file included from /usr/include/c++/12/algorithm:73,\n                 from pch.hpp:4:\n"
+    assert cpp_pch.caused_by(clash)
+    assert not cpp_pch.caused_by("main.cpp:2:21: error: expected primary-expression before ';' token")
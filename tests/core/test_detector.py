@@ -0,0 +1,71 @@
+import re
+import pytest
+from src.core.security import detector
+from src.core.security.detector import DETECTORS, detect_violations, has_violation, matched_rules
+
+SAMPLES = {
+    "python": [
+        "import math\nprint(math.sqrt(2))\n",
+        "import os\nos . system('ls')\n",
+        "x = open('f')\n",
+        "reopen(1)\nmy_subprocess = 1\n",
+        "data = read('/proc/self/maps')\n",
+        "print(__BUILTINS__)\n",
+    ],
+    "javascript": [
+        "console.log(1);\n",
+        "const x = spawnSync('ls');\n",
+        "const y = myspawnSync;\n",
+        "const z = xexecSync;\n",
+        "require( 'fs' );\n",
+        "process.env.HOME\n",
+    ],
+    "c": [
+        "#include <stdio.h>\nint main() { printf(\"hi\"); }\n",
+        "int main() { mysystem(1); }\n",
+        "int main() { execve(\"/bin/sh\", 0, 0); }\n",
+        "FILE *f = FOPEN(\"/etc/passwd\", \"r\");\n",
+    ],
+    "java": [
+        "public class Main { public static void main(String[] a) {} }\n",
+        "Runtime.getRuntime().exec(\"ls\");\n",
+        "new FileInputStream(\"x\");\n",
+        "String url = \"MyURLs\";\n",
+        "import java.lang.reflect.Method;\n",
+    ],
+}
+
+
+def _loop(lang, code):
+    return any(regex.search(code) for regex, _ in DETECTORS[lang])
+
+
+@pytest.mark.parametrize("lang, code", [(lang, code) for lang, codes in SAMPLES.items() for code in codes])
+def test_combined_scanner_agrees_with_pattern_loop(lang, code):
+    assert has_violation(lang, code) is _loop(lang, code)
+    assert detect_violations(lang, code)["safe"] is not _loop(lang, code)
+    assert bool(matched_rules(lang, code)) is _loop(lang, code)
+
+
+def test_reports_rules_that_fired():
+    code = "import subprocess\nx = eval('1')\ny = eval('2')\n"
+    result = detect_violations("python", code, report_rules=True)
+    assert result["safe"] is False
+    assert result["violations"] == ["Security policy violation prohibited code pattern detected."]
+    assert result["rules"] == ["subprocess — process spawning", "eval() — arbitrary code execution"]
+
+
+def test_unknown_language_is_safe():
+    assert detect_violations("cobol", "CALL 'SYSTEM'") == {"safe": True, "violations": []}
+
+
+def test_alternatives_split_only_at_top_level():
+    assert detector._alternatives(r"a(b|c)[|]|\|d|e") == ["a(b|c)[|]", r"\|d", "e"]
+
+
+def test_scanner_follows_rule_changes(monkeypatch):
+    assert not has_violation("python", "import pickle\n")
+    rules = DETECTORS["python"] + [(re.compile(r"\bpickle\b"), "pickle")]
+    monkeypatch.setitem(DETECTORS, "python", rules)
+    assert has_violation("python", "import pickle\n")
+    assert matched_rules("python", "import pickle\n") == ["pickle"]
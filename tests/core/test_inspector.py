@@ -3,8 +3,12 @@ from src.core.security.inspector import (
     inspect_python,
     inspect_javascript,
     inspect_java,
-    inspect_c_cpp
+    inspect_c_cpp,
+    inspect_java_tokens,
+    analyze,
+    java_class_name,
 )
+from src.core.security import inspector
 
 def test_inspect_python_safe():
     code = """
@@ -52,6 +56,13 @@ def test_inspect_javascript_unsafe_eval():
     assert result["safe"] is False
     assert any("eval" in v for v in result["violations"])
 
+def test_inspect_javascript_unsafe_process_and_function():
+    code = "const f = () => process.exit(1);\nconst g = Function('return 1');\n"
+    result = inspect_javascript(code)
+    assert result["safe"] is False
+    assert "process.exit is not allowed" in result["violations"]
+    assert "Function() is not allowed" in result["violations"]
+
 def test_inspect_java_safe():
     code = """
 import java.util.Scanner;
@@ -104,3 +115,112 @@ def test_inspect_c_cpp_unsafe():
     result = inspect_c_cpp(code)
     assert result["safe"] is False
     assert any("unistd.h" in v for v in result["violations"])
+
+def test_analyze_python_reports_syntax_error():
+    result = analyze("python", "def f(:\n    pass\n")
+    assert result["safe"] is True
+    assert "SyntaxError" in result["syntax_error"]
+    assert 'File "main.py", line 1' in result["syntax_error"]
+
+def test_analyze_python_reuses_parse_for_whitelist():
+    result = analyze("python", "import os\n")
+    assert result["safe"] is False
+    assert result["syntax_error"] is None
+
+def test_analyze_java_finds_public_class():
+    code = """
+class Helper {}
+// public class Commented {}
+public class Solution {
+    public static void main(String[] args) {}
+}
+"""
+    assert analyze("java", code)["class_name"] == "Solution"
+    assert java_class_name(code) == "Solution"
+
+def test_inspect_java_tokens_matches_ast_rules():
+    code = """
+import java.util.*;
+import java.io.File;
+
+public class Main {
+    public static void main(String[] args) {
+        // Runtime.getRuntime().exec("in a comment")
+        String s = "new File(\\"x\\") System.exit(0)";
+        Runtime.getRuntime().exec("sh");
+        System.exit(0);
+        new ProcessBuilder("ls");
+        List<Integer> xs = new ArrayList<>();
+        xs.add(1);
+    }
+}
+"""
+    result = inspect_java_tokens(code)
+    assert result["violations"] == [
+        "Import 'java.io.File' is not whitelisted",
+        "Runtime.exec() is not allowed",
+        "System.exit() is not allowed",
+        "new ProcessBuilder() is not allowed",
+    ]
+
+def test_inspect_java_tokens_checks_qualified_names():
+    code = """
+public class Main {
+    void f() throws Exception {
+        new java.net.ServerSocket(80);
+        java.nio.file.Files.readAllBytes(null);
+        new java.util.HashMap<String, Integer>();
+    }
+"""  # unterminated: javalang would not parse this at all
+    result = inspect_java_tokens(code)
+    assert result["violations"] == [
+        "Reference to 'java.nio.file.Files' is not whitelisted",
+        "new ServerSocket() is not allowed",
+    ]
+
+@pytest.mark.parametrize("code", [
+    "class Main { Pos sun; void f() { sun.pos.set(1); } }",
+    "class Main { void f() { Pos sun = new Pos(); sun.pos.set(1); } }",
+    "class Main { void f(List<Pos> com, int n) { com.pos.set(n); } }",
+    "class Main { void f() { for (Pos org : all) { org.pos.set(1); } } }",
+    "class Main { void f() { try { g(); } catch (Exception jdk) { jdk.getCause().printStackTrace(); } } }",
+])
+def test_inspect_java_tokens_skips_variables_named_like_packages(code):
+    assert inspect_java_tokens(code)["violations"] == []
+
+@pytest.mark.parametrize("code", [
+    "class Main { void g() { int java = 0; } void f() { java.nio.file.Files.readAllBytes(null); } }",
+    "class Main { void f() { { int java = 0; } java.nio.file.Files.readAllBytes(null); } }",
+    "class Main { void f() { java.nio.file.Files.readAllBytes(null); int java = 0; } }",
+    "class Main { void f() { for (int java : all) g(); java.nio.file.Files.readAllBytes(null); } }",
+    "class Main { void f() { Runnable r = java -> { java.nio.file.Files.readAllBytes(null); }; } }",
+])
+def test_inspect_java_tokens_checks_package_names_out_of_scope(code):
+    assert inspect_java_tokens(code)["violations"] == ["Reference to 'java.nio.file.Files' is not whitelisted"]
+
+def test_inspect_java_tokens_checks_new_despite_a_variable():
+    code = "class Main { Object java; void f() throws Exception { new java.net.ServerSocket(80); } }"
+    assert inspect_java_tokens(code)["violations"] == ["new ServerSocket() is not allowed"]
+
+@pytest.mark.parametrize("statement", [
+    'new \\u0050rocessBuilder("ls").start();',
+    '\\u0052untime.getRuntime().exec("ls");',
+    '\\uu0052untime.getRuntime().exec("ls");',
+])
+def test_inspect_java_tokens_decodes_unicode_escapes(statement):
+    code = "public class Main { void f() throws Exception { " + statement + " } }"
+    assert inspect_java_tokens(code)["safe"] is False
+    assert inspect_java(code)["safe"] is False
+
+def test_inspect_java_tokens_keeps_escaped_backslash():
+    # In "\\u0022" the backslash is escaped, so it is not a quote that would hide the call
+    code = 'public class Main { void f() { String s = "\\\\u0022"; Runtime.getRuntime().exec("x"); } }'
+    assert inspect_java_tokens(code)["violations"] == ["Runtime.exec() is not allowed"]
+
+def test_analyze_java_with_token_engine(monkeypatch):
+    monkeypatch.setattr(inspector, "JAVA_INSPECTOR", "tokens")
+    code = "class Helper {}\npublic final class Solution { String s = \"class Fake\"; }\n"
+    result = analyze("java", code)
+    assert result["safe"] is True
+    assert result["class_name"] == "Solution"
+
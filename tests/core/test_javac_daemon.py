@@ -0,0 +1,123 @@
+"""
+Tests for the javac daemon pool, driven by a fake `java` that speaks the
+CompileServer protocol (no JDK needed).
+"""
+import os
+import stat
+import subprocess
+import pytest
+from src.core import javac_daemon, java_harness
+
+FAKE_SERVER = r'''#!/usr/bin/env python3
+import sys, time, os
+for line in sys.stdin.buffer:
+    args = line.decode().rstrip("\n").split("\t")
+    if "CRASH" in args:
+        sys.exit(1)
+    if "HANG" in args:
+        time.sleep(30)
+    body = ("pid=%d args=%s\n" % (os.getpid(), " ".join(args))).encode()
+    code = 1 if "BAD" in args else 0
+    sys.stdout.buffer.write(b"%d %d\n" % (code, len(body)) + body)
+    sys.stdout.buffer.flush()
+'''
+
+FAKE_JAVAC = "#!/bin/sh\necho launcher >&2\nexit 0\n"
+
+
+@pytest.fixture
+def pool(tmp_path, monkeypatch):
+    for name, body in (("java", FAKE_SERVER), ("javac", FAKE_JAVAC)):
+        path = tmp_path / name
+        path.write_text(body)
+        path.chmod(path.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+    monkeypatch.setattr(java_harness, "harness_classpath", lambda env=None: str(tmp_path))
+    return javac_daemon.JavacDaemonPool(1)
+
+
+def _pid(res):
+    return res.stderr.split()[0]
+
+
+def test_returns_exit_code_and_diagnostics(pool):
+    ok = pool.run(["javac", "-J-Xshare:auto", "--release", "11", "/w/Main.java"], 5, "/w")
+    bad = pool.run(["javac", "BAD"], 5, "/w")
+
+    assert ok.returncode == 0
+    # Launcher-only options are dropped and the launcher's default classpath kept
+    assert ok.stderr.split("args=")[1] == "-cp /w --release 11 /w/Main.java\n"
+    assert bad.returncode == 1
+    assert _pid(ok) == _pid(bad)
+
+
+def test_recycles_after_max_compiles(pool, monkeypatch):
+    monkeypatch.setattr(javac_daemon, "JAVAC_DAEMON_MAX_COMPILES", 2)
+    pids = [_pid(pool.run(["javac", "x"], 5, "/w")) for _ in range(4)]
+
+    assert pids[0] == pids[1] != pids[2] == pids[3]
+
+
+def test_crash_falls_back_to_launcher_and_recovers(pool, tmp_path):
+    first = _pid(pool.run(["javac", "x"], 5, str(tmp_path)))
+    crashed = pool.run(["javac", "CRASH"], 5, str(tmp_path))
+    after = _pid(pool.run(["javac", "x"], 5, str(tmp_path)))
+
+    assert crashed.stderr == "launcher\n"
+    assert after != first
+
+
+def test_timeout_kills_daemon(pool):
+    first = _pid(pool.run(["javac", "x"], 5, "/w"))
+    with pytest.raises(subprocess.TimeoutExpired):
+        pool.run(["javac", "HANG"], 0.3, "/w")
+
+    assert _pid(pool.run(["javac", "x"], 5, "/w")) != first
+
+
+def test_failed_helper_build_is_not_retried_until_backoff(tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr(java_harness, "JAVA_HARNESS_DIR", str(tmp_path))
+    monkeypatch.setattr(java_harness, "_classpath", None)
+    monkeypatch.setattr(java_harness, "_retry_at", 0.0)
+    monkeypatch.setattr(
+        java_harness.subprocess, "run",
+        lambda cmd, **kw: calls.append(cmd) or subprocess.CompletedProcess(cmd, 1, "", "javac: broken"),
+    )
+
+    assert java_harness.harness_classpath() is None
+    assert java_harness.harness_classpath() is None
+    assert len(calls) == 1
+
+    monkeypatch.setattr(java_harness, "_retry_at", 0.0)
+    assert java_harness.harness_classpath() is None
+    assert len(calls) == 2
+
+
+def test_changed_helper_classes_are_rebuilt(tmp_path, monkeypatch):
+    builds = []
+
+    def fake_javac(cmd, **kw):
+        out = cmd[cmd.index("-d") + 1]
+        for name in ("Harness.class", "CompileServer.class"):
+            with open(os.path.join(out, name), "w") as f:
+                f.write("build %d" % len(builds))
+        builds.append(cmd)
+        return subprocess.CompletedProcess(cmd, 0, "", "")
+
+    monkeypatch.setattr(java_harness, "JAVA_HARNESS_DIR", str(tmp_path))
+    monkeypatch.setattr(java_harness, "_classpath", None)
+    monkeypatch.setattr(java_harness, "_retry_at", 0.0)
+    monkeypatch.setattr(java_harness.subprocess, "run", fake_javac)
+
+    classpath = java_harness.harness_classpath()
+    assert java_harness.harness_classpath() == classpath
+    assert len(builds) == 1
+    assert os.stat(tmp_path).st_mode & 0o777 == 0o700
+
+    with open(os.path.join(classpath, "Harness.class"), "w") as f:
+        f.write("forged")
+    assert java_harness.harness_classpath() == classpath
+    assert len(builds) == 2
+    with open(os.path.join(classpath, "Harness.class")) as f:
+        assert f.read() == "build 1"
@@ -84,3 +84,9 @@ public class Main {
     result = sanitize_code("java", code)
     assert result["safe"] is False
     assert any("Security policy violation prohibited code pattern detected." in v for v in result["violations"])
+
+def test_sanitize_code_logs_detector_rules(caplog):
+    code = "import math\n# logs: os.system and eval('1')\n"
+    with caplog.at_level("WARNING"):
+        assert sanitize_code("python", code)["safe"] is False
+    assert "os.system / os.popen — shell execution; eval() — arbitrary code execution" in caplog.text
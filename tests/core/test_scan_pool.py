@@ -0,0 +1,67 @@
+import pytest
+from src.core.security import scan_pool, sanitizer, inspector
+from src.core.security.inspector import analyze
+
+BIG_JAVA = "public class Main {\n" + "".join(
+    f"    static int f{i}(int x) {{ for (int j = 0; j < x; j++) {{ x += j % 7; }} return x; }}\n"
+    for i in range(3000)
+) + "}\n"
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = scan_pool.ScanPool(1)
+    monkeypatch.setattr(scan_pool, "_pool", pool)
+    monkeypatch.setattr(scan_pool, "SCAN_POOL", True)
+    return pool
+
+
+@pytest.mark.parametrize("lang, code", [
+    ("python", "import math\nprint(math.pi)\n"),
+    ("python", "import socket\neval('1')\n"),
+    ("javascript", "const cp = require('child_process');\nprocess.exit(1);\n"),
+    ("java", "import java.net.Socket;\npublic class Main { void f() { new ProcessBuilder(); } }\n"),
+])
+def test_pooled_verdict_matches_inline(pool, lang, code):
+    assert scan_pool.inspect(lang, code) == analyze(lang, code)
+    assert pool.stats()["workers"] == 1
+
+
+def test_scan_over_budget_is_rejected_and_worker_replaced(pool, monkeypatch):
+    monkeypatch.setattr(scan_pool, "SCAN_TIMEOUT_MS", 20)
+    result = sanitizer.sanitize_code("java", BIG_JAVA)
+    assert result == {"safe": False, "violations": ["Security scan exceeded its time budget."]}
+    assert pool.stats() == {"workers": 0, "scans": 1, "timeouts": 1, "failures": 0}
+
+    monkeypatch.setattr(scan_pool, "SCAN_TIMEOUT_MS", 10000)
+    assert sanitizer.sanitize_code("java", "public class Main {}")["safe"] is True
+    assert pool.stats()["workers"] == 1
+
+
+def test_inspector_error_is_rejected(pool, monkeypatch):
+    # A very long expression makes ast.parse raise RecursionError, not SyntaxError;
+    # the parse takes about a second, so give it a budget it cannot run out of
+    monkeypatch.setattr(scan_pool, "SCAN_TIMEOUT_MS", 30000)
+    result = sanitizer.sanitize_code("python", "x = 1" + " + 1" * 1000000)
+    assert "Security scan failed." in result["violations"]
+    assert pool.stats()["failures"] == 1
+
+
+def test_policy_change_reaches_running_worker(pool, monkeypatch):
+    assert scan_pool.inspect("python", "import os\n")["safe"] is False
+    monkeypatch.setattr(inspector, "PYTHON_ALLOWED_MODULES", inspector.PYTHON_ALLOWED_MODULES | {"os"})
+    assert scan_pool.inspect("python", "import os\n")["safe"] is True
+    assert pool.stats()["workers"] == 1
+
+
+def test_disabled_pool_scans_inline(pool, monkeypatch):
+    monkeypatch.setattr(scan_pool, "SCAN_POOL", False)
+    assert scan_pool.inspect("python", "import os\n")["safe"] is False
+    assert pool.stats()["workers"] == 0
+
+
+def test_worker_that_cannot_start_is_rejected(pool, monkeypatch):
+    monkeypatch.setattr(scan_pool.sys, "executable", "/nonexistent/python")
+    result = sanitizer.sanitize_code("python", "print('cannot start')\n")
+    assert result == {"safe": False, "violations": ["Security scan could not be started."]}
+    assert pool.stats()["workers"] == 0
@@ -0,0 +1,44 @@
+import os
+import pytest
+from src.core import trusted_files
+
+
+def test_private_dir_is_created_private_and_tightened(tmp_path):
+    path = trusted_files.private_dir(str(tmp_path / "state" / "cache"))
+    assert os.stat(path).st_mode & 0o777 == 0o700
+
+    os.chmod(path, 0o777)
+    trusted_files.private_dir(path)
+    assert os.stat(path).st_mode & 0o777 == 0o700
+
+
+def test_private_dir_refuses_a_symlink(tmp_path):
+    (tmp_path / "elsewhere").mkdir()
+    os.symlink(tmp_path / "elsewhere", tmp_path / "cache")
+    with pytest.raises(PermissionError):
+        trusted_files.private_dir(str(tmp_path / "cache"))
+
+
+def test_sealed_files_fail_once_changed_or_added(tmp_path):
+    (tmp_path / "main").write_bytes(b"binary")
+    trusted_files.seal(str(tmp_path), ["main"])
+    assert trusted_files.sealed(str(tmp_path), ["main"])
+
+    (tmp_path / "extra").write_bytes(b"")
+    assert trusted_files.sealed(str(tmp_path), ["main", "extra"]) is None
+    (tmp_path / "main").write_bytes(b"forged")
+    assert trusted_files.sealed(str(tmp_path), ["main"]) is None
+
+
+def test_signature_from_another_key_does_not_verify(tmp_path, monkeypatch):
+    (tmp_path / "main").write_bytes(b"binary")
+    trusted_files.seal(str(tmp_path), ["main"])
+    monkeypatch.setattr(trusted_files, "_KEY", os.urandom(32))
+    assert trusted_files.sealed(str(tmp_path), ["main"]) is None
+
+
+def test_remove_stale_keeps_entries_of_live_owners(tmp_path):
+    for name in (f"pch-{trusted_files.KEY_OWNER}", f"pch-{os.getppid()}", "pch-999999999"):
+        (tmp_path / name).mkdir()
+    trusted_files.remove_stale(str(tmp_path))
+    assert sorted(os.listdir(tmp_path)) == sorted([f"pch-{trusted_files.KEY_OWNER}", f"pch-{os.getppid()}"])
@@ -0,0 +1,52 @@
+import re
+import pytest
+from unittest.mock import patch
+from src.core.security import detector, inspector, sanitizer, scan_pool, verdict_cache
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = verdict_cache.VerdictCache(2)
+    monkeypatch.setattr(verdict_cache, "_cache", cache)
+    monkeypatch.setattr(verdict_cache, "SANITIZER_CACHE", True)
+    # Inline scans, so policy changes made in this process are seen by the inspectors
+    monkeypatch.setattr(scan_pool, "SCAN_POOL", False)
+    return cache
+
+
+def test_repeated_code_is_scanned_once(cache):
+    with patch.object(scan_pool, "inspect", wraps=scan_pool.inspect) as inspect:
+        first = sanitizer.sanitize_code("python", "import os\n")
+        second = sanitizer.sanitize_code("python", "import os\n")
+    assert first == second and first["safe"] is False
+    assert inspect.call_count == 1
+    assert cache.stats()["hits"] == 1 and cache.stats()["hit_rate"] == 0.5
+
+    # Callers may modify what they get back
+    second["violations"].clear()
+    assert sanitizer.sanitize_code("python", "import os\n") == first
+
+
+def test_whitelist_change_invalidates(cache, monkeypatch):
+    assert sanitizer.sanitize_code("python", "import os\n")["safe"] is False
+
+    monkeypatch.setattr(inspector, "PYTHON_ALLOWED_MODULES", inspector.PYTHON_ALLOWED_MODULES | {"os"})
+    assert sanitizer.sanitize_code("python", "import os\n")["safe"] is True
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_detector_pattern_change_changes_version(cache, monkeypatch):
+    before = verdict_cache.policy_version()
+    rules = detector.DETECTORS["python"] + [(re.compile(r"\bpickle\b"), "pickle")]
+    monkeypatch.setitem(detector.DETECTORS, "python", rules)
+    assert verdict_cache.policy_version() != before
+
+
+def test_lru_bound_and_scan_failures_not_cached(cache):
+    for code in ("a = 1\n", "b = 2\n", "c = 3\n"):
+        sanitizer.sanitize_code("python", code)
+    assert cache.stats()["entries"] == 2
+
+    with patch.object(scan_pool, "inspect", side_effect=scan_pool.ScanFailed("Security scan exceeded its time budget.")):
+        assert sanitizer.sanitize_code("python", "d = 4\n")["safe"] is False
+    assert sanitizer.sanitize_code("python", "d = 4\n")["safe"] is True
@@ -0,0 +1,44 @@
+import queue
+import pytest
+from src.core.worker_pool import WorkerPool
+
+
+def test_starts_up_to_size_then_reuses_idle():
+    pool = WorkerPool(2)
+    started = []
+    start = lambda: started.append(object()) or started[-1]
+
+    first, second = pool._take(start), pool._take(start)
+    with pytest.raises(queue.Empty):
+        pool._take(start, block=False)
+    pool._idle.put(first)
+    assert pool._take(start) is first
+    assert len(started) == 2 and pool._live() == 2
+
+
+def test_failed_start_gives_its_slot_up():
+    pool = WorkerPool(1)
+
+    def fail():
+        raise OSError("no such file")
+
+    with pytest.raises(OSError):
+        pool._take(fail)
+    assert pool._live() == 0
+    # The None left for waiting threads leads to a fresh start
+    assert pool._take(lambda: "worker") == "worker"
+    assert pool._live() == 1
+
+
+def test_vacated_slot_wakes_a_waiting_thread():
+    pool = WorkerPool(1)
+    assert pool._take(lambda: "old") == "old"
+    pool._vacate()
+    assert pool._take(lambda: "new", block=False) == "new"
+
+
+def test_processes_of_another_pid_are_not_reused(monkeypatch):
+    pool = WorkerPool(1)
+    pool._idle.put(pool._take(lambda: "parent's"))
+    monkeypatch.setattr(pool, "_owner", -1)
+    assert pool._take(lambda: "child's") == "child's"
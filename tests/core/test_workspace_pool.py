@@ -0,0 +1,88 @@
+import os
+import threading
+import pytest
+from src.core import workspace_pool
+from src.core.workspace_pool import WorkspacePool
+
+
+@pytest.fixture
+def pool(tmp_path):
+    return WorkspacePool(str(tmp_path / "ws"), size=2, quota_mb=1)
+
+
+def test_lease_returns_wiped_workspace(pool):
+    with pool.lease() as d:
+        first = d
+        os.makedirs(os.path.join(d, "sub", "deeper"))
+        open(os.path.join(d, "sub", "deeper", "f"), "w").write("x")
+        open(os.path.join(d, "main.py"), "w").write("print(1)")
+
+    assert os.listdir(first) == []
+    with pool.lease() as a, pool.lease() as b:
+        assert first in (a, b)
+        assert os.listdir(a) == [] and os.listdir(b) == []
+
+
+def test_workspaces_are_reused(pool):
+    seen = set()
+    for _ in range(5):
+        with pool.lease() as d:
+            seen.add(d)
+    assert len(seen) <= 2
+    assert pool.stats()["leases"] == 5
+
+
+def test_waits_for_a_free_workspace(pool, monkeypatch):
+    monkeypatch.setattr(workspace_pool, "WORKSPACE_LEASE_TIMEOUT", 5)
+    held = threading.Event()
+    release = threading.Event()
+
+    def hold():
+        with pool.lease():
+            held.set()
+            release.wait(5)
+
+    holders = [threading.Thread(target=hold) for _ in range(2)]
+    for t in holders:
+        t.start()
+    held.wait(5)
+    threading.Timer(0.2, release.set).start()
+
+    with pool.lease() as d:
+        assert os.path.isdir(d)
+    for t in holders:
+        t.join()
+
+    stats = pool.stats()
+    assert stats["overflows"] == 0
+    assert stats["wait_seconds_max"] >= 0.1
+    assert stats["available"] == stats["capacity"] == 2
+
+
+def test_overflow_falls_back_to_temporary_directory(pool, monkeypatch):
+    monkeypatch.setattr(workspace_pool, "WORKSPACE_LEASE_TIMEOUT", 0.05)
+    with pool.lease(), pool.lease(), pool.lease() as extra:
+        assert not extra.startswith(pool._root)
+    assert not os.path.exists(extra)
+    assert pool.stats()["overflows"] == 1
+
+
+def test_counts_workspaces_over_quota(pool):
+    with pool.lease() as d:
+        with open(os.path.join(d, "big"), "wb") as f:
+            f.write(b"\0" * (2 * 1024 * 1024))
+    assert pool.stats()["quota_exceeded"] == 1
+
+
+def test_disabled_pool_uses_temporary_directory(monkeypatch):
+    monkeypatch.setattr(workspace_pool, "WORKSPACE_POOL", False)
+    with workspace_pool.lease() as d:
+        assert os.path.isdir(d)
+    assert not os.path.exists(d)
+
+
+def test_metrics_endpoint_reports_pool(client):
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert {"capacity", "available", "wait_seconds_avg"} <= set(response.get_json()["data"]["workspaces"])
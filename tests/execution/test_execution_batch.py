@@ -0,0 +1,129 @@
+"""
+Unit tests for the batch evaluation endpoint (POST /code/<problem_id>/batch).
+
+Handler tests patch the ExecutionService instance created during blueprint
+registration. Service tests replace the repositories and `core_execute`, so
+nothing is executed for real.
+"""
+
+import json
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch, MagicMock
+
+from core import result_cache
+from services import execution_service
+from services.execution_service import ExecutionService
+
+HANDLER_SERVICE = "api.routes.execution_routes.execution_handler.execution_service"
+ENDPOINT = "/code/abc-123/batch"
+
+
+class TestBatchHandler:
+    def test_streams_ndjson(self, client):
+        lines = [{"submission_id": 1, "status": "success"}, {"submission_id": 2, "status": "incorrect"}]
+        with patch(HANDLER_SERVICE) as mock_svc:
+            mock_svc.run_problem_batch.return_value = (line for line in lines)
+
+            response = client.post(f"{ENDPOINT}?lang=python", json={"submissions": [
+                {"submission_id": 1, "code": "print(1)"},
+                {"submission_id": 2, "code": "print(2)", "lang": "javascript"},
+            ]})
+
+            assert response.status_code == 200
+            assert response.mimetype == "application/x-ndjson"
+            body = response.get_data(as_text=True)
+        assert [json.loads(line) for line in body.splitlines()] == lines
+        mock_svc.run_problem_batch.assert_called_once_with("abc-123", [
+            {"submission_id": 1, "code": "print(1)", "lang": "python"},
+            {"submission_id": 2, "code": "print(2)", "lang": "javascript"},
+        ])
+
+    def test_rejects_empty_batch(self, client):
+        with patch(HANDLER_SERVICE) as mock_svc:
+            response = client.post(ENDPOINT, json={"submissions": []})
+
+        assert response.status_code == 400
+        mock_svc.run_problem_batch.assert_not_called()
+
+    def test_rejects_entry_without_lang(self, client):
+        with patch(HANDLER_SERVICE) as mock_svc:
+            response = client.post(ENDPOINT, json={"submissions": [{"submission_id": 1, "code": "x"}]})
+
+        assert response.status_code == 400
+        mock_svc.run_problem_batch.assert_not_called()
+
+    def test_full_background_queue_is_429(self, client):
+        from core import AdmissionRejected
+
+        subs = [{"submission_id": 1, "code": "x", "lang": "python"}]
+        with patch(HANDLER_SERVICE) as mock_svc, \
+                patch("handlers.execution_handler.admission.admit_background", side_effect=AdmissionRejected("run", 7)):
+            response = client.post(ENDPOINT, json={"submissions": subs})
+
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "7"
+        mock_svc.run_problem_batch.assert_not_called()
+
+    def test_rejects_oversized_batch(self, client, monkeypatch):
+        monkeypatch.setattr("handlers.execution_handler.BATCH_MAX_SUBMISSIONS", 1)
+        subs = [{"submission_id": i, "code": "x", "lang": "python"} for i in range(2)]
+        with patch(HANDLER_SERVICE) as mock_svc:
+            response = client.post(ENDPOINT, json={"submissions": subs})
+
+        assert response.status_code == 400
+        mock_svc.run_problem_batch.assert_not_called()
+
+
+class TestRunProblemBatch:
+    @pytest.fixture(autouse=True)
+    def isolated(self, monkeypatch):
+        monkeypatch.setattr(execution_service, "is_cheat_mode", lambda: False)
+        monkeypatch.setattr(result_cache, "_cache", result_cache.ResultCache(60, 1024 * 1024))
+
+    def _service(self, problem=SimpleNamespace(config={"timeout": 2})):
+        svc = ExecutionService()
+        svc.problem_repo = MagicMock()
+        svc.problem_repo.find_by_id.return_value = problem
+        svc.test_case_repo = MagicMock()
+        svc.test_case_repo.find_all_by_problem.return_value = [
+            {"input": "", "expected_output": "1", "test_number": 1}
+        ]
+        return svc
+
+    def test_loads_tests_once_and_tags_results(self, monkeypatch):
+        svc = self._service()
+        calls = []
+
+        def fake_execute(code, lang, tests, **kwargs):
+            calls.append((lang, code))
+            return {"status": "success" if code == "good" else "incorrect", "tests": []}
+
+        monkeypatch.setattr(execution_service, "core_execute", fake_execute)
+        results = list(svc.run_problem_batch("p1", [
+            {"submission_id": "a", "code": "good", "lang": "python"},
+            {"submission_id": "b", "code": "bad", "lang": "python"},
+            {"submission_id": "c", "code": "good", "lang": "python"},
+        ]))
+
+        svc.test_case_repo.find_all_by_problem.assert_called_once_with("p1")
+        # Identical submissions are executed once and fanned out
+        assert sorted(calls) == [("python", "bad"), ("python", "good")]
+        by_id = {r["submission_id"]: r["status"] for r in results}
+        assert by_id == {"a": "success", "b": "incorrect", "c": "success"}
+
+    def test_missing_problem_yields_error(self):
+        svc = self._service(problem=None)
+
+        assert list(svc.run_problem_batch("p1", [])) == [{"status": "error", "message": "Problem not found"}]
+
+    def test_execution_error_is_reported_per_submission(self, monkeypatch):
+        svc = self._service()
+
+        def boom(**kwargs):
+            raise RuntimeError("boom")
+
+        monkeypatch.setattr(execution_service, "core_execute", boom)
+        results = list(svc.run_problem_batch("p1", [{"submission_id": 7, "code": "x", "lang": "python"}]))
+
+        assert results == [{"submission_id": 7, "status": "error", "msg": "boom"}]
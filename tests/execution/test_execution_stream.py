@@ -0,0 +1,115 @@
+"""
+Unit tests for the Server-Sent Events execution endpoints.
+
+Handler tests patch the ExecutionService instance created during blueprint
+registration; the service's event pump is driven with a fake runner.
+"""
+
+import json
+import threading
+from unittest.mock import patch
+
+from services.execution_service import ExecutionService
+
+HANDLER_SERVICE = "api.routes.execution_routes.execution_handler.execution_service"
+
+
+def _parse_sse(body):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.split("\n"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+class TestStreamProblemCode:
+    """Tests for POST /code/<problem_id>/stream."""
+
+    ENDPOINT = "/code/abc-123/stream"
+
+    def test_streams_events(self, client):
+        events = [
+            ("compile", {"status": "success"}),
+            ("test", {"case": 1, "status": "passed"}),
+            ("done", {"status": "success", "tests": [{"case": 1, "status": "passed"}]}),
+        ]
+        with patch(HANDLER_SERVICE) as mock_svc:
+            mock_svc.stream_problem_code.return_value = (e for e in events)
+
+            response = client.post(f"{self.ENDPOINT}?lang=python", json={"code": "print(1)"})
+
+            assert response.status_code == 200
+            assert response.mimetype == "text/event-stream"
+            assert response.headers["Cache-Control"] == "no-cache"
+            assert _parse_sse(response.get_data(as_text=True)) == events
+        mock_svc.stream_problem_code.assert_called_once_with("abc-123", "print(1)", "python")
+
+    def test_rejects_missing_code(self, client):
+        with patch(HANDLER_SERVICE) as mock_svc:
+            response = client.post(f"{self.ENDPOINT}?lang=python", json={})
+
+        assert response.status_code == 400
+        mock_svc.stream_problem_code.assert_not_called()
+
+
+class TestStreamChunkCode:
+    """Tests for POST /chunk/execute/<chunk_id>/stream."""
+
+    def test_streams_events(self, client):
+        events = [("done", {"status": "success", "tests": []})]
+        with patch(HANDLER_SERVICE) as mock_svc:
+            mock_svc.stream_chunk_code.return_value = (e for e in events)
+
+            response = client.post("/chunk/execute/c-1/stream?lang=cpp", json={"snippets": {"a": "b"}})
+
+            assert _parse_sse(response.get_data(as_text=True)) == events
+        mock_svc.stream_chunk_code.assert_called_once_with("c-1", {"a": "b"}, "cpp")
+
+    def test_rejects_missing_lang(self, client):
+        with patch(HANDLER_SERVICE) as mock_svc:
+            response = client.post("/chunk/execute/c-1/stream", json={})
+
+        assert response.status_code == 400
+        mock_svc.stream_chunk_code.assert_not_called()
+
+
+class TestServiceStream:
+    """ExecutionService._stream forwards events and cancels on close."""
+
+    def test_yields_events_then_result(self):
+        def run(on_event):
+            on_event("compile", {"status": "skipped"})
+            on_event("test", {"case": 1})
+            return {"status": "success"}
+
+        events = list(ExecutionService.__new__(ExecutionService)._stream(run))
+
+        assert events == [("compile", {"status": "skipped"}), ("test", {"case": 1}), ("done", {"status": "success"})]
+
+    def test_close_cancels_run(self):
+        closed = threading.Event()
+        finished = threading.Event()
+        continued = []
+
+        def run(on_event):
+            on_event("test", {"case": 1})
+            closed.wait(5)
+            continued.append(on_event("test", {"case": 2}))
+            finished.set()
+            return {"status": "cancelled"}
+
+        stream = ExecutionService.__new__(ExecutionService)._stream(run)
+        assert next(stream) == ("test", {"case": 1})
+        stream.close()
+        closed.set()
+
+        assert finished.wait(5)
+        assert continued == [False]
+
+    def test_errors_become_error_result(self):
+        def run(on_event):
+            raise RuntimeError("boom")
+
+        events = list(ExecutionService.__new__(ExecutionService)._stream(run))
+
+        assert events == [("done", {"status": "error", "msg": "boom"})]
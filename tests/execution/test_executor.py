@@ -0,0 +1,548 @@
+"""
+Unit tests for the test-case runner in core.executor.
+
+These drive `_run_tests` with the current Python interpreter as the
+"submission", so no compilers or database are needed.
+"""
+
+import sys
+import time
+import resource
+import shutil
+import subprocess
+
+import pytest
+
+from src.core import executor, zygote, node_pool, sandbox_spawn
+
+
+def _cases(*pairs):
+    return [
+        {"input": inp, "expected_output": out, "test_number": i}
+        for i, (inp, out) in enumerate(pairs, 1)
+    ]
+
+
+def _outcome(res):
+    """A run's result without the timing and memory figures."""
+    usage = {"wall_time_ms", "cpu_time_ms", "peak_rss_kb"}
+    return {
+        **{k: v for k, v in res.items() if k not in usage},
+        "tests": [{k: v for k, v in t.items() if k not in usage} for t in res["tests"]],
+    }
+
+
+ECHO = [sys.executable, "-c", "import sys; print(sys.stdin.read().strip())"]
+SLEEPY_ECHO = [sys.executable, "-c", "import sys, time; s = sys.stdin.read().strip(); time.sleep(float(s)); print(s)"]
+
+
+class TestTestWorkers:
+    def test_config_false_forces_serial(self):
+        assert executor._test_workers(False, 10) == 1
+
+    def test_serial_unless_the_problem_opts_in(self, monkeypatch):
+        monkeypatch.setattr(executor.os, "cpu_count", lambda: 16)
+        assert executor._test_workers(None, 10) == 1
+        assert executor._test_workers(True, 10) == executor.MAX_PARALLEL_TESTS
+
+    def test_int_config_caps_workers(self, monkeypatch):
+        monkeypatch.setattr(executor.os, "cpu_count", lambda: 16)
+        monkeypatch.setattr(executor, "MAX_PARALLEL_TESTS", 8)
+        assert executor._test_workers(2, 10) == 2
+        assert executor._test_workers(True, 10) == 8
+        assert executor._test_workers(True, 3) == 3
+
+    def test_global_switch_disables_parallelism(self, monkeypatch):
+        monkeypatch.setattr(executor, "PARALLEL_TESTS", False)
+        assert executor._test_workers(True, 10) == 1
+
+
+class TestRunTests:
+    def test_parallel_keeps_order_and_numbering(self):
+        tests = _cases(("0.3", "0.3"), ("0.0", "0.0"), ("0.1", "wrong"), ("0.2", "0.2"))
+        res = executor._run_tests(SLEEPY_ECHO, tests, timeout=5, workers=4)
+
+        assert res["status"] == "incorrect"
+        assert [t["case"] for t in res["tests"]] == [1, 2, 3, 4]
+        assert [t["status"] for t in res["tests"]] == ["passed", "passed", "failed", "passed"]
+
+    def test_parallel_matches_serial(self):
+        tests = _cases(("a", "a"), ("b", "b"), ("c", "x"))
+        serial = executor._run_tests(ECHO, tests, timeout=5, workers=1)
+        parallel = executor._run_tests(ECHO, tests, timeout=5, workers=3)
+        assert _outcome(serial) == _outcome(parallel)
+
+    def test_timeout_short_circuits_in_order(self):
+        tests = _cases(("0.0", "0.0"), ("3", "3"), ("0.0", "0.0"), ("0.0", "0.0"))
+        start = time.monotonic()
+        res = executor._run_tests(SLEEPY_ECHO, tests, timeout=1, workers=2)
+
+        assert time.monotonic() - start < 3
+        assert res["status"] == "timeout"
+        assert [t["case"] for t in res["tests"]] == [1, 2]
+        assert res["tests"][1]["msg"] == "Timeout"
+
+
+class TestRunTestsEvents:
+    def test_emits_each_result_in_order(self):
+        events = []
+        tests = _cases(("0.2", "0.2"), ("0.0", "0.0"), ("0.1", "0.1"))
+        res = executor._run_tests(SLEEPY_ECHO, tests, timeout=5, workers=3,
+                                  on_event=lambda name, data: events.append((name, data)))
+
+        assert [name for name, _ in events] == ["test", "test", "test"]
+        assert [data for _, data in events] == res["tests"]
+
+    def test_callback_returning_false_cancels_remaining_tests(self):
+        tests = _cases(("a", "a"), ("b", "b"), ("c", "c"))
+        res = executor._run_tests(ECHO, tests, timeout=5, workers=1, on_event=lambda name, data: False)
+
+        assert res["status"] == "cancelled"
+        assert [t["case"] for t in res["tests"]] == [1]
+
+
+class TestUsage:
+    def test_tests_report_wall_cpu_and_rss(self):
+        burn = [sys.executable, "-c", "import sys; x = sum(range(3_000_000)); print(sys.stdin.read().strip())"]
+        res = executor._run_tests(burn, _cases(("a", "a"), ("b", "b")), timeout=5)
+
+        for t in res["tests"]:
+            assert t["wall_time_ms"] > 0
+            assert 0 < t["cpu_time_ms"] <= t["wall_time_ms"] * 2
+            assert t["peak_rss_kb"] > 1000
+        assert res["wall_time_ms"] == round(sum(t["wall_time_ms"] for t in res["tests"]), 1)
+        assert res["cpu_time_ms"] == round(sum(t["cpu_time_ms"] for t in res["tests"]), 1)
+        assert res["peak_rss_kb"] == max(t["peak_rss_kb"] for t in res["tests"])
+
+    def test_peak_rss_is_the_submission_s_own(self):
+        ballast = bytearray(256 << 20)
+        ballast[::4096] = b"x" * len(ballast[::4096])
+        worker_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+        trivial = executor._run_tests(["true"], _cases(("", "")), timeout=5)
+        assert trivial["peak_rss_kb"] is None or trivial["peak_rss_kb"] < worker_kb / 4
+
+        hog = [sys.executable, "-c", "import time; x = b'x' * (64 << 20); time.sleep(0.2)"]
+        res = executor._run_tests(hog, _cases(("", "")), timeout=5)
+        assert 64 * 1024 <= res["peak_rss_kb"] < worker_kb
+        del ballast
+
+    def test_timeout_reports_usage_until_kill(self):
+        res = executor._run_tests(SLEEPY_ECHO, _cases(("3", "3")), timeout=1)
+
+        assert res["status"] == "timeout"
+        assert 900 < res["tests"][0]["wall_time_ms"] < 2500
+
+    @pytest.mark.skipif(shutil.which("g++") is None, reason="g++ is not installed")
+    def test_compiled_submissions_report_compile_time(self):
+        code = "#include <cstdio>\nint main(){int x; scanf(\"%d\", &x); printf(\"%d\", x);}"
+        res = executor._run_c_cpp(code, "cpp", _cases(("4", "4")), 5)
+
+        assert res["status"] == "correct"
+        assert res["compile_time_ms"] > 0
+        assert res["tests"][0]["cpu_time_ms"] is not None
+
+
+class TestPrecompiledHeader:
+    @pytest.mark.skipif(shutil.which("g++") is None, reason="g++ is not installed")
+    def test_only_header_clashes_are_compiled_again(self, tmp_path, monkeypatch):
+        header = tmp_path / "pch.hpp"
+        header.write_text("#include <algorithm>\n")
+        monkeypatch.setattr(executor.cpp_pch, "flags_for", lambda code, flags: ["-include", str(header)])
+        monkeypatch.setattr(executor.cpp_pch, "intact", lambda: True)
+        monkeypatch.setattr(executor.compile_cache, "COMPILE_CACHE_ENABLED", False)
+        compiles = []
+        compile_ = executor._compile
+        monkeypatch.setattr(executor, "_compile", lambda *a, **kw: compiles.append(a[2]) or compile_(*a, **kw))
+
+        res = executor._run_c_cpp("#include <iostream>\nint main(){ int x = ; }", "cpp", _cases(("", "")), 5)
+        assert res["status"] == "incorrect"
+        assert len(compiles) == 1
+
+        compiles.clear()
+        clash = "#include <iostream>\nusing namespace std;\nint count = 3;\nint main(){ cout << count; }"
+        res = executor._run_c_cpp(clash, "cpp", _cases(("", "3")), 5)
+        assert res["status"] == "correct"
+        assert len(compiles) == 2
+
+    @pytest.mark.skipif(shutil.which("g++") is None, reason="g++ is not installed")
+    def test_header_changed_during_compile_is_not_used(self, tmp_path, monkeypatch):
+        header = tmp_path / "pch.hpp"
+        header.write_text('#include <cstdio>\nstatic int injected = puts("INJECTED");\n')
+        monkeypatch.setattr(executor.cpp_pch, "flags_for", lambda code, flags: ["-include", str(header)])
+        monkeypatch.setattr(executor.cpp_pch, "intact", lambda: False)
+        monkeypatch.setattr(executor.compile_cache, "COMPILE_CACHE_ENABLED", False)
+
+        res = executor._run_c_cpp("#include <iostream>\nint main(){ std::cout << 42; }", "cpp", _cases(("", "42")), 5)
+        assert res["status"] == "correct"
+
+
+class TestJavaHarness:
+    """The single-JVM harness protocol (see java/Harness.java), with a scripted JVM."""
+
+    def _run(self, tmp_path, monkeypatch, lines, outputs, tests, returncode=0, run_rest=None):
+        def jvm(cmd, budget, **kwargs):
+            for i, (out, err) in outputs.items():
+                (tmp_path / f"out_{i}.txt").write_text(out)
+                (tmp_path / f"err_{i}.txt").write_text(err)
+            return subprocess.CompletedProcess(cmd, returncode, "".join(l + "\n" for l in lines), "")
+
+        monkeypatch.setattr(executor, "_isolated_run", jvm)
+        return executor._run_java_harness("cp", "Main", tests, 5, str(tmp_path), {}, run_rest=run_rest)
+
+    def test_case_lines_give_verdicts_and_usage(self, tmp_path, monkeypatch):
+        lines = ["CASE 1 0 2000000 1000000", "CASE 2 1 3000000 -1"]
+        res = self._run(tmp_path, monkeypatch, lines, {1: ("a\n", ""), 2: ("b\n", "boom")}, _cases(("", "a"), ("", "b")))
+
+        assert [(t["status"], t["exit_code"]) for t in res["tests"]] == [("passed", 0), ("failed", 1)]
+        assert res["tests"][0]["wall_time_ms"] == 2.0 and res["tests"][0]["cpu_time_ms"] == 1.0
+        assert res["tests"][1]["cpu_time_ms"] is None
+        assert (tmp_path / "caps.txt").read_text().splitlines() == ["%d %d" % executor.output_limit.caps("a"), "%d %d" % executor.output_limit.caps("b")]
+
+    def test_timeout_ends_the_run(self, tmp_path, monkeypatch):
+        res = self._run(tmp_path, monkeypatch, ["CASE 1 TIMEOUT 5000000000 4900000000"], {}, _cases(("", "a"), ("", "b")))
+        assert res["status"] == "timeout" and [t["msg"] for t in res["tests"]] == ["Timeout"]
+
+    def test_output_limit_fails_only_its_case(self, tmp_path, monkeypatch):
+        lines = ["CASE 1 OUTPUT 1000 1000", "CASE 2 0 1000 1000"]
+        res = self._run(tmp_path, monkeypatch, lines, {1: ("x", ""), 2: ("b", "")}, _cases(("", "a"), ("", "b")))
+        assert [t["msg"] for t in res["tests"]] == [executor.output_limit.MESSAGE, "Test passed."]
+
+    def test_system_exit_and_stray_threads_hand_the_rest_to_separate_jvms(self, tmp_path, monkeypatch):
+        rest = []
+        run_rest = lambda tests: rest.extend(tests) or {
+            "status": "correct", "msg": "All tests passed!",
+            "tests": [{**executor._judge(t, 0, t["expected_output"], ""), **executor._usage(0)} for t in tests],
+        }
+        tests = _cases(("", "a"), ("", "b"), ("", "c"))
+
+        res = self._run(tmp_path, monkeypatch, ["EXIT 1 2000000"], {1: ("a", "")}, tests, returncode=3, run_rest=run_rest)
+        assert [t["exit_code"] for t in res["tests"]] == [3, 0, 0] and res["status"] == "incorrect"
+        assert [t["test_number"] for t in rest] == [2, 3]
+
+        rest.clear()
+        lines = ["CASE 1 0 1000 1000", "CASE 2 0 1000 1000", "STRAY 2"]
+        res = self._run(tmp_path, monkeypatch, lines, {1: ("a", ""), 2: ("b", "")}, tests, run_rest=run_rest)
+        assert res["status"] == "correct" and [t["test_number"] for t in rest] == [3]
+
+    def test_dead_jvm_fails_the_case_it_was_running(self, tmp_path, monkeypatch):
+        res = self._run(tmp_path, monkeypatch, ["CASE 1 0 1000 1000"], {1: ("a", "")}, _cases(("", "a"), ("", "b")), returncode=134)
+        assert [t["status"] for t in res["tests"]] == ["passed", "failed"] and res["status"] == "incorrect"
+
+
+@pytest.mark.skipif(shutil.which("javac") is None, reason="javac is not installed")
+class TestJavaHarnessJvm:
+    """Harness.java itself, on a real JVM."""
+
+    @pytest.fixture(autouse=True)
+    def harness(self, monkeypatch):
+        monkeypatch.setattr(executor.java_harness, "JAVA_HARNESS", True)
+        monkeypatch.setattr(executor.compile_cache, "COMPILE_CACHE_ENABLED", False)
+
+    def _run(self, body, tests, timeout=5):
+        code = "public class Main { public static void main(String[] args) throws Exception { %s } }" % body
+        return executor._run_java(code, tests, timeout, class_name="Main")
+
+    def test_cases_run_in_order_with_their_input(self):
+        body = "System.out.println(new java.util.Scanner(System.in).nextInt() * 2);"
+        res = self._run(body, _cases(("1", "2"), ("21", "42")))
+        assert res["status"] == "correct" and [t["case"] for t in res["tests"]] == [1, 2]
+
+    def test_timeout_halts_the_jvm(self):
+        body = "if (new java.util.Scanner(System.in).nextInt() == 2) while (true) {} System.out.println(1);"
+        res = self._run(body, _cases(("1", "1"), ("2", "1"), ("3", "1")), timeout=1)
+        assert res["status"] == "timeout" and len(res["tests"]) == 2
+
+    def test_output_cap_is_enforced_in_the_jvm(self):
+        body = "while (true) { try { System.out.println(\"x\".repeat(1000)); } catch (Throwable e) { break; } } System.out.println(1);"
+        res = self._run(body, _cases(("", "1"), ("", "1")))
+        assert res["tests"][0]["msg"] == executor.output_limit.MESSAGE and len(res["tests"]) == 2
+
+    def test_system_exit_ends_only_its_case(self):
+        body = "int n = new java.util.Scanner(System.in).nextInt(); System.out.println(n); Runtime.getRuntime().exit(n == 1 ? 0 : 4);"
+        res = self._run(body, _cases(("1", "1"), ("2", "2")))
+        assert [(t["status"], t["exit_code"]) for t in res["tests"]] == [("passed", 0), ("failed", 4)]
+
+    def test_threads_outliving_their_case_do_not_write_into_the_next(self):
+        # Case 1 leaves a daemon thread behind that prints while case 2 is running
+        body = (
+            "String n = new java.util.Scanner(System.in).next();"
+            " if (n.equals(\"a\")) { Thread t = new Thread(() -> { try { Thread.sleep(200); } catch (Exception e) {}"
+            " System.out.println(\"LEAK\"); }); t.setDaemon(true); t.start(); }"
+            " System.out.println(n); if (n.equals(\"b\")) Thread.sleep(400);"
+        )
+        res = self._run(body, _cases(("a", "a"), ("b", "b")))
+        assert res["status"] == "correct"
+
+
+SPAM = [sys.executable, "-c", "while True: print('x' * 1000)"]
+
+
+class TestOutputLimit:
+    def test_flood_is_killed_long_before_timeout(self):
+        start = time.monotonic()
+        res = executor._run_tests(SPAM, _cases(("", "x")), timeout=5)
+
+        assert time.monotonic() - start < 2
+        assert res["status"] == "incorrect"
+        assert res["tests"][0]["msg"] == "Output limit exceeded"
+
+    def test_expected_answer_bounds_stdout(self, monkeypatch):
+        monkeypatch.setattr(executor.output_limit, "OUTPUT_SLACK_BYTES", 10)
+        chatty = [sys.executable, "-c", "print('y' * 100)"]
+        res = executor._run_tests(chatty, _cases(("", "short"), ("", "y" * 100)), timeout=5)
+
+        assert [t["msg"] for t in res["tests"]] == ["Output limit exceeded", "Test passed."]
+
+    def test_large_input_and_output_within_caps(self):
+        data = "z" * 200_000
+        res = executor._run_tests(ECHO, _cases((data, data)), timeout=5)
+
+        assert res["tests"][0]["status"] == "passed"
+
+    def test_custom_run_is_capped(self, monkeypatch):
+        monkeypatch.setattr(executor.output_limit, "MAX_OUTPUT_KB", 4)
+        res = executor._run_interpreted("while True: print('x' * 100)", "python", timeout=5)
+
+        assert res == {"status": "error", "msg": "Output limit exceeded"}
+
+
+class TestSyntaxPrecheck:
+    def test_python_syntax_error_rejected_without_running(self, monkeypatch):
+        monkeypatch.setattr(executor, "is_cheat_mode", lambda: False)
+        monkeypatch.setattr(executor, "_run_interpreted", lambda *a, **k: pytest.fail("interpreter started"))
+        events = []
+        res = executor.execute_code("print(1", "python", _cases(("", "1")), on_event=lambda n, d: events.append((n, d)))
+
+        assert res["status"] == "incorrect"
+        assert "SyntaxError" in res["msg"]
+        assert events == [("compile", {"status": "failed"})]
+
+    def test_template_program_is_checked(self, monkeypatch):
+        monkeypatch.setattr(executor, "is_cheat_mode", lambda: False)
+        monkeypatch.setattr(executor, "_run_interpreted", lambda *a, **k: {"status": "correct"})
+        # Indented on its own, valid inside the template
+        templates = {"python": "def solve():\n__CODE_GOES_HERE__\nprint(solve())\n"}
+        res = executor.execute_code("    return 1\n", "python", _cases(("", "1")), templates=templates)
+
+        assert res == {"status": "correct"}
+
+    def test_templated_program_is_analyzed_once(self, monkeypatch):
+        monkeypatch.setattr(executor, "is_cheat_mode", lambda: False)
+        monkeypatch.setattr(executor, "_run_interpreted", lambda *a, **k: {"status": "correct"})
+        scanned = []
+        real = executor.analyze_code
+        monkeypatch.setattr(executor, "analyze_code", lambda lang, code: scanned.append(code) or real(lang, code))
+        templates = {"python": "import math\n__CODE_GOES_HERE__\nprint(solve())\n"}
+        executor.execute_code("def solve():\n    return 1\n", "python", _cases(("", "1")), templates=templates)
+
+        assert scanned == ["import math\ndef solve():\n    return 1\n\nprint(solve())\n"]
+
+    def test_template_syntax_error_points_at_user_code(self, monkeypatch):
+        monkeypatch.setattr(executor, "is_cheat_mode", lambda: False)
+        templates = {"python": "import math\nimport sys\n__CODE_GOES_HERE__\nprint(solve())\n"}
+        res = executor.execute_code("def solve():\n    return (1\n", "python", _cases(("", "1")), templates=templates)
+
+        assert res["status"] == "incorrect"
+        assert 'File "main.py", line 2' in res["msg"]
+
+    def test_template_code_is_vetted(self, monkeypatch):
+        monkeypatch.setattr(executor, "is_cheat_mode", lambda: False)
+        # Harmless on its own, a call to the template's import once merged
+        templates = {"python": "from os import system as run\n__CODE_GOES_HERE__\n"}
+        res = executor.execute_code("run('ls')\n", "python", _cases(("", "")), templates=templates)
+
+        assert res["status"] == "error"
+
+
+def _pid_alive(pid):
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except FileNotFoundError:
+        return False
+
+
+def _wait_gone(pid, seconds=2):
+    deadline = time.monotonic() + seconds
+    while _pid_alive(pid) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return not _pid_alive(pid)
+
+
+# Forks a sleeper that closes the pipes, reports its pid and outlives the parent
+FORK_AND_EXIT = [sys.executable, "-c", (
+    "import os, sys, time\n"
+    "pid = os.fork()\n"
+    "if pid == 0:\n"
+    "    os.close(1); os.close(2); time.sleep(60); os._exit(0)\n"
+    "print(pid)"
+)]
+# Forks a sleeper that keeps stdout open, then waits for it
+FORK_AND_HANG = [sys.executable, "-c", (
+    "import os, time\n"
+    "pid = os.fork()\n"
+    "if pid == 0:\n"
+    "    time.sleep(60); os._exit(0)\n"
+    "open('child.pid', 'w').write(str(pid))\n"
+    "os.waitpid(pid, 0)"
+)]
+
+
+class TestProcessGroups:
+    def test_forked_children_die_with_the_run(self):
+        r, _ = executor._measured_run(FORK_AND_EXIT, timeout=5)
+
+        assert r.returncode == 0
+        assert _wait_gone(int(r.stdout))
+
+    def test_timeout_kills_the_whole_group(self, tmp_path):
+        start = time.monotonic()
+        with pytest.raises(subprocess.TimeoutExpired):
+            executor._measured_run(FORK_AND_HANG, timeout=1, cwd=tmp_path)
+
+        assert time.monotonic() - start < 3
+        assert _wait_gone(int((tmp_path / "child.pid").read_text()))
+
+    def test_zygote_children_die_with_the_run(self, tmp_path):
+        src = tmp_path / "main.py"
+        src.write_text(FORK_AND_EXIT[2])
+        rc, out, _, _ = zygote.run(str(src), str(tmp_path), "", 5, executor._sandbox_limits(5))
+
+        assert rc == 0
+        assert _wait_gone(int(out))
+
+
+REPORT_LIMITS = [sys.executable, "-c", (
+    "import resource as r\n"
+    "print(*[r.getrlimit(x)[0] for x in (r.RLIMIT_CPU, r.RLIMIT_NOFILE, r.RLIMIT_FSIZE)])"
+)]
+
+
+class TestSandboxSpawn:
+    @pytest.mark.parametrize("mode", [
+        pytest.param("prlimit", marks=pytest.mark.skipif(not sandbox_spawn.PRLIMIT, reason="prlimit is not installed")),
+        "preexec",
+    ])
+    def test_limits_reach_the_child(self, mode, monkeypatch):
+        monkeypatch.setattr(sandbox_spawn, "SANDBOX_SPAWN", mode)
+        r, _ = executor._measured_run(REPORT_LIMITS, timeout=5, limits=executor._sandbox_limits(3, skip_memory=True))
+
+        assert r.stdout.split() == ["3", str(executor.MAX_OPEN_FILES), str(executor.MAX_FILE_SIZE_MB * 1024 * 1024)]
+
+    @pytest.mark.skipif(not sandbox_spawn.PRLIMIT, reason="prlimit is not installed")
+    def test_prlimit_mode_needs_no_preexec_fn(self, monkeypatch):
+        monkeypatch.setattr(sandbox_spawn, "SANDBOX_SPAWN", "prlimit")
+        cmd, extra = sandbox_spawn.wrap(["true"], executor._sandbox_limits(2))
+
+        assert extra == {}
+        assert cmd[0] == sandbox_spawn.PRLIMIT and cmd[-2:] == ["--", "true"]
+
+
+class TestZygoteBackend:
+    """The zygote backend must behave like `python main.py` per test case."""
+
+    def _run(self, tmp_path, code, stdin="", timeout=5):
+        src = tmp_path / "main.py"
+        src.write_text(code)
+        return zygote.run(str(src), str(tmp_path), stdin, timeout, executor._sandbox_limits(timeout))
+
+    def test_runs_code_with_stdin(self, tmp_path):
+        rc, out, err, usage = self._run(tmp_path, "import heapq\nprint(int(input()) * 2)", "21")
+        assert (rc, out, err) == (0, "42\n", "")
+        assert usage["cpu_s"] >= 0 and 0 < usage["peak_rss_kb"] < 64 * 1024
+
+    def test_reports_exit_code_and_traceback(self, tmp_path):
+        rc, _, err, _ = self._run(tmp_path, "import sys\nprint('x', file=sys.stderr)\nsys.exit(3)")
+        assert rc == 3 and err == "x\n"
+
+        rc, _, err, _ = self._run(tmp_path, "raise ValueError('bad')")
+        assert rc == 1
+        assert err.startswith("Traceback") and "runpy" not in err and "ValueError: bad" in err
+
+    def test_timeout_raises(self, tmp_path):
+        with pytest.raises(subprocess.TimeoutExpired):
+            self._run(tmp_path, "while True: pass", timeout=1)
+
+    def test_output_limit_kills_child(self, tmp_path):
+        src = tmp_path / "main.py"
+        src.write_text("while True: print('x' * 1000)")
+        with pytest.raises(executor.OutputLimitExceeded):
+            zygote.run(str(src), str(tmp_path), "", 5, executor._sandbox_limits(5), (10_000, 10_000))
+
+    def test_run_tests_through_zygote(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(zygote, "PYTHON_BACKEND", "zygote")
+        tests = _cases(("1", "2"), ("5", "10"), ("7", "0"))
+        res = executor._run_interpreted("print(int(input()) * 2)", "python", tests, 5, workers=2)
+
+        assert res["status"] == "incorrect"
+        assert [t["status"] for t in res["tests"]] == ["passed", "passed", "failed"]
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="node is not installed")
+class TestNodePoolBackend:
+    """Warm Node runners must isolate submissions and enforce timeouts."""
+
+    def test_reads_stdin_and_writes_stdout(self):
+        code = "let d = ''; process.stdin.on('data', c => d += c); process.stdin.on('end', () => console.log(Number(d) * 2));"
+        assert node_pool.run(code, "21", 5)[:3] == (0, "42\n", "")
+
+    def test_globals_do_not_leak_between_runs(self):
+        code = "globalThis.n = (globalThis.n || 0) + 1; console.log(n);"
+        assert [node_pool.run(code, "", 5)[1] for _ in range(3)] == ["1\n"] * 3
+
+    def test_uncaught_error_sets_exit_code(self):
+        rc, _, err, _ = node_pool.run("throw new Error('boom')", "", 5)
+        assert rc == 1 and "Error: boom" in err and "runner.js" not in err
+
+    def test_output_limit_ends_job_and_runner_recovers(self):
+        with pytest.raises(executor.OutputLimitExceeded):
+            node_pool.run("while (true) { try { console.log('x'.repeat(100)); } catch (e) {} }", "", 2, caps=(1000, 1000))
+        assert node_pool.run("console.log('ok')", "", 5)[:3] == (0, "ok\n", "")
+
+    def test_busy_timer_is_killed_and_runner_replaced(self):
+        with pytest.raises(subprocess.TimeoutExpired):
+            node_pool.run("setTimeout(() => { while (true) {} }, 0)", "", 1)
+        assert node_pool.run("console.log('ok')", "", 5)[:3] == (0, "ok\n", "")
+
+    def test_tampering_with_runner_realm_does_not_reach_next_job(self, monkeypatch):
+        monkeypatch.setattr(node_pool, "_pool", node_pool.NodePool(1))
+        forge = (
+            "const f = () => { const H = Object.getPrototypeOf(Object.getPrototypeOf(process.stdin));"
+            " H.toJSON = () => ({ stdout: 'FORGED\\n' }); }; f();"
+        )
+        with pytest.raises(subprocess.TimeoutExpired):
+            node_pool.run(forge, "", 5)
+        assert node_pool.run("console.log('ok')", "", 5)[:3] == (0, "ok\n", "")
+
+    def test_submission_reuses_its_runners_then_retires_them(self, monkeypatch):
+        started = []
+        runner = node_pool._Runner
+        monkeypatch.setattr(node_pool, "_Runner", lambda limits: started.append(runner(limits)) or started[-1])
+        monkeypatch.setattr(node_pool, "NODE_POOL_MAX_JOBS", 3)
+        code = "globalThis.n = (globalThis.n || 0) + 1; console.log(n);"
+
+        with node_pool.NodePool(2).session() as session:
+            assert [session.run(code, "", 5)[1] for _ in range(5)] == ["1\n"] * 5
+        used = [r for r in started if r.jobs]
+        assert [r.jobs for r in used] == [3, 2]
+        assert not any(r.alive() for r in used)
+
+    def test_runner_is_not_reused_after_a_timeout(self, monkeypatch):
+        with node_pool.NodePool(1).session() as session:
+            with pytest.raises(subprocess.TimeoutExpired):
+                session.run("setTimeout(() => { while (true) {} }, 0)", "", 1)
+            first = session._idle.get_nowait()
+            session._idle.put(first)
+            assert first is None
+            assert session.run("console.log('ok')", "", 5)[:3] == (0, "ok\n", "")
+
+    def test_runs_under_production_limits(self, monkeypatch):
+        monkeypatch.setattr(node_pool, "JAVASCRIPT_BACKEND", "pool")
+        code = "let d = ''; process.stdin.on('data', c => d += c); process.stdin.on('end', () => console.log(Number(d) + 1));"
+        res = executor._run_interpreted(code, "javascript", _cases(("1", "2"), ("41", "42")), 5, workers=2)
+        assert res["status"] == "correct"
+
+        # The address-space limit becomes a heap limit, which still stops a runaway allocation
+        rc, _, err, _ = node_pool.run("const a = []; while (true) a.push(new Array(1e6).fill(1));", "", 10, executor._sandbox_limits(10))
+        assert rc != 0
@@ -0,0 +1,191 @@
+"""
+Unit tests for the grading result cache and its use by ExecutionService.
+
+Service tests replace the repositories and `core_execute`, so nothing is
+executed for real; cheat mode is patched off.
+"""
+
+import io
+import zipfile
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+from core import result_cache
+from core.result_cache import ResultCache
+from services import execution_service
+from services.execution_service import ExecutionService
+from services.problem_service import ProblemService
+
+TESTS = [{"input": "", "expected_output": "1", "test_number": 1}]
+CORRECT = {"status": "correct", "msg": "All tests passed!", "tests": []}
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    monkeypatch.setattr(result_cache, "RESULT_CACHE", True)
+    monkeypatch.setattr(result_cache, "_cache", ResultCache(60, 1024 * 1024))
+    monkeypatch.setattr(execution_service, "is_cheat_mode", lambda: False)
+
+
+class TestResultCache:
+    def test_key_ignores_line_endings_and_trailing_space(self):
+        version = result_cache.test_set_version(TESTS)
+        key = result_cache.make_key("p1", version, "python", "print(1)\n")
+
+        assert result_cache.make_key("p1", version, "python", "print(1)\r\n\n  ") == key
+        assert result_cache.make_key("p1", version, "python", "print(2)\n") != key
+        assert result_cache.make_key("p1", version, "javascript", "print(1)\n") != key
+
+    def test_version_changes_with_tests_and_config(self):
+        version = result_cache.test_set_version(TESTS, {"timeout": 2})
+
+        assert result_cache.test_set_version(TESTS + TESTS, {"timeout": 2}) != version
+        assert result_cache.test_set_version(TESTS, {"timeout": 3}) != version
+        assert result_cache.test_set_version(TESTS, {"timeout": 2, "parallel_tests": 4}) == version
+
+    def test_only_deterministic_verdicts_are_stored(self):
+        cache = ResultCache(60, 1024)
+
+        assert cache.put("a", "p1", CORRECT)
+        assert not cache.put("b", "p1", {"status": "timeout", "tests": []})
+        assert not cache.put("c", "p1", {"status": "error", "msg": "boom"})
+        assert cache.get("a") == {**CORRECT, "result_cache": "hit"}
+        assert cache.get("b") is None
+
+    def test_incorrect_is_stored_only_for_clean_wrong_answers(self):
+        cache = ResultCache(60, 4096)
+        wrong = {"case": 1, "status": "failed", "msg": "Expected '1', got '2'", "exit_code": 0}
+        passed = {"case": 2, "status": "passed", "msg": "Test passed.", "exit_code": 0}
+        killed = {"case": 3, "status": "failed", "msg": "Expected '1', got ''", "exit_code": -24}
+        capped = {"case": 4, "status": "failed", "msg": "Output limit exceeded", "exit_code": None}
+
+        assert cache.put("a", "p1", {"status": "incorrect", "tests": [wrong, passed]})
+        assert cache.put("b", "p1", {"status": "incorrect", "msg": "main.c:1: error", "compile_cache": "miss"})
+        assert not cache.put("c", "p1", {"status": "incorrect", "tests": [wrong, killed]})
+        assert not cache.put("d", "p1", {"status": "incorrect", "tests": [capped]})
+
+    def test_entries_expire(self, monkeypatch):
+        cache = ResultCache(10, 1024)
+        now = [100.0]
+        monkeypatch.setattr(result_cache.time, "monotonic", lambda: now[0])
+        cache.put("a", "p1", CORRECT)
+
+        now[0] += 11
+        assert cache.get("a") is None
+        assert cache.stats()["entries"] == 0
+
+    def test_evicts_least_recently_used_past_the_size_bound(self):
+        size = len(result_cache.json.dumps(CORRECT))
+        cache = ResultCache(60, size * 2)
+        cache.put("a", "p1", CORRECT)
+        cache.put("b", "p1", CORRECT)
+        cache.get("a")
+        cache.put("c", "p1", CORRECT)
+
+        assert cache.get("b") is None
+        assert cache.get("a") and cache.get("c")
+        assert cache.stats()["bytes"] <= size * 2
+
+    def test_invalidate_drops_one_problem(self):
+        cache = ResultCache(60, 1024)
+        cache.put("a", "p1", CORRECT)
+        cache.put("b", "p2", CORRECT)
+
+        assert cache.invalidate("p1") == 1
+        assert cache.get("a") is None and cache.get("b")
+
+
+class TestServiceCaching:
+    def _service(self):
+        svc = ExecutionService()
+        svc.problem_repo = MagicMock()
+        svc.problem_repo.find_by_id.return_value = SimpleNamespace(config={"timeout": 2})
+        svc.test_case_repo = MagicMock()
+        svc.test_case_repo.find_all_by_problem.return_value = list(TESTS)
+        return svc
+
+    def _count_executions(self, monkeypatch, result=CORRECT):
+        calls = []
+
+        def fake_execute(code, lang, tests, **kwargs):
+            calls.append(code)
+            return dict(result)
+
+        monkeypatch.setattr(execution_service, "core_execute", fake_execute)
+        return calls
+
+    def test_repeat_submission_is_served_from_cache(self, monkeypatch):
+        svc = self._service()
+        calls = self._count_executions(monkeypatch)
+
+        first = svc.run_problem_code("p1", "print(1)", "python")
+        second = svc.run_problem_code("p1", "print(1)\r\n", "python")
+
+        assert calls == ["print(1)"]
+        assert "result_cache" not in first
+        assert second["result_cache"] == "hit"
+        assert result_cache.stats()["hits"] == 1
+
+    def test_new_tests_change_the_key(self, monkeypatch):
+        svc = self._service()
+        calls = self._count_executions(monkeypatch)
+
+        svc.run_problem_code("p1", "print(1)", "python")
+        svc.test_case_repo.find_all_by_problem.return_value = TESTS + [
+            {"input": "2", "expected_output": "2", "test_number": 2}
+        ]
+        svc.run_problem_code("p1", "print(1)", "python")
+
+        assert len(calls) == 2
+
+    def test_cheat_mode_bypasses_cache(self, monkeypatch):
+        svc = self._service()
+        calls = self._count_executions(monkeypatch)
+        monkeypatch.setattr(execution_service, "is_cheat_mode", lambda: True)
+
+        svc.run_problem_code("p1", "print(1)", "python")
+        svc.run_problem_code("p1", "print(1)", "python")
+
+        assert len(calls) == 2
+        assert result_cache.stats()["entries"] == 0
+
+    def test_timeouts_are_re_executed(self, monkeypatch):
+        svc = self._service()
+        calls = self._count_executions(monkeypatch, {"status": "timeout", "tests": []})
+
+        svc.run_problem_code("p1", "while True: pass", "python")
+        svc.run_problem_code("p1", "while True: pass", "python")
+
+        assert len(calls) == 2
+
+
+class TestInvalidation:
+    def _service(self):
+        svc = ProblemService()
+        svc.problem_repo = MagicMock()
+        svc.test_case_repo = MagicMock()
+        svc.test_case_repo.exists_test_case.return_value = False
+        svc.test_case_repo.create_test_case.return_value = {"id": 1}
+        return svc
+
+    def test_add_test_cases_invalidates(self):
+        result_cache.put("k", "p1", CORRECT)
+
+        res = self._service().add_test_cases("p1", [{"input": "1", "output": "1"}])
+
+        assert res["status"] == "success"
+        assert result_cache.get("k") is None
+
+    def test_import_test_cases_invalidates(self):
+        result_cache.put("k", "p1", CORRECT)
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, "w") as zf:
+            zf.writestr("in/1.in", "1")
+            zf.writestr("out/1.out", "1")
+
+        res = self._service().import_test_cases("p1", buf.getvalue())
+
+        assert res["status"] == "success"
+        assert result_cache.get("k") is None
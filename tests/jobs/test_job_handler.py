@@ -0,0 +1,165 @@
+"""
+Unit tests for the asynchronous job endpoints and the job queue backends.
+
+Strategy:
+  - Handler tests patch the JobService instance created during blueprint
+    registration, like the problem endpoint tests.
+  - Queue tests exercise both backends directly (SQLite on a temp file).
+  - JobService.run_next is driven with an in-memory queue and a mocked
+    ExecutionService, so nothing is executed for real.
+"""
+
+import os
+from unittest.mock import patch, MagicMock
+
+import pytest
+
+from src.infrastructure import job_queue as job_queue_module
+from src.infrastructure.job_queue import MemoryJobQueue, SQLiteJobQueue, JobQueueFull
+from services.job_service import JobService
+
+HANDLER_SERVICE = "api.routes.job_routes.job_handler.job_service"
+
+
+class TestSubmitProblemCode:
+    """Tests for POST /jobs/code/<problem_id>."""
+
+    ENDPOINT = "/jobs/code/abc-123"
+
+    def test_returns_202_with_job(self, client):
+        with patch(HANDLER_SERVICE) as mock_svc:
+            mock_svc.submit_problem_code.return_value = {"id": "job-1", "status": "queued"}
+
+            response = client.post(f"{self.ENDPOINT}?lang=python", json={"code": "print(1)"})
+
+        assert response.status_code == 202
+        assert response.get_json()["data"] == {"id": "job-1", "status": "queued"}
+        mock_svc.submit_problem_code.assert_called_once_with("abc-123", "print(1)", "python")
+
+    def test_rejects_missing_lang(self, client):
+        with patch(HANDLER_SERVICE) as mock_svc:
+            response = client.post(self.ENDPOINT, json={"code": "print(1)"})
+
+        assert response.status_code == 400
+        mock_svc.submit_problem_code.assert_not_called()
+
+    def test_full_queue_is_429(self, client):
+        from infrastructure import JobQueueFull as AppJobQueueFull
+
+        with patch(HANDLER_SERVICE) as mock_svc:
+            mock_svc.submit_problem_code.side_effect = AppJobQueueFull(7)
+            response = client.post(f"{self.ENDPOINT}?lang=python", json={"code": "print(1)"})
+
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "7"
+
+    def test_rejects_missing_code(self, client):
+        with patch(HANDLER_SERVICE) as mock_svc:
+            response = client.post(f"{self.ENDPOINT}?lang=python", json={})
+
+        assert response.status_code == 400
+        mock_svc.submit_problem_code.assert_not_called()
+
+
+class TestGetJob:
+    """Tests for GET /jobs/<job_id>."""
+
+    def test_returns_job(self, client):
+        with patch(HANDLER_SERVICE) as mock_svc:
+            mock_svc.get_job.return_value = {"id": "job-1", "status": "done", "result": {"status": "correct"}}
+
+            response = client.get("/jobs/job-1")
+
+        assert response.status_code == 200
+        assert response.get_json()["data"]["result"] == {"status": "correct"}
+
+    def test_unknown_job_is_404(self, client):
+        with patch(HANDLER_SERVICE) as mock_svc:
+            mock_svc.get_job.return_value = None
+
+            response = client.get("/jobs/nope")
+
+        assert response.status_code == 404
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def job_queue(request, tmp_path):
+    if request.param == "memory":
+        return MemoryJobQueue()
+    return SQLiteJobQueue(str(tmp_path / "jobs.sqlite3"))
+
+
+class TestJobQueue:
+    def test_lifecycle(self, job_queue):
+        job = job_queue.enqueue("problem", {"code": "secret"})
+        assert job["status"] == "queued" and "payload" not in job
+
+        claimed = job_queue.claim()
+        assert claimed["id"] == job["id"] and claimed["payload"] == {"code": "secret"}
+        assert job_queue.get(job["id"])["status"] == "running"
+        assert job_queue.claim() is None
+
+        job_queue.complete(job["id"], {"status": "correct"})
+        done = job_queue.get(job["id"])
+        assert done["status"] == "done" and done["result"] == {"status": "correct"}
+
+    def test_claims_in_fifo_order(self, job_queue):
+        first = job_queue.enqueue("problem", {"n": 1})
+        second = job_queue.enqueue("problem", {"n": 2})
+        assert [job_queue.claim()["id"], job_queue.claim()["id"]] == [first["id"], second["id"]]
+
+
+    def test_rejects_past_max_pending(self, job_queue, monkeypatch):
+        monkeypatch.setattr(job_queue_module, "JOB_MAX_PENDING", 2)
+        job_queue.enqueue("problem", {"n": 1})
+        job_queue.enqueue("problem", {"n": 2})
+        with pytest.raises(JobQueueFull):
+            job_queue.enqueue("problem", {"n": 3})
+
+        # A claimed job no longer counts as pending
+        job_queue.claim()
+        job_queue.enqueue("problem", {"n": 3})
+
+    def test_sqlite_file_is_in_a_private_directory(self, tmp_path):
+        SQLiteJobQueue(str(tmp_path / "state" / "jobs" / "jobs.sqlite3"))
+        assert os.stat(tmp_path / "state" / "jobs").st_mode & 0o777 == 0o700
+
+
+class TestJobService:
+    def test_run_next_executes_and_stores_result(self):
+        execution = MagicMock()
+        execution.run_problem_code.return_value = {"status": "correct", "tests": []}
+        service = JobService(job_queue=MemoryJobQueue(), execution_service=execution)
+
+        with patch.object(service, "ensure_workers"):
+            job = service.submit_problem_code("p1", "print(1)", "python")
+        assert service.run_next() is True
+        assert service.run_next() is False
+
+        execution.run_problem_code.assert_called_once_with("p1", "print(1)", "python")
+        assert service.get_job(job["id"])["result"] == {"status": "correct", "tests": []}
+
+    def test_execution_errors_mark_job_failed(self):
+        execution = MagicMock()
+        execution.run_chunk_code.side_effect = RuntimeError("boom")
+        service = JobService(job_queue=MemoryJobQueue(), execution_service=execution)
+
+        with patch.object(service, "ensure_workers"):
+            job = service.submit_chunk_code("c1", {"logic": "x"}, "python")
+        service.run_next()
+
+        assert service.get_job(job["id"])["status"] == "failed"
+
+    def test_rejected_admission_fails_job_with_retry_after(self):
+        from core import AdmissionRejected
+
+        execution = MagicMock()
+        execution.run_problem_code.side_effect = AdmissionRejected("run", 7)
+        service = JobService(job_queue=MemoryJobQueue(), execution_service=execution)
+
+        with patch.object(service, "ensure_workers"):
+            job = service.submit_problem_code("p1", "print(1)", "python")
+        service.run_next()
+
+        stored = service.get_job(job["id"])
+        assert stored["status"] == "failed" and stored["result"]["retry_after"] == 7